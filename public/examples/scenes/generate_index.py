@@ -1,17 +1,99 @@
+"""
+Writes files.json: one {"path", "size", "sha256"} entry per scene asset.
+
+Mesh files are listed only when a scene XML references them, so source
+meshes kept next to optimized ones (scripts/optimize_meshes.py) are not
+downloaded.
+
+The viewer caches assets by sha256 in the browser, so only files whose hash
+changed are downloaded again. "compressed" sizes recorded by
+scripts/compress_artifacts.py are kept for files whose content is unchanged.
+
+Precompiled models (.mjb, from generate_mjb.py) are listed with the "model"
+record from their mjb/models.json; the viewer fetches them on demand instead
+of preloading them. A .mjb without a matching record is not listed, and
+neither is one larger than the scene files it replaces: MuJoCo stores a
+collision BVH for every mesh, so a model can be several times its inputs, and
+downloading it costs more than compiling the XML saves.
+"""
+
 from pathlib import Path
+import hashlib
 import json
+import xml.etree.ElementTree as ET
 
 _HERE = Path(__file__).parent
 
-_ALLOWED_EXTENSIONS = [".xml", ".png", ".stl", ".obj"]
+_ALLOWED_EXTENSIONS = [".xml", ".png", ".stl", ".obj", ".msh", ".mjb"]
+_MESH_EXTENSIONS = [".stl", ".obj", ".msh"]
+
+
+def _referenced_meshes():
+    referenced = set()
+    for scene in _HERE.rglob("*.xml"):
+        try:
+            root = ET.parse(scene).getroot()
+        except ET.ParseError:
+            continue
+        compiler = root.find("compiler")
+        meshdir = compiler.get("meshdir", ".") if compiler is not None else "."
+        for mesh in root.iter("mesh"):
+            if mesh.get("file"):
+                referenced.add((scene.parent / meshdir / mesh.get("file")).resolve())
+    return referenced
+
+
+def _model_record(path, sha256):
+    models_path = path.parent / "models.json"
+    if not models_path.exists():
+        return None
+    record = json.loads(models_path.read_text()).get("models", {}).get(path.name)
+    if record is None or record.get("sha256") != sha256:
+        return None
+    input_bytes = sum((_HERE / name).stat().st_size for name in record.get("inputs", {}) if (_HERE / name).exists())
+    if path.stat().st_size > input_bytes:
+        print(f"Not listing {path.relative_to(_HERE).as_posix()}: {path.stat().st_size} bytes, "
+              f"larger than its inputs ({input_bytes} bytes)")
+        return None
+    return {key: value for key, value in record.items() if key != "sha256"}
+
+
+def _load_previous(index_path):
+    if not index_path.exists():
+        return {}
+    try:
+        entries = json.loads(index_path.read_text())
+    except ValueError:
+        return {}
+    return {entry["path"]: entry for entry in entries if isinstance(entry, dict)}
+
 
 if __name__ == "__main__":
+    index_path = _HERE / "files.json"
+    previous = _load_previous(index_path)
+
+    referenced = _referenced_meshes()
+
     files_to_download = []
     for path in _HERE.rglob("*"):
+      if path.suffix.lower() in _MESH_EXTENSIONS and path.resolve() not in referenced:
+         continue
       if path.is_file() and path.suffix.lower() in _ALLOWED_EXTENSIONS:
-         files_to_download.append(str(path.relative_to(_HERE)))
-    files_to_download.sort()
+         data = path.read_bytes()
+         entry = {
+            "path": str(path.relative_to(_HERE).as_posix()),
+            "size": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+         }
+         if path.suffix.lower() == ".mjb":
+            entry["model"] = _model_record(path, entry["sha256"])
+            if entry["model"] is None:
+               continue
+         old = previous.get(entry["path"], {})
+         if old.get("sha256") == entry["sha256"] and "compressed" in old:
+            entry["compressed"] = old["compressed"]
+         files_to_download.append(entry)
+    files_to_download.sort(key=lambda entry: entry["path"])
 
-    index_path = _HERE / "files.json"
     with open(index_path, mode="w") as f:
         json.dump(files_to_download, f, indent=2)
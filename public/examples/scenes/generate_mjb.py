@@ -0,0 +1,190 @@
+"""
+Compiles scene XMLs into MuJoCo binary models (.mjb), so the viewer can skip
+XML parsing and mesh compilation on page load.
+
+For each scene (default g1/g1.xml) this writes into <scene dir>/mjb/:
+
+  <stem>.mjb          - the scene as is (what the viewer loads at startup),
+  <stem>.robotsN.mjb  - the N-robot layout built by
+                        src/simulation/multiRobotGenerator.js (N = 2..11).
+
+Layouts come from running multiRobotGenerator.js under node, so they are the
+XML the viewer would compile. Robot start positions only end up in qpos0 and
+body_pos, which the viewer overwrites with the configured positions.
+
+mjb/models.json records, per model, the robot count, the MuJoCo version, a few
+model sizes and the sha256 of every input file (the scene XML and its
+meshes). generate_index.py (run at the end) lists each .mjb in files.json with
+that record. The viewer only uses a model whose inputs match files.json and
+falls back to the XML otherwise. Unchanged models are not recompiled.
+
+generate_index.py does not list a model larger than its inputs, which is the
+case for g1: every mesh carries a collision BVH, so g1.mjb is ~74 MB (~25 MB
+gzipped) against ~20 MB (~9 MB gzipped) of XML and meshes, while compiling
+the XML takes under a second natively. A model only pays off once that
+changes; the script warns about models that are too large to be listed.
+
+MJB files only load in the MuJoCo version that wrote them: install the
+`mujoco` package matching the viewer's mujoco-js build.
+
+  python3 public/examples/scenes/generate_mjb.py
+  python3 public/examples/scenes/generate_mjb.py --robots 1 2 4
+"""
+
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+
+import mujoco
+
+_HERE = Path(__file__).parent
+_GENERATOR = _HERE.parents[2] / "src" / "simulation" / "multiRobotGenerator.js"
+_MAX_ROBOTS = 11
+# Placeholder start positions; Demo.vue always spawns robots at z = 0.8.
+_SPACING = 1.0
+_START_HEIGHT = 0.8
+_MODELS_FILE = "models.json"
+
+# generateMultiRobotXML() fetches the base scene; serve it from disk.
+_NODE_SCRIPT = """
+import { readFileSync } from 'node:fs';
+import { pathToFileURL } from 'node:url';
+const [generator, scene, configs] = process.argv.slice(1);
+globalThis.fetch = async (path) => ({ ok: true, status: 200, text: async () => readFileSync(path, 'utf8') });
+const { generateMultiRobotXML } = await import(pathToFileURL(generator).href);
+process.stdout.write(await generateMultiRobotXML(scene, JSON.parse(configs)));
+"""
+
+
+def _sha256(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _relative(path):
+    return str(path.resolve().relative_to(_HERE.resolve()).as_posix())
+
+
+def _input_files(scene):
+    """The scene XML and every asset file it references."""
+    root = ET.parse(scene).getroot()
+    compiler = root.find("compiler")
+    meshdir = compiler.get("meshdir", ".") if compiler is not None else "."
+    texturedir = compiler.get("texturedir", ".") if compiler is not None else "."
+    files = [scene]
+    for tag, directory in (("mesh", meshdir), ("skin", meshdir), ("hfield", meshdir), ("texture", texturedir)):
+        for element in root.iter(tag):
+            if element.get("file"):
+                files.append(scene.parent / directory / element.get("file"))
+    return {_relative(path): _sha256(path) for path in files}
+
+
+def _layout_xml(scene, robots):
+    if robots == 1:
+        return scene.read_text()
+    configs = [{"x": 0.0, "y": i * _SPACING, "z": _START_HEIGHT} for i in range(robots)]
+    result = subprocess.run(["node", "--input-type=module", "-e", _NODE_SCRIPT, "--",
+                             str(_GENERATOR), str(scene), json.dumps(configs)],
+                            capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def _compile(scene, xml, out_path):
+    # Compile next to the scene so meshdir/texturedir resolve as in the viewer.
+    with tempfile.NamedTemporaryFile("w", dir=scene.parent, suffix=".xml", delete=False) as f:
+        f.write(xml)
+    try:
+        model = mujoco.MjModel.from_xml_path(f.name)
+    finally:
+        Path(f.name).unlink()
+    mujoco.mj_saveModel(model, str(out_path), None)
+    return {"nbody": model.nbody, "njnt": model.njnt, "nu": model.nu, "nmesh": model.nmesh}
+
+
+def _model_name(scene, robots):
+    return f"{scene.stem}.mjb" if robots == 1 else f"{scene.stem}.robots{robots}.mjb"
+
+
+def _load_models(models_path):
+    if not models_path.exists():
+        return {}
+    try:
+        return json.loads(models_path.read_text()).get("models", {})
+    except ValueError:
+        return {}
+
+
+def _build_scene(scene, robot_counts, force):
+    out_dir = scene.parent / "mjb"
+    out_dir.mkdir(exist_ok=True)
+    models_path = out_dir / _MODELS_FILE
+    previous = _load_models(models_path)
+    inputs = _input_files(scene)
+    generator = _sha256(_GENERATOR)
+    version = mujoco.mj_versionString()
+
+    models = {}
+    for robots in robot_counts:
+        name = _model_name(scene, robots)
+        out_path = out_dir / name
+        record = {
+            "source": _relative(scene),
+            "robots": robots,
+            "mujoco": version,
+            "inputs": inputs,
+        }
+        if robots > 1:
+            record["generator"] = generator
+        old = previous.get(name)
+        if (not force and old is not None and out_path.exists()
+                and {key: old.get(key) for key in record} == record and old.get("sha256") == _sha256(out_path)):
+            models[name] = old
+            print(f"Up to date: {out_path}")
+            continue
+        record.update(_compile(scene, _layout_xml(scene, robots), out_path))
+        record["sha256"] = _sha256(out_path)
+        models[name] = record
+        print(f"Compiled {out_path} ({out_path.stat().st_size} bytes)")
+        input_bytes = sum((_HERE / path).stat().st_size for path in inputs)
+        if out_path.stat().st_size > input_bytes:
+            print(f"  warning: larger than its inputs ({input_bytes} bytes); files.json will not list it")
+
+    # Drop models that are no longer built so files.json does not list them.
+    for name in set(previous) - set(models):
+        (out_dir / name).unlink(missing_ok=True)
+    with open(models_path, mode="w") as f:
+        json.dump({"version": 1, "models": dict(sorted(models.items()))}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile scene XMLs into MuJoCo binary models.")
+    parser.add_argument(
+        "--scene",
+        type=Path,
+        nargs="+",
+        default=[_HERE / "g1" / "g1.xml"],
+        help="Scene XML files under this directory."
+    )
+    parser.add_argument(
+        "--robots",
+        type=int,
+        nargs="+",
+        default=list(range(1, _MAX_ROBOTS + 1)),
+        help="Robot counts to build layouts for (1 = the scene as is)."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Recompile models that are up to date."
+    )
+    args = parser.parse_args()
+    if any(not 1 <= robots <= _MAX_ROBOTS for robots in args.robots):
+        parser.error(f"--robots must be between 1 and {_MAX_ROBOTS}")
+
+    for scene in args.scene:
+        _build_scene(scene, sorted(set(args.robots)), args.force)
+    subprocess.run([sys.executable, str(_HERE / "generate_index.py")], check=True)
@@ -7,45 +7,69 @@ Example:
     --policy public/examples/checkpoints/g1/tracking_policy.json \\
     --index public/examples/checkpoints/g1/motions.json \\
     /path/to/05_13_stageii.npz /path/to/55_01_stageii.npz
+
+Bulk ingestion: pass directories (searched recursively for --pattern) or glob
+patterns instead of files, and --jobs N to convert in N worker processes:
+
+  python3 scripts/add_motion_clips.py --jobs 8 --format quantized-delta \
+    /data/AMASS/CMU '/data/AMASS/BMLrub/**/*_stageii.npz'
+
+Progress and throughput are printed as clips finish. Every processed source is
+recorded in a resume journal (<index>.journal.jsonl) once its entry is in the
+index, so an interrupted run picks up where it stopped; --restart ignores it.
+
+Pass --format binary (float32) or --format quantized / quantized-delta (int16)
+to write compact binary clips instead of JSON, and --canonicalize to start
+each clip at the XY origin with zero yaw. Captures recorded at another rate
+are resampled to --fps (the policy control rate) with --source-fps 120 etc.
+--target POLICY_JSON INDEX (repeatable) adds the same sources to several
+policies' libraries in one run, decoding each npz once. Every index needs its
+own clip directory (base_path); targets that share one are refused.
+--validate report|fail|trim checks clips against the G1 model and writes
+<index>.validation.json (see motion_validation.py).
+
+Clips and the index are written atomically (temp file + rename), and the index
+update is a locked read-modify-write, so several processes can add motions to
+the same library at once. Clips are first written to a private staging
+directory and moved into place under the index lock only if their name is
+still new; when another process added the same name first, the staged copy is
+discarded and the motion is reported as skipped.
 """
 
 from __future__ import annotations
 
 import argparse
+import glob
 import json
+import os
 import re
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 
+from atomic_io import atomic_write_text, file_lock
+from joint_remap import load_policy_dataset_joint_names, remap_clip
+from motion_features import clip_features
+from motion_format import OUTPUT_FORMATS, clip_index_entry, entry_files, write_clip
+from motion_transforms import canonicalize_clip, resample_clip, source_frames_for
+from motion_validation import DEFAULT_MODEL, VALIDATION_MODES, check_clip, report_path_for, write_report
+from npz_window import read_npz_member, read_npz_window
+
 
 INDEX_FORMAT = "tracking-motion-index-v1"
 DEFAULT_SUFFIX = "_stageii"
 DEFAULT_MAX_FRAMES = 120 * 50
-
-JOINT_NAMES_29 = [
-    "left_hip_pitch_joint", "left_hip_roll_joint", "left_hip_yaw_joint",
-    "left_knee_joint", "left_ankle_pitch_joint", "left_ankle_roll_joint",
-    "right_hip_pitch_joint", "right_hip_roll_joint", "right_hip_yaw_joint",
-    "right_knee_joint", "right_ankle_pitch_joint", "right_ankle_roll_joint",
-    "waist_yaw_joint", "waist_roll_joint", "waist_pitch_joint",
-    "left_shoulder_pitch_joint", "left_shoulder_roll_joint", "left_shoulder_yaw_joint",
-    "left_elbow_joint", "left_wrist_roll_joint", "left_wrist_pitch_joint", "left_wrist_yaw_joint",
-    "right_shoulder_pitch_joint", "right_shoulder_roll_joint", "right_shoulder_yaw_joint",
-    "right_elbow_joint", "right_wrist_roll_joint", "right_wrist_pitch_joint", "right_wrist_yaw_joint"
-]
-
-JOINT_NAMES_23 = [
-    "left_hip_pitch_joint", "left_hip_roll_joint", "left_hip_yaw_joint",
-    "left_knee_joint", "left_ankle_pitch_joint", "left_ankle_roll_joint",
-    "right_hip_pitch_joint", "right_hip_roll_joint", "right_hip_yaw_joint",
-    "right_knee_joint", "right_ankle_pitch_joint", "right_ankle_roll_joint",
-    "waist_yaw_joint", "left_shoulder_pitch_joint", "left_shoulder_roll_joint",
-    "left_shoulder_yaw_joint", "left_elbow_joint", "left_wrist_roll_joint",
-    "right_shoulder_pitch_joint", "right_shoulder_roll_joint", "right_shoulder_yaw_joint",
-    "right_elbow_joint", "right_wrist_roll_joint"
-]
+DEFAULT_FPS = 50.0
+DEFAULT_PATTERN = "*.npz"
+# Statuses recorded in the resume journal; "failed" sources are retried.
+DONE_STATUSES = ("added", "skipped", "invalid")
 
 
 def sanitize_name(name: str) -> str:
@@ -60,72 +84,33 @@ def derive_motion_name(path: Path) -> str:
     return sanitize_name(stem)
 
 
-def mapping_joints(data: np.ndarray, target: Iterable[str]) -> np.ndarray:
-    data = np.asarray(data, dtype=np.float32)
-    target = list(target)
-    cols = data.shape[1]
-    if cols == len(target):
-        return data.astype(np.float32, copy=True)
-    if cols == len(JOINT_NAMES_29):
-        source = JOINT_NAMES_29
-    elif cols == len(JOINT_NAMES_23):
-        source = JOINT_NAMES_23
-    else:
-        raise ValueError(f"Unsupported joint dimension {cols}")
-    index = {name: i for i, name in enumerate(source)}
-    remapped = np.zeros((data.shape[0], len(target)), dtype=np.float32)
-    for j, name in enumerate(target):
-        i = index.get(name)
-        if i is not None:
-            remapped[:, j] = data[:, i]
-    return remapped
-
-
-def load_policy_dataset_joint_names(policy_path: Path) -> List[str]:
-    config = json.loads(policy_path.read_text())
-    tracking = config.get("tracking") or {}
-    names = tracking.get("dataset_joint_names") or config.get("policy_joint_names")
-    if not names:
-        raise ValueError("Policy config missing tracking.dataset_joint_names or policy_joint_names")
-    return list(names)
-
-
-def to_clip(npz_path: Path, dataset_joint_names: List[str], max_frames: int) -> dict:
-    with np.load(npz_path, allow_pickle=True) as data:
-        joint_pos = np.asarray(data["dof_pos"], dtype=np.float32)
-        root_pos = np.asarray(data["root_pos"], dtype=np.float32)
-        root_rot_xyzw = np.asarray(data["root_rot"], dtype=np.float32)
-
-        if joint_pos.shape[0] > max_frames:
-            joint_pos = joint_pos[:max_frames]
-            root_pos = root_pos[:max_frames]
-            root_rot_xyzw = root_rot_xyzw[:max_frames]
-
-        joint_names = data.get("joint_names", None)
-        if joint_names is not None:
-            src_names = joint_names.tolist()
-            target_names = list(dataset_joint_names)
-            if src_names != target_names:
-                name_to_idx = {n: i for i, n in enumerate(src_names)}
-                remap = np.zeros((joint_pos.shape[0], len(target_names)), dtype=np.float32)
-                for i, n in enumerate(target_names):
-                    j = name_to_idx.get(n)
-                    if j is not None:
-                        remap[:, i] = joint_pos[:, j]
-                joint_pos = remap
-        else:
-            joint_pos = mapping_joints(joint_pos, dataset_joint_names)
+def load_source_clip(npz_path: Path,
+                     max_frames: Optional[int],
+                     source_fps: float = DEFAULT_FPS,
+                     target_fps: float = DEFAULT_FPS) -> Tuple[dict, Optional[List[str]]]:
+    """Decode and resample a source, keeping its joint order; returns ``(clip, source joint names)``."""
+    # Only the source rows behind the first max_frames output frames are read,
+    # so long captures stay cheap.
+    max_source = source_frames_for(max_frames, source_fps, target_fps)
+    window = read_npz_window(npz_path, ("dof_pos", "root_pos", "root_rot"), 0, None, max_source)
+    joint_pos = np.asarray(window["dof_pos"], dtype=np.float32)
+    root_pos = np.asarray(window["root_pos"], dtype=np.float32)
+    root_rot_xyzw = np.asarray(window["root_rot"], dtype=np.float32)
+
+    joint_names = read_npz_member(npz_path, "joint_names")
+    source_names = joint_names.tolist() if joint_names is not None else None
 
-        if root_pos.ndim == 3:
-            root_pos = root_pos[:, 0, :]
+    if root_pos.ndim == 3:
+        root_pos = root_pos[:, 0, :]
 
-        root_quat = np.concatenate([root_rot_xyzw[:, 3:4], root_rot_xyzw[:, :3]], axis=-1)
+    root_quat = np.concatenate([root_rot_xyzw[:, 3:4], root_rot_xyzw[:, :3]], axis=-1)
 
-        return {
-            "joint_pos": joint_pos.tolist(),
-            "root_quat": root_quat.tolist(),
-            "root_pos": root_pos.tolist()
-        }
+    clip = {
+        "joint_pos": joint_pos,
+        "root_quat": root_quat,
+        "root_pos": root_pos
+    }
+    return resample_clip(clip, source_fps, target_fps, max_frames), source_names
 
 
 def load_or_init_index(index_path: Path) -> Tuple[dict, List[dict]]:
@@ -149,6 +134,115 @@ def resolve_motions_dir(index_path: Path, index: dict, override: Path | None) ->
     return (index_path.parent / Path(base_path)).resolve()
 
 
+def expand_inputs(inputs: Iterable[str], pattern: str) -> List[Path]:
+    """Expand files, directories (recursive ``pattern``) and globs into sorted npz paths."""
+    paths: List[Path] = []
+    seen = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            found = sorted(path.rglob(pattern))
+        elif glob.has_magic(item):
+            found = sorted(Path(p) for p in glob.glob(item, recursive=True))
+        elif path.exists():
+            found = [path]
+        else:
+            raise FileNotFoundError(path)
+        for candidate in found:
+            key = candidate.resolve()
+            if candidate.is_file() and key not in seen:
+                seen.add(key)
+                paths.append(candidate)
+    return paths
+
+
+def journal_path_for(index_path: Path) -> Path:
+    return index_path.with_name(f"{index_path.stem}.journal.jsonl")
+
+
+def load_journal(path: Path) -> Dict[str, str]:
+    """Return ``{resolved source path: last status}`` from a resume journal."""
+    statuses: Dict[str, str] = {}
+    if not path.exists():
+        return statuses
+    with path.open() as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn last line from an interrupted run
+            statuses[record["path"]] = record["status"]
+    return statuses
+
+
+def append_journal(path: Path, records: List[dict]) -> None:
+    if not records:
+        return
+    payload = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+    # Parallel runs share the journal; the lock keeps their lines whole.
+    with file_lock(path), path.open("a") as f:
+        f.write(payload)
+        f.flush()
+
+
+def convert_motion(task: Tuple[Path, str, Tuple[int, ...]],
+                   targets: Sequence[Tuple[List[str], Path]],
+                   max_frames: Optional[int],
+                   source_fps: float,
+                   target_fps: float,
+                   fmt: str,
+                   canonicalize: bool,
+                   validate: Optional[str],
+                   model_path: Path) -> dict:
+    """Convert one source for the targets in ``task``.
+
+    The npz is decoded once and remapped per target ``(dataset_joint_names,
+    motions_dir)``. Clips are written to a staging directory inside
+    ``motions_dir`` (``result["staged"]``); ``commit_entries`` moves them into
+    place. Never raises, so one bad file cannot stop a bulk run.
+    """
+    path, name, target_ids = task
+    result = {"path": str(path.resolve()), "name": name, "frames": 0, "status": "invalid",
+              "entries": {}, "staged": {}, "reports": {}}
+    try:
+        source, source_names = load_source_clip(path, max_frames, source_fps, target_fps)
+        for target_id in target_ids:
+            dataset_joint_names, motions_dir = targets[target_id]
+            clip = remap_clip(source, dataset_joint_names, source_names)
+            if validate:
+                clip, result["reports"][target_id] = check_clip(name, clip, dataset_joint_names, target_fps,
+                                                                validate, model_path)
+                if clip is None:
+                    continue
+            if canonicalize:
+                clip = canonicalize_clip(clip)
+            entry = clip_index_entry(name, fmt)
+            if canonicalize:
+                entry["canonical"] = True
+            entry["features"] = clip_features(clip, target_fps)
+            staging_dir = Path(tempfile.mkdtemp(prefix=".staging-", dir=motions_dir))
+            try:
+                write_clip(staging_dir, name, clip, fmt)
+            except BaseException:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise
+            result["staged"][target_id] = str(staging_dir)
+            result["entries"][target_id] = entry
+            result["frames"] = int(clip["joint_pos"].shape[0])
+            result["status"] = "added"
+    except Exception as exc:  # noqa: BLE001 - reported and journaled as failed
+        result["status"] = "failed"
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    return result
+
+
+def progress_line(done: int, total: int, frames: int, elapsed: float) -> str:
+    elapsed = max(elapsed, 1e-9)
+    rate = done / elapsed
+    eta = (total - done) / rate if rate > 0 else 0.0
+    return f"[{done}/{total}] {rate:.1f} clips/s, {frames / elapsed:.0f} frames/s, eta {eta:.0f}s"
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Convert .npz motions to JSON clips and update an index.")
     parser.add_argument(
@@ -163,56 +257,273 @@ def parse_args() -> argparse.Namespace:
         default=Path("public/examples/checkpoints/g1/motions.json"),
         help="Motion index JSON path."
     )
+    parser.add_argument(
+        "--target",
+        nargs=2,
+        action="append",
+        type=Path,
+        default=[],
+        metavar=("POLICY_JSON", "INDEX"),
+        help="Policy config and motion index to add clips to, instead of --policy/--index. "
+             "Repeat for several policies; each source is decoded once for all of them."
+    )
     parser.add_argument(
         "--motions-dir",
         type=Path,
         default=None,
-        help="Output directory for per-motion JSON files."
+        help="Output directory for per-motion JSON files (single target only)."
     )
     parser.add_argument(
         "--max-frames",
         type=int,
         default=DEFAULT_MAX_FRAMES,
-        help="Maximum frames per clip."
+        help="Maximum frames per clip; 0 keeps full-length clips (JSON clips are streamed, "
+             "so memory does not grow with length)."
+    )
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=DEFAULT_FPS,
+        help="Frame rate of the written clips, i.e. the policy control rate (default: 50)."
+    )
+    parser.add_argument(
+        "--source-fps",
+        type=float,
+        default=None,
+        help="Frame rate of the input .npz files; they are resampled to --fps (default: --fps)."
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help="Per-motion file encoding: json (default), binary float32 clips, "
+             "or quantized / quantized-delta int16 clips."
+    )
+    parser.add_argument(
+        "--canonicalize",
+        action="store_true",
+        help="Start every clip at the XY origin with zero yaw (flagged in the index)."
+    )
+    parser.add_argument(
+        "--validate",
+        choices=VALIDATION_MODES,
+        default=None,
+        help="Check clips against the robot model and write <index>.validation.json: "
+             "report only, fail on invalid clips, or trim them to their longest valid run."
+    )
+    parser.add_argument(
+        "--model",
+        type=Path,
+        default=DEFAULT_MODEL,
+        help="MJCF used for joint limits when validating (default: the bundled g1.xml)."
     )
     parser.add_argument(
         "motions",
         nargs="+",
-        help="One or more .npz motion paths."
+        help="One or more .npz files, directories (searched recursively) or glob patterns."
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--pattern",
+        default=DEFAULT_PATTERN,
+        help="File pattern used when an input is a directory (default: *.npz)."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to convert motions (default: 1)."
+    )
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=500,
+        help="Add converted clips to the index (and journal) in batches of this size (default: 500)."
+    )
+    parser.add_argument(
+        "--journal",
+        type=Path,
+        default=None,
+        help="Resume journal path (default: <index>.journal.jsonl next to the index)."
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the resume journal and reconsider every input."
+    )
+    args = parser.parse_args()
+    if args.motions_dir and len(args.target) > 1:
+        parser.error("--motions-dir cannot be combined with several --target options")
+    args.target = [tuple(target) for target in args.target] or [(args.policy, args.index)]
+    # Each target writes its clips in its own joint order under the same names,
+    # so targets sharing a clip directory would overwrite each other.
+    seen: Dict[Path, Path] = {}
+    for _, index_path in args.target:
+        index, _ = load_or_init_index(index_path)
+        motions_dir = resolve_motions_dir(index_path, index, args.motions_dir).resolve()
+        if motions_dir in seen:
+            parser.error(f"{seen[motions_dir]} and {index_path} both keep their clips in {motions_dir}; "
+                         "give each index its own base_path")
+        seen[motions_dir] = index_path
+    return args
+
+
+def commit_entries(index_path: Path,
+                   motions_dir: Path,
+                   new_entries: List[Tuple[dict, Path]]) -> List[str]:
+    """Add staged clips ``(entry, staging_dir)`` to the index under its lock.
+
+    The index is re-read inside the lock, so entries added by other processes
+    since this run started are kept, and replaced atomically. A staged clip is
+    renamed into ``motions_dir`` only if its name is still new; otherwise
+    another process got there first and the staged copy is discarded. Returns
+    the names that were skipped that way.
+    """
+    skipped = []
+    with file_lock(index_path):
+        index, motions = load_or_init_index(index_path)
+        existing = {entry.get("name") for entry in motions if isinstance(entry, dict)}
+        for entry, staging_dir in new_entries:
+            if entry["name"] in existing:
+                skipped.append(entry["name"])
+            else:
+                for file_name in entry_files(entry):
+                    os.replace(staging_dir / file_name, motions_dir / file_name)
+                motions.append(entry)
+                existing.add(entry["name"])
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        index["motions"] = motions
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(index_path, json.dumps(index, ensure_ascii=False, indent=2))
+    return skipped
+
+
+def discard_staged(results: Iterable[dict]) -> None:
+    """Remove the staging directories of results that will not be committed."""
+    for result in results:
+        for staging_dir in result["staged"].values():
+            shutil.rmtree(staging_dir, ignore_errors=True)
 
 
 def main() -> None:
     args = parse_args()
-    dataset_joint_names = load_policy_dataset_joint_names(args.policy)
-    index, motions = load_or_init_index(args.index)
-    motions_dir = resolve_motions_dir(args.index, index, args.motions_dir)
-    motions_dir.mkdir(parents=True, exist_ok=True)
-
-    existing = {entry.get("name") for entry in motions if isinstance(entry, dict)}
-    added = 0
+    targets = []
+    existing = []
+    for policy_path, index_path in args.target:
+        # Snapshot used to skip motions that are already indexed; the authoritative
+        # read-modify-write happens under the lock in commit_entries.
+        index, motions = load_or_init_index(index_path)
+        motions_dir = resolve_motions_dir(index_path, index, args.motions_dir)
+        motions_dir.mkdir(parents=True, exist_ok=True)
+        targets.append((load_policy_dataset_joint_names(policy_path), motions_dir))
+        existing.append({entry.get("name") for entry in motions if isinstance(entry, dict)})
+    index_paths = [index_path for _, index_path in args.target]
+
+    source_fps = args.source_fps or args.fps
+    journal_path = args.journal or journal_path_for(index_paths[0])
+    journal = {} if args.restart else load_journal(journal_path)
+    if args.restart and journal_path.exists():
+        journal_path.unlink()
+
+    tasks = []
     skipped = 0
-
-    for motion_path in args.motions:
-        path = Path(motion_path)
-        if not path.exists():
-            raise FileNotFoundError(path)
+    resumed = 0
+    for path in expand_inputs(args.motions, args.pattern):
+        if journal.get(str(path.resolve())) in DONE_STATUSES:
+            resumed += 1
+            continue
         name = derive_motion_name(path)
-        if name in existing:
-            skipped += 1
+        target_ids = tuple(i for i, names in enumerate(existing) if name not in names)
+        skipped += len(targets) - len(target_ids)
+        if not target_ids:
             continue
-        clip = to_clip(path, dataset_joint_names, args.max_frames)
-        out_path = motions_dir / f"{name}.json"
-        out_path.write_text(json.dumps(clip, ensure_ascii=False, indent=2))
-        motions.append({"name": name, "file": f"{name}.json"})
-        existing.add(name)
-        added += 1
-
-    index["motions"] = motions
-    args.index.parent.mkdir(parents=True, exist_ok=True)
-    args.index.write_text(json.dumps(index, ensure_ascii=False, indent=2))
-    print(f"Added {added} motion(s), skipped {skipped}.")
+        for i in target_ids:
+            existing[i].add(name)
+        tasks.append((path, name, target_ids))
+    if resumed:
+        print(f"Resuming: {resumed} source(s) already processed according to {journal_path}")
+
+    worker = partial(convert_motion,
+                     targets=tuple(targets),
+                     max_frames=args.max_frames or None,
+                     source_fps=source_fps,
+                     target_fps=args.fps,
+                     fmt=args.format,
+                     canonicalize=args.canonicalize,
+                     validate=args.validate,
+                     model_path=args.model)
+    # In fail mode nothing may reach the index before every clip has passed.
+    commit_every = 0 if args.validate == "fail" else max(1, args.commit_every)
+    reports: List[List[dict]] = [[] for _ in targets]
+    pending: List[dict] = []
+    added = 0
+    failed = 0
+    done = 0
+    frames = 0
+    start = time.monotonic()
+    last_report = 0.0
+
+    def flush() -> None:
+        nonlocal added, skipped
+        raced = set()
+        for target_id, (index_path, (_, motions_dir)) in enumerate(zip(index_paths, targets)):
+            entries = [(result["entries"][target_id], Path(result["staged"][target_id]))
+                       for result in pending if target_id in result["entries"]]
+            lost = commit_entries(index_path, motions_dir, entries)
+            for name in lost:
+                print(f"Skipped {name}: already added to {index_path} by another process")
+                raced.add((target_id, name))
+            added += len(entries) - len(lost)
+            skipped += len(lost)
+        for result in pending:
+            # A motion every target got from another process counts as skipped.
+            if result["entries"] and all((i, result["name"]) in raced for i in result["entries"]):
+                result["status"] = "skipped"
+        # Journal only after the indexes hold the entries, so a crash in between
+        # re-converts them instead of losing them.
+        append_journal(journal_path, [{"path": r["path"], "name": r["name"], "status": r["status"]}
+                                      for r in pending])
+        pending.clear()
+
+    def handle(result: dict) -> None:
+        nonlocal failed, skipped, done, frames, last_report
+        done += 1
+        frames += result["frames"]
+        now = time.monotonic()
+        if now - last_report >= 1.0 or done == len(tasks):
+            last_report = now
+            print(progress_line(done, len(tasks), frames, now - start), file=sys.stderr, flush=True)
+        for target_id, report in result["reports"].items():
+            reports[target_id].append(report)
+        if result["status"] == "failed":
+            failed += 1
+            print(f"Failed {result['path']}: {result['error']}", file=sys.stderr)
+        else:
+            skipped += sum(1 for i in result["reports"] if i not in result["entries"])
+        pending.append(result)
+        if commit_every and len(pending) >= commit_every:
+            flush()
+
+    if args.jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            for result in executor.map(worker, tasks, chunksize=4):
+                handle(result)
+    else:
+        for task in tasks:
+            handle(worker(task))
+
+    if args.validate:
+        invalid = 0
+        for index_path, target_reports in zip(index_paths, reports):
+            report_path = report_path_for(index_path)
+            target_invalid = write_report(report_path, target_reports, args.validate)
+            print(f"Validated {len(target_reports)} clip(s), {target_invalid} invalid; report at {report_path}")
+            invalid += target_invalid
+        if invalid and args.validate == "fail":
+            discard_staged(pending)
+            raise ValueError(f"{invalid} motion(s) failed validation; index left unchanged")
+
+    flush()
+    print(f"Added {added} motion(s), skipped {skipped}, failed {failed}.")
 
 
 if __name__ == "__main__":
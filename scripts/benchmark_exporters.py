@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Throughput and memory benchmark for the motion exporters.
+
+Generates synthetic npz bundles (bare 23- and 29-DoF ``dof_pos`` layouts, one
+bundle per ``--lengths`` entry) and runs each exporter once per output mode in
+a fresh output directory:
+
+  * ``export_tracking_motions.py``     - combined JSON,
+  * ``export_tracking_motions_npz.py`` - every ``--format``,
+  * ``add_motion_clips.py``            - every ``--format``.
+
+Each run is a separate process, measured for wall time, peak RSS (from
+``wait4``, so Linux/macOS only), exported frames per second and output bytes.
+Results are appended to a JSON history together with the git commit, so runs
+from different commits can be compared; the previous run of each case is
+printed alongside. Everything runs offline on synthetic data:
+
+  python3 scripts/benchmark_exporters.py --history benchmarks/history.json
+  python3 scripts/benchmark_exporters.py --lengths 600 60000 --formats binary --repeat 3
+
+Exporters run with a single worker so numbers are comparable across machines.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import yaml
+
+from atomic_io import atomic_write_text
+from joint_remap import JOINT_NAMES_23, JOINT_NAMES_29
+from motion_format import OUTPUT_FORMATS
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+HISTORY_FORMAT = "motion-export-benchmark-v1"
+DEFAULT_LENGTHS = (300, 3000, 30000)
+LAYOUTS = {"29dof": JOINT_NAMES_29, "23dof": JOINT_NAMES_23}
+EXPORTERS = ("export_tracking_motions", "export_tracking_motions_npz", "add_motion_clips")
+FPS = 50.0
+# Bookkeeping files next to the outputs that are not served to the viewer.
+_BOOKKEEPING_SUFFIXES = (".manifest.json", ".journal.jsonl", ".lock", ".validation.json")
+
+
+def synthetic_bundle(path: Path, frames: int, dof: int, seed: int) -> None:
+    """Write a smooth motion with ``dof`` bare joint columns, walking a 3 m circle.
+
+    The root stays within a few metres, like real captures, so the int16
+    quantized formats stay inside their error limits at any length.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames, dtype=np.float64)[:, None] / FPS
+    freq = rng.uniform(0.3, 2.0, size=(1, dof))
+    phase = rng.uniform(0.0, 2.0 * np.pi, size=(1, dof))
+    dof_pos = 0.4 * np.sin(2.0 * np.pi * freq * t + phase)
+
+    angle = (0.8 / 3.0) * t[:, 0]
+    yaw = angle + 0.5 * np.pi
+    root_pos = np.stack([3.0 * np.cos(angle), 3.0 * np.sin(angle), 0.78 + 0.02 * np.sin(6.0 * t[:, 0])], axis=1)
+    root_rot = np.stack([np.zeros(frames), np.zeros(frames), np.sin(0.5 * yaw), np.cos(0.5 * yaw)], axis=1)  # xyzw
+    np.savez(path, dof_pos=dof_pos.astype(np.float32), root_pos=root_pos.astype(np.float32),
+             root_rot=root_rot.astype(np.float32))
+
+
+def prepare_inputs(work_dir: Path, layout: str, lengths: Sequence[int]) -> Dict[str, object]:
+    """Write the bundles, exporter config and policy config for one layout."""
+    data_dir = work_dir / layout
+    data_dir.mkdir(parents=True, exist_ok=True)
+    dof = len(LAYOUTS[layout])
+    bundles = []
+    for i, frames in enumerate(lengths):
+        path = data_dir / f"clip{i}_{frames}.npz"
+        if not path.exists():
+            synthetic_bundle(path, frames, dof, seed=i)
+        bundles.append(path)
+
+    dataset_joint_names = list(JOINT_NAMES_29)
+    config = {
+        "dataset_joint_names": dataset_joint_names,
+        "motions": [{"name": path.stem, "path": path.name} for path in bundles],
+        "motion_clips": [{
+            "name": "default",
+            "joint_pos": [0.0] * len(dataset_joint_names),
+            "root_quat": [1.0, 0.0, 0.0, 0.0],
+            "root_pos": [0.0, 0.0, 0.78]
+        }]
+    }
+    config_path = data_dir / "tracking.yaml"
+    config_path.write_text(yaml.safe_dump(config, sort_keys=False))
+    policy_path = data_dir / "policy.json"
+    policy_path.write_text(json.dumps({"tracking": {"dataset_joint_names": dataset_joint_names}}))
+    return {"dir": data_dir, "bundles": bundles, "config": config_path, "policy": policy_path,
+            "frames": int(sum(lengths))}
+
+
+def exporter_command(exporter: str, fmt: str, inputs: Dict[str, object], out_dir: Path) -> List[str]:
+    script = str(SCRIPTS_DIR / f"{exporter}.py")
+    if exporter == "export_tracking_motions":
+        return [sys.executable, script, "--config", str(inputs["config"]), "--repo-root", str(inputs["dir"]),
+                "--output", str(out_dir / "motions.json")]
+    if exporter == "export_tracking_motions_npz":
+        return [sys.executable, script, "--config", str(inputs["config"]), "--repo-root", str(inputs["dir"]),
+                "--output", str(out_dir / "motions.json"), "--format", fmt, "--max-frames", "0", "--jobs", "1"]
+    return [sys.executable, script, "--policy", str(inputs["policy"]), "--index", str(out_dir / "motions.json"),
+            "--format", fmt, "--max-frames", "0", "--jobs", "1", *(str(path) for path in inputs["bundles"])]
+
+
+def output_bytes(out_dir: Path) -> int:
+    return sum(path.stat().st_size for path in out_dir.rglob("*")
+               if path.is_file() and not path.name.endswith(_BOOKKEEPING_SUFFIXES))
+
+
+def run_case(command: List[str], out_dir: Path, frames: int) -> Dict[str, object]:
+    """Run one export in a clean ``out_dir`` and measure it."""
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True)
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, cwd=SCRIPTS_DIR)
+    stderr = proc.stderr.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} failed:\n{stderr.decode(errors='replace')}")
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return {
+        "wall_s": round(wall, 4),
+        "frames_per_s": round(frames / wall, 1),
+        "peak_rss_mb": round(rss / (1 << 20), 1),
+        "output_bytes": output_bytes(out_dir)
+    }
+
+
+def git_commit() -> Dict[str, object]:
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.run(["git", *args], cwd=SCRIPTS_DIR, capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def load_history(path: Path) -> Dict[str, object]:
+    if path.exists():
+        history = json.loads(path.read_text())
+        if history.get("format") == HISTORY_FORMAT and isinstance(history.get("runs"), list):
+            return history
+    return {"format": HISTORY_FORMAT, "runs": []}
+
+
+def previous_results(history: Dict[str, object]) -> Dict[str, Dict[str, object]]:
+    """Latest recorded result per case."""
+    latest: Dict[str, Dict[str, object]] = {}
+    for run in history["runs"]:
+        for result in run.get("results", []):
+            latest[result["case"]] = result
+    return latest
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the motion exporters on synthetic npz bundles.")
+    parser.add_argument(
+        "--history",
+        type=Path,
+        default=Path("benchmark_history.json"),
+        help="JSON history file the results are appended to."
+    )
+    parser.add_argument(
+        "--lengths",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_LENGTHS),
+        help="Frame counts of the synthetic bundles (one bundle each)."
+    )
+    parser.add_argument(
+        "--layouts",
+        nargs="+",
+        choices=sorted(LAYOUTS),
+        default=sorted(LAYOUTS, reverse=True),
+        help="Source DoF layouts to generate."
+    )
+    parser.add_argument(
+        "--exporters",
+        nargs="+",
+        choices=EXPORTERS,
+        default=list(EXPORTERS),
+        help="Exporters to benchmark."
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=OUTPUT_FORMATS,
+        default=list(OUTPUT_FORMATS),
+        help="Output formats for the per-clip exporters."
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Runs per case; the fastest is recorded."
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=Path,
+        default=None,
+        help="Directory for synthetic inputs and outputs (default: a temporary directory)."
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    history = load_history(args.history)
+    previous = previous_results(history)
+    work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix="motion-bench-"))
+    results = []
+    try:
+        for layout in args.layouts:
+            inputs = prepare_inputs(work_dir, layout, args.lengths)
+            for exporter in args.exporters:
+                formats = ["json"] if exporter == "export_tracking_motions" else args.formats
+                for fmt in formats:
+                    case = f"{exporter}/{fmt}/{layout}"
+                    command = exporter_command(exporter, fmt, inputs, work_dir / "out")
+                    runs = [run_case(command, work_dir / "out", inputs["frames"]) for _ in range(max(1, args.repeat))]
+                    best = min(runs, key=lambda run: run["wall_s"])
+                    result = {"case": case, "exporter": exporter, "format": fmt, "layout": layout,
+                              "frames": inputs["frames"], **best}
+                    results.append(result)
+                    line = (f"{case:48s} {best['frames_per_s']:>12.0f} frames/s {best['peak_rss_mb']:>8.1f} MB "
+                            f"{best['output_bytes']:>12d} B {best['wall_s']:>8.2f} s")
+                    if case in previous and previous[case]["frames"] == result["frames"]:
+                        change = best["frames_per_s"] / previous[case]["frames_per_s"] - 1.0
+                        line += f"  ({change:+.1%} vs previous)"
+                    print(line, flush=True)
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    history["runs"].append({
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **git_commit(),
+        "host": {"platform": platform.platform(), "python": platform.python_version(), "numpy": np.__version__,
+                 "cpus": os.cpu_count()},
+        "lengths": args.lengths,
+        "repeat": args.repeat,
+        "results": results
+    })
+    args.history.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(args.history, json.dumps(history, indent=2))
+    print(f"Appended {len(results)} result(s) to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
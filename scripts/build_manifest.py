@@ -0,0 +1,125 @@
+"""
+Build manifest used by the motion exporters for incremental re-export.
+
+The manifest lives next to the motion index (``motions.json`` ->
+``motions.manifest.json``) and records, per output clip file, the inputs that
+produced it: the source npz content hash (with size/mtime so unchanged files are
+not re-hashed), the ``start``/``end`` slice, a hash of ``dataset_joint_names``,
+the output encoding and the exporter version. A clip is rebuilt only when one
+of those inputs differs or one of its output files is missing. Each record also
+keeps what the build produced (``outputs`` file names, the index ``entry``,
+any ``validation`` report, or the clip's byte ``span`` in a combined output) so skipped clips can be re-listed without being
+reloaded.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from atomic_io import atomic_write_text
+
+
+MANIFEST_FORMAT = "tracking-motion-manifest-v1"
+_HASH_CHUNK = 1 << 20
+# Record keys describing build products rather than inputs.
+_PRODUCT_KEYS = ("outputs", "entry", "validation", "span")
+
+
+def manifest_path_for(index_path: Path) -> Path:
+    return index_path.with_name(f"{index_path.stem}.manifest.json")
+
+
+def hash_bytes(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+def hash_json(value: object) -> str:
+    return hash_bytes(json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(path: Path) -> Dict[str, object]:
+    if path.exists():
+        manifest = json.loads(path.read_text())
+        if manifest.get("format") == MANIFEST_FORMAT and isinstance(manifest.get("clips"), dict):
+            return manifest
+    return {"format": MANIFEST_FORMAT, "clips": {}}
+
+
+def save_manifest(path: Path, manifest: Dict[str, object]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, json.dumps(manifest, ensure_ascii=False, indent=2))
+
+
+def source_fingerprint(path: Path, previous: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+    """Describe a source file; reuse the previous hash when size and mtime match."""
+    stat = path.stat()
+    previous = previous or {}
+    if previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns and previous.get("sha256"):
+        digest = previous["sha256"]
+    else:
+        digest = hash_file(path)
+    return {"path": str(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+
+
+def clip_record(source: Dict[str, object], **inputs: object) -> Dict[str, object]:
+    record = {"source": source}
+    record.update(inputs)
+    return record
+
+
+def _comparable(record: Dict[str, object]) -> Dict[str, object]:
+    # mtime/size/path only gate re-hashing; the content hash decides freshness.
+    comparable = {key: value for key, value in record.items() if key not in _PRODUCT_KEYS}
+    source = comparable.get("source")
+    if isinstance(source, dict):
+        comparable["source"] = source.get("sha256")
+    return comparable
+
+
+def same_inputs(previous: Optional[Dict[str, object]], record: Dict[str, object]) -> bool:
+    return previous is not None and _comparable(previous) == _comparable(record)
+
+
+def record_outputs(key: str, record: Dict[str, object]) -> List[str]:
+    outputs = record.get("outputs")
+    return list(outputs) if isinstance(outputs, list) else [key]
+
+
+def is_fresh(manifest: Dict[str, object], key: str, output_dir: Path, record: Dict[str, object]) -> bool:
+    previous = manifest["clips"].get(key)
+    if not same_inputs(previous, record):
+        return False
+    return all((output_dir / name).exists() for name in record_outputs(key, previous))
+
+
+def previous_source(manifest: Dict[str, object], file_name: str) -> Optional[Dict[str, object]]:
+    previous = manifest["clips"].get(file_name)
+    if isinstance(previous, dict) and isinstance(previous.get("source"), dict):
+        return previous["source"]
+    return None
+
+
+def remove_orphans(manifest: Dict[str, object], output_dir: Path, records: Dict[str, Dict[str, object]]) -> int:
+    """Delete files the previous manifest produced that no current record still owns."""
+    keep = set()
+    for key, record in records.items():
+        keep.update(record_outputs(key, record))
+    removed = 0
+    for key, previous in manifest["clips"].items():
+        for name in record_outputs(key, previous):
+            orphan = output_dir / name
+            if name not in keep and orphan.exists():
+                orphan.unlink()
+                removed += 1
+    return removed
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Write precompressed ``.gz`` / ``.br`` variants of the static viewer artifacts.
+
+Run after exporting motions or regenerating ``scenes/files.json``:
+
+  python3 scripts/compress_artifacts.py --jobs 8
+
+Artifacts are the scene assets listed in ``scenes/files.json``, the clips of
+every motion index (``tracking-motion-index-v1`` JSON under ``checkpoints/``),
+the ONNX models and the policy/index JSON files themselves. Each is compressed
+in a worker pool; a variant whose mtime already equals its source's is up to
+date and skipped (``--force`` rewrites them). Variants that save less than
+``MIN_SAVING`` are not kept, so hosts fall back to the raw file; a zero-byte
+``<file>.<suffix>.none`` marker stamped with the source mtime records that, so
+the source is not recompressed until it changes. Motion packs
+are left alone: they are read with ``Range`` requests, which must address the
+raw bytes.
+
+Raw size, SHA-256 and the size of each kept variant are recorded per clip in
+the motion index (``size``/``sha256``/``compressed`` on the entry or on each
+chunk) and per asset in ``files.json``; other keys of an entry (such as the
+``model`` record of a precompiled ``.mjb``) are kept. Exporter bookkeeping
+files (manifests, journals, validation and duplicate reports) are not served
+and are not compressed.
+
+Brotli needs the optional ``brotli`` package; without it only ``.gz`` files are
+written.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from add_motion_clips import INDEX_FORMAT, load_or_init_index, resolve_motions_dir
+from atomic_io import atomic_write_bytes, atomic_write_text, file_lock
+from motion_format import PACK_EXTENSION
+
+
+DEFAULT_ROOT = Path("public/examples")
+MIN_SAVING = 0.05
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+# Already-compressed formats only get size and hash metadata.
+STORED_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp", ".gz", ".br")
+NO_SAVING_SUFFIX = ".none"
+# Files the exporters keep next to their outputs; the viewer never fetches them.
+BOOKKEEPING_SUFFIXES = (".manifest.json", ".journal.jsonl", ".lock", ".validation.json", ".duplicates.json")
+
+
+def _compressors() -> Dict[str, object]:
+    compressors = {"gz": lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        compressors["br"] = lambda data: brotli.compress(data, quality=BROTLI_QUALITY)
+    return compressors
+
+
+def compress_file(path: Path, force: bool = False) -> Dict[str, object]:
+    """Write the variants of ``path`` that are out of date and describe them."""
+    data = path.read_bytes()
+    source = path.stat()
+    info: Dict[str, object] = {"size": len(data), "sha256": hashlib.sha256(data).hexdigest(), "compressed": {}}
+    if path.suffix.lower() in STORED_SUFFIXES:
+        return info
+    for suffix, compress in _compressors().items():
+        out = path.with_name(f"{path.name}.{suffix}")
+        marker = path.with_name(f"{out.name}{NO_SAVING_SUFFIX}")
+        if not force and out.exists() and out.stat().st_mtime_ns == source.st_mtime_ns:
+            info["compressed"][suffix] = out.stat().st_size
+            continue
+        if not force and marker.exists() and marker.stat().st_mtime_ns == source.st_mtime_ns:
+            continue
+        payload = compress(data)
+        if len(payload) > len(data) * (1.0 - MIN_SAVING):
+            out.unlink(missing_ok=True)
+            written = marker
+            atomic_write_bytes(marker, b"")
+        else:
+            marker.unlink(missing_ok=True)
+            written = out
+            atomic_write_bytes(out, payload)
+            info["compressed"][suffix] = len(payload)
+        # Stamp the source mtime so an unchanged source is recognised next run.
+        os.utime(written, ns=(source.st_atime_ns, source.st_mtime_ns))
+    return info
+
+
+def compress_all(paths: Iterable[Path], jobs: int, force: bool) -> Dict[Path, Dict[str, object]]:
+    paths = sorted(set(paths))
+    worker = partial(compress_file, force=force)
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(worker, paths, chunksize=4))
+    else:
+        results = [worker(path) for path in paths]
+    return dict(zip(paths, results))
+
+
+def find_motion_indexes(root: Path) -> List[Path]:
+    indexes = []
+    for path in sorted((root / "checkpoints").rglob("*.json")):
+        try:
+            # Cheap prefix check so clip JSON files are not parsed.
+            with path.open("rb") as f:
+                if INDEX_FORMAT.encode("ascii") not in f.read(256):
+                    continue
+            index = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if isinstance(index, dict) and index.get("format") == INDEX_FORMAT:
+            indexes.append(path)
+    return indexes
+
+
+def _clip_parts(entry: Dict[str, object]) -> List[Dict[str, object]]:
+    # The dicts whose "file" names a clip: the entry itself or each chunk.
+    if isinstance(entry.get("chunks"), list):
+        return [chunk for chunk in entry["chunks"] if isinstance(chunk, dict)]
+    return [entry] if "file" in entry else []
+
+
+def index_clip_paths(index_path: Path) -> List[Path]:
+    index, motions = load_or_init_index(index_path)
+    motions_dir = resolve_motions_dir(index_path, index, None)
+    return [motions_dir / str(part["file"])
+            for entry in motions if isinstance(entry, dict)
+            for part in _clip_parts(entry)]
+
+
+def annotate_index(index_path: Path, results: Dict[Path, Dict[str, object]]) -> int:
+    """Record clip sizes and hashes in the index; returns the number of clips annotated."""
+    annotated = 0
+    with file_lock(index_path):
+        index, motions = load_or_init_index(index_path)
+        motions_dir = resolve_motions_dir(index_path, index, None)
+        for entry in motions:
+            if not isinstance(entry, dict):
+                continue
+            for part in _clip_parts(entry):
+                info = results.get(motions_dir / str(part["file"]))
+                if info is not None:
+                    part.update(info)
+                    annotated += 1
+        index["motions"] = motions
+        atomic_write_text(index_path, json.dumps(index, ensure_ascii=False, indent=2))
+    return annotated
+
+
+def load_scene_files(files_json: Path) -> List[str]:
+    """Asset paths from ``files.json`` (plain strings or annotated objects)."""
+    entries = json.loads(files_json.read_text())
+    return [entry if isinstance(entry, str) else entry["path"] for entry in entries]
+
+
+def annotate_scene_files(files_json: Path, results: Dict[Path, Dict[str, object]]) -> None:
+    """Update ``size``/``sha256``/``compressed`` of each ``files.json`` entry, keeping its other keys."""
+    entries = []
+    for entry in json.loads(files_json.read_text()):
+        entry = {"path": entry} if isinstance(entry, str) else dict(entry)
+        entry.update(results.get(files_json.parent / entry["path"], {}))
+        entries.append(entry)
+    # The viewer tells precompiled models from preloaded assets by this record.
+    missing = [entry["path"] for entry in entries if entry["path"].endswith(".mjb") and not entry.get("model")]
+    if missing:
+        raise SystemExit(f"{files_json}: .mjb entries without a model record: {', '.join(missing)}")
+    atomic_write_text(files_json, json.dumps(entries, indent=2))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Write .gz/.br variants of the viewer's static artifacts.")
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=DEFAULT_ROOT,
+        help="Static examples directory (contains scenes/ and checkpoints/)."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rewrite variants even when they are up to date."
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    root = args.root
+    if brotli is None:
+        print("brotli is not installed (pip install brotli); writing .gz variants only.", file=sys.stderr)
+
+    files_json = root / "scenes" / "files.json"
+    scene_names = load_scene_files(files_json) if files_json.exists() else []
+    indexes = find_motion_indexes(root)
+    clip_paths = {index_path: index_clip_paths(index_path) for index_path in indexes}
+
+    artifacts = [files_json.parent / name for name in scene_names]
+    artifacts += [path for paths in clip_paths.values() for path in paths if path.suffix != PACK_EXTENSION]
+    artifacts += list(root.rglob("*.onnx"))
+    missing = [path for path in artifacts if not path.is_file()]
+    if missing:
+        print(f"Skipping {len(missing)} listed file(s) that do not exist, e.g. {missing[0]}", file=sys.stderr)
+    results = compress_all([path for path in artifacts if path.is_file()], args.jobs, args.force)
+    compressed = sum(len(info["compressed"]) for info in results.values())
+    raw = sum(info["size"] for info in results.values())
+    print(f"Compressed {len(results)} artifact(s) ({raw} bytes) into {compressed} variant(s).")
+
+    for index_path in indexes:
+        annotated = annotate_index(index_path, results)
+        print(f"Annotated {annotated} clip(s) in {index_path}")
+    if scene_names:
+        annotate_scene_files(files_json, results)
+        print(f"Annotated {len(scene_names)} asset(s) in {files_json}")
+
+    # The listings changed above, so their own variants are written last.
+    listings = [files_json] if files_json.exists() else []
+    listings += [path for path in (root / "checkpoints").rglob("*.json")
+                 if path.is_file() and path not in results and not path.name.endswith(BOOKKEEPING_SUFFIXES)]
+    compress_all(listings, args.jobs, args.force)
+
+
+if __name__ == "__main__":
+    main()
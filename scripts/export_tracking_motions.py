@@ -20,128 +20,209 @@ Dependencies:
     - pyyaml
 
 SciPy is *not* required; the quaternion helpers are implemented with NumPy only.
+
+A build manifest is written next to the output (``motions.manifest.json``).
+Motions whose source npz, slice and joint order are unchanged are copied from
+the previous output instead of being reloaded; if nothing changed the output
+is left untouched. Pass ``--force`` to rebuild everything. The manifest keeps
+the byte span of every motion in the output (and the output's size and
+mtime), so reused motions are copied as raw bytes without parsing the
+previous output; an output that changed since is rebuilt in full.
 """
 
 from __future__ import annotations
 
 import argparse
+import io
 import json
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import BinaryIO, Dict, Iterable, List, Optional
 
 import numpy as np
 import yaml
 
-JOINT_NAMES_29 = [
-    "left_hip_pitch_joint", "left_hip_roll_joint", "left_hip_yaw_joint",
-    "left_knee_joint", "left_ankle_pitch_joint", "left_ankle_roll_joint",
-    "right_hip_pitch_joint", "right_hip_roll_joint", "right_hip_yaw_joint",
-    "right_knee_joint", "right_ankle_pitch_joint", "right_ankle_roll_joint",
-    "waist_yaw_joint", "waist_roll_joint", "waist_pitch_joint",
-    "left_shoulder_pitch_joint", "left_shoulder_roll_joint", "left_shoulder_yaw_joint",
-    "left_elbow_joint", "left_wrist_roll_joint", "left_wrist_pitch_joint", "left_wrist_yaw_joint",
-    "right_shoulder_pitch_joint", "right_shoulder_roll_joint", "right_shoulder_yaw_joint",
-    "right_elbow_joint", "right_wrist_roll_joint", "right_wrist_pitch_joint", "right_wrist_yaw_joint"
-]
-
-JOINT_NAMES_23 = [
-    "left_hip_pitch_joint", "left_hip_roll_joint", "left_hip_yaw_joint",
-    "left_knee_joint", "left_ankle_pitch_joint", "left_ankle_roll_joint",
-    "right_hip_pitch_joint", "right_hip_roll_joint", "right_hip_yaw_joint",
-    "right_knee_joint", "right_ankle_pitch_joint", "right_ankle_roll_joint",
-    "waist_yaw_joint", "left_shoulder_pitch_joint", "left_shoulder_roll_joint",
-    "left_shoulder_yaw_joint", "left_elbow_joint", "left_wrist_roll_joint",
-    "right_shoulder_pitch_joint", "right_shoulder_roll_joint", "right_shoulder_yaw_joint",
-    "right_elbow_joint", "right_wrist_roll_joint"
-]
-
-
-def mapping_joints(data: np.ndarray, target: Iterable[str]) -> np.ndarray:
-    data = np.asarray(data, dtype=np.float32)
-    target = list(target)
-    cols = data.shape[1]
-    if cols == len(target):
-        return data.astype(np.float32, copy=True)
-    if cols == len(JOINT_NAMES_29):
-        source = JOINT_NAMES_29
-    elif cols == len(JOINT_NAMES_23):
-        source = JOINT_NAMES_23
-    else:
-        raise ValueError(f"Unsupported joint dimension {cols}")
-    index = {name: i for i, name in enumerate(source)}
-    remapped = np.zeros((data.shape[0], len(target)), dtype=np.float32)
-    for j, name in enumerate(target):
-        i = index.get(name)
-        if i is not None:
-            remapped[:, j] = data[:, i]
-    return remapped
-
-
-def slice_interval(array: np.ndarray, start: int, end: int) -> np.ndarray:
-    stop = None if end is None or end == -1 else end
-    return array[start:stop]
+from atomic_io import atomic_writer
+from build_manifest import (
+    clip_record,
+    hash_json,
+    load_manifest,
+    manifest_path_for,
+    previous_source,
+    same_inputs,
+    save_manifest,
+    source_fingerprint,
+)
+from joint_remap import remap_joint_positions
+from motion_format import write_clip_json
+from npz_window import read_npz_window
+
+# Bump whenever the motion contents produced for the same inputs change.
+EXPORTER_VERSION = 2
+
+
+def motion_source_path(base: Path, entry: Dict[str, object]) -> Path:
+    return (base / str(entry["path"])).resolve()
 
 
 def load_motion_sequence(base: Path,
                          entry: Dict[str, object],
-                         dataset_joint_names: Iterable[str]) -> Dict[str, list]:
-    npz_path = (base / str(entry["path"])).resolve()
-    data = np.load(npz_path, allow_pickle=True)
-
+                         dataset_joint_names: Iterable[str]) -> Dict[str, np.ndarray]:
+    npz_path = motion_source_path(base, entry)
     start = int(entry.get("start", 0))
     end = entry.get("end", None)
-    joint_pos = slice_interval(data["dof_pos"], start, end)
-    root_pos = slice_interval(data["root_pos"], start, end)
-    root_rot_xyzw = slice_interval(data["root_rot"], start, end)
+    window = read_npz_window(npz_path, ("dof_pos", "root_pos", "root_rot"), start, end)
+    joint_pos = window["dof_pos"]
+    root_pos = window["root_pos"]
+    root_rot_xyzw = window["root_rot"]
     root_quat = np.concatenate([root_rot_xyzw[:, 3:4], root_rot_xyzw[:, :3]], axis=-1)
 
-    joint_pos = mapping_joints(joint_pos, dataset_joint_names)
+    joint_pos = remap_joint_positions(joint_pos, dataset_joint_names)
     root_pos = np.asarray(root_pos, dtype=np.float32)
     if root_pos.ndim == 3:
         root_pos = root_pos[:, 0, :]
     root_quat = np.asarray(root_quat, dtype=np.float32)
 
     return {
-        "joint_pos": joint_pos.tolist(),
-        "root_quat": root_quat.tolist(),
-        "root_pos": root_pos.tolist()
+        "joint_pos": joint_pos,
+        "root_quat": root_quat,
+        "root_pos": root_pos
     }
 
 
 def load_motion_clip(entry: Dict[str, object],
-                     dataset_joint_names: Iterable[str]) -> Dict[str, list]:
+                     dataset_joint_names: Iterable[str]) -> Dict[str, np.ndarray]:
     joint_pos = np.asarray(entry["joint_pos"], dtype=np.float32).reshape(1, -1)
-    joint_pos = mapping_joints(joint_pos, dataset_joint_names)
+    joint_pos = remap_joint_positions(joint_pos, dataset_joint_names)
     root_quat = np.asarray(entry["root_quat"], dtype=np.float32).reshape(1, 4)
     root_pos = np.asarray(entry["root_pos"], dtype=np.float32).reshape(1, 3)
 
     return {
-        "joint_pos": joint_pos.tolist(),
-        "root_quat": root_quat.tolist(),
-        "root_pos": root_pos.tolist()
+        "joint_pos": joint_pos,
+        "root_quat": root_quat,
+        "root_pos": root_pos
     }
 
 
-def export_motions(config_path: Path, repo_root: Path, output_path: Path) -> None:
+_COPY_CHUNK = 1 << 20
+
+
+def output_fingerprint(output_path: Path) -> Optional[Dict[str, int]]:
+    if not output_path.exists():
+        return None
+    stat = output_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def previous_spans(manifest: Dict[str, object], output_path: Path) -> Dict[str, List[int]]:
+    """Byte spans of the previous output's motions, if the output is the one the manifest describes."""
+    fingerprint = output_fingerprint(output_path)
+    if fingerprint is None or manifest.get("output") != fingerprint:
+        return {}
+    spans = {}
+    for name, record in manifest["clips"].items():
+        span = record.get("span") if isinstance(record, dict) else None
+        if not (isinstance(span, list) and len(span) == 2 and 0 <= span[0] and span[0] + span[1] <= fingerprint["size"]):
+            return {}
+        spans[name] = span
+    return spans
+
+
+def _copy_span(src: BinaryIO, out: BinaryIO, span: List[int]) -> None:
+    src.seek(span[0])
+    remaining = span[1]
+    while remaining:
+        chunk = src.read(min(remaining, _COPY_CHUNK))
+        if not chunk:
+            raise ValueError("previous motions output is shorter than its manifest says")
+        out.write(chunk)
+        remaining -= len(chunk)
+
+
+def write_motions_json(out: BinaryIO, motions: Dict[str, object], previous: Optional[BinaryIO]) -> Dict[str, List[int]]:
+    """Stream ``{name: clip}`` as JSON and return each clip's byte span.
+
+    A clip is either arrays to encode or the ``[offset, length]`` span of its
+    JSON in ``previous``, which is copied as is.
+    """
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="\n")
+    spans = {}
+    text.write("{")
+    for i, (name, clip) in enumerate(motions.items()):
+        text.write(",\n  " if i else "\n  ")
+        text.write(f"{json.dumps(name, ensure_ascii=False)}: ")
+        text.flush()
+        start = out.tell()
+        if isinstance(clip, list):
+            _copy_span(previous, out, clip)
+        else:
+            write_clip_json(text, clip, indent=2)
+            text.flush()
+        spans[name] = [start, out.tell() - start]
+    text.write("\n}" if motions else "}")
+    text.flush()
+    text.detach()
+    return spans
+
+
+def export_motions(config_path: Path, repo_root: Path, output_path: Path, force: bool = False) -> None:
     config = yaml.safe_load(config_path.read_text())
     dataset_joint_names = config["dataset_joint_names"]
 
     repo_root = repo_root.resolve()
-    motions: Dict[str, Dict[str, list]] = {}
+    manifest_path = manifest_path_for(output_path)
+    manifest = load_manifest(manifest_path)
+    spans = {} if force else previous_spans(manifest, output_path)
+    build_inputs = {
+        "dataset_joint_names": hash_json(list(dataset_joint_names)),
+        "exporter_version": EXPORTER_VERSION
+    }
+
+    motions: Dict[str, object] = {}
+    records: Dict[str, Dict[str, object]] = {}
+    rebuilt = 0
+
+    def reuse(name: str) -> bool:
+        # The combined output has no per-clip files, so manifest keys are motion names.
+        return name in spans and same_inputs(manifest["clips"].get(name), records[name])
 
     for motion in config.get("motions", []):
         name = motion["name"]
-        motions[name] = load_motion_sequence(repo_root, motion, dataset_joint_names)
+        source = source_fingerprint(motion_source_path(repo_root, motion), previous_source(manifest, name))
+        records[name] = clip_record(source, start=int(motion.get("start", 0)), end=motion.get("end", None),
+                                    **build_inputs)
+        if reuse(name):
+            motions[name] = spans[name]
+        else:
+            motions[name] = load_motion_sequence(repo_root, motion, dataset_joint_names)
+            rebuilt += 1
 
     for clip in config.get("motion_clips", []):
         name = clip["name"]
-        motions[name] = load_motion_clip(clip, dataset_joint_names)
+        records[name] = clip_record({"sha256": hash_json(clip)}, **build_inputs)
+        if reuse(name):
+            motions[name] = spans[name]
+        else:
+            motions[name] = load_motion_clip(clip, dataset_joint_names)
+            rebuilt += 1
 
     if "default" not in motions:
         raise ValueError("Generated motions do not include a 'default' clip.")
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(motions, ensure_ascii=False, indent=2))
+    removed = len(set(spans) - set(motions))
+    if rebuilt or removed or list(spans) != list(motions):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # The previous output stays in place until the new one replaces it.
+        with atomic_writer(output_path) as f, \
+                (output_path.open("rb") if len(motions) > rebuilt else io.BytesIO()) as previous:
+            spans = write_motions_json(f, motions, previous)
+    for name, record in records.items():
+        record["span"] = spans[name]
+    manifest["dataset_joint_names"] = list(dataset_joint_names)
+    manifest["exporter_version"] = EXPORTER_VERSION
+    manifest["clips"] = records
+    manifest["output"] = output_fingerprint(output_path)
+    save_manifest(manifest_path, manifest)
+    print(f"Rebuilt {rebuilt} motion(s), reused {len(motions) - rebuilt}, removed {removed}.")
 
 
 def parse_args() -> argparse.Namespace:
@@ -163,6 +244,11 @@ def parse_args() -> argparse.Namespace:
         required=True,
         help="Output JSON path for the exported motions."
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every motion even if the build manifest says it is up to date."
+    )
     return parser.parse_args()
 
 
@@ -172,7 +258,7 @@ def main() -> None:
     repo_root = (args.repo_root or config_path.parent.parent).resolve()
     output_path = args.output.resolve()
 
-    export_motions(config_path, repo_root, output_path)
+    export_motions(config_path, repo_root, output_path, args.force)
     print(f"Wrote motions to {output_path}")
 
 
@@ -5,8 +5,38 @@ Export tracking motions from .npz files into an index + per-motion JSON files.
 Rules:
   - Use tracking_raw.yaml as the source of motion entries.
   - Keep only one motion per base name (e.g. aiming1_subject1 -> aiming1).
-  - Cap each motion length to 120s * 50Hz = 6000 frames.
+  - Cap each motion length to 120s * 50Hz = 6000 frames (--max-frames; 0 lifts
+    the cap, JSON clips are streamed so memory does not grow with length).
+  - Sources recorded at another rate (yaml ``fps`` per motion, or top-level
+    ``source_fps`` / --source-fps) are resampled to --fps on load: joints and
+    root position are interpolated linearly, root quaternions slerped.
+  - --jobs N converts motions in N worker processes; the index is still
+    written in config order.
+  - A build manifest next to the index (motions.manifest.json) lets later
+    runs skip clips whose inputs are unchanged and delete orphaned outputs.
   - Each motion file contains joint_pos, root_quat (wxyz), root_pos.
+  - --target POLICY_JSON OUTPUT [MOTIONS_DIR] (repeatable) exports the same
+    motions for more policies (their dataset_joint_names) in one run; each
+    source npz is decoded once and remapped per target, and every target gets
+    its own index and clip directory (default: <output stem>_motions/ next to
+    OUTPUT). Targets whose clip directories resolve to the same path are
+    refused, since their clips would overwrite each other.
+  - --validate report|fail|trim checks every clip against the G1 model
+    (joint limits, quaternion norms, velocity spikes, root height; see
+    motion_validation.py) and writes motions.validation.json next to the index.
+    "fail" aborts the export if any clip is invalid, "trim" keeps each clip's
+    longest valid run.
+  - --canonicalize moves each clip's first frame to the XY origin with zero
+    yaw and flags the index entry ("canonical": true).
+  - --chunk-seconds S splits each clip into S-second chunk files listed under
+    "chunks" in its index entry, so the viewer can stream long clips.
+  - --pack also writes every clip into one <output stem>.pack file (header
+    with names, frame counts, dtypes and byte offsets, then the binary clips);
+    point tracking.motions_path at it and the viewer fetches clips with HTTP
+    Range requests. The per-motion files stay as the incremental build cache.
+  - Motion files are JSON by default; --format binary writes compact
+    float32 clips and --format quantized[-delta] int16 clips with checked
+    reconstruction error (see motion_format.py).
 """
 #   python3 /home/axell/Desktop/tmp/GentleHumanoidWeb/scripts/export_tracking_motions_npz.py \
 #     --config /home/axell/Desktop/gt_sim2real/config/tracking_raw.yaml \
@@ -18,64 +48,46 @@ from __future__ import annotations
 
 import argparse
 import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 import yaml
 
+from atomic_io import atomic_write_text
+from build_manifest import (
+    clip_record,
+    hash_json,
+    is_fresh,
+    load_manifest,
+    manifest_path_for,
+    previous_source,
+    remove_orphans,
+    save_manifest,
+    source_fingerprint,
+)
+from joint_remap import load_policy_dataset_joint_names, remap_clip, remap_joint_positions
+from motion_features import clip_features
+from motion_format import PACK_EXTENSION, OUTPUT_FORMATS, clip_file_name, entry_files, write_motion, write_pack
+from motion_transforms import canonicalize_clip, resample_clip, source_frames_for
+from motion_validation import (
+    DEFAULT_MODEL,
+    VALIDATION_MODES,
+    check_clip,
+    load_joint_limits,
+    report_path_for,
+    write_report,
+)
+from npz_window import read_npz_member, read_npz_window
+
 
 MAX_FRAMES = 120 * 50
+DEFAULT_FPS = 50.0
 INDEX_FORMAT = "tracking-motion-index-v1"
-
-JOINT_NAMES_29 = [
-    "left_hip_pitch_joint", "left_hip_roll_joint", "left_hip_yaw_joint",
-    "left_knee_joint", "left_ankle_pitch_joint", "left_ankle_roll_joint",
-    "right_hip_pitch_joint", "right_hip_roll_joint", "right_hip_yaw_joint",
-    "right_knee_joint", "right_ankle_pitch_joint", "right_ankle_roll_joint",
-    "waist_yaw_joint", "waist_roll_joint", "waist_pitch_joint",
-    "left_shoulder_pitch_joint", "left_shoulder_roll_joint", "left_shoulder_yaw_joint",
-    "left_elbow_joint", "left_wrist_roll_joint", "left_wrist_pitch_joint", "left_wrist_yaw_joint",
-    "right_shoulder_pitch_joint", "right_shoulder_roll_joint", "right_shoulder_yaw_joint",
-    "right_elbow_joint", "right_wrist_roll_joint", "right_wrist_pitch_joint", "right_wrist_yaw_joint"
-]
-
-JOINT_NAMES_23 = [
-    "left_hip_pitch_joint", "left_hip_roll_joint", "left_hip_yaw_joint",
-    "left_knee_joint", "left_ankle_pitch_joint", "left_ankle_roll_joint",
-    "right_hip_pitch_joint", "right_hip_roll_joint", "right_hip_yaw_joint",
-    "right_knee_joint", "right_ankle_pitch_joint", "right_ankle_roll_joint",
-    "waist_yaw_joint", "left_shoulder_pitch_joint", "left_shoulder_roll_joint",
-    "left_shoulder_yaw_joint", "left_elbow_joint", "left_wrist_roll_joint",
-    "right_shoulder_pitch_joint", "right_shoulder_roll_joint", "right_shoulder_yaw_joint",
-    "right_elbow_joint", "right_wrist_roll_joint"
-]
-
-
-def mapping_joints(data: np.ndarray, target: Iterable[str]) -> np.ndarray:
-    data = np.asarray(data, dtype=np.float32)
-    target = list(target)
-    cols = data.shape[1]
-    if cols == len(target):
-        return data.astype(np.float32, copy=True)
-    if cols == len(JOINT_NAMES_29):
-        source = JOINT_NAMES_29
-    elif cols == len(JOINT_NAMES_23):
-        source = JOINT_NAMES_23
-    else:
-        raise ValueError(f"Unsupported joint dimension {cols}")
-    index = {name: i for i, name in enumerate(source)}
-    remapped = np.zeros((data.shape[0], len(target)), dtype=np.float32)
-    for j, name in enumerate(target):
-        i = index.get(name)
-        if i is not None:
-            remapped[:, j] = data[:, i]
-    return remapped
-
-
-def slice_interval(array: np.ndarray, start: int, end: int) -> np.ndarray:
-    stop = None if end is None or end == -1 else end
-    return array[start:stop]
+# Bump whenever the clip contents produced for the same inputs change.
+EXPORTER_VERSION = 5
 
 
 def base_name(name: str) -> str:
@@ -89,69 +101,64 @@ def resolve_path(base: Path, path: str) -> Path:
     return p if p.is_absolute() else (base / p)
 
 
-def load_motion_sequence(npz_path: Path,
+def load_source_sequence(npz_path: Path,
                          start: int,
                          end: int,
-                         dataset_joint_names: Iterable[str]) -> Dict[str, list]:
-    data = np.load(npz_path, allow_pickle=True)
-
-    joint_pos = slice_interval(data["dof_pos"], start, end)
-    root_pos = slice_interval(data["root_pos"], start, end)
-    root_rot_xyzw = slice_interval(data["root_rot"], start, end)
-
-    if joint_pos.shape[0] > MAX_FRAMES:
-        joint_pos = joint_pos[:MAX_FRAMES]
-        root_pos = root_pos[:MAX_FRAMES]
-        root_rot_xyzw = root_rot_xyzw[:MAX_FRAMES]
-
-    joint_pos = np.asarray(joint_pos, dtype=np.float32)
-    root_pos = np.asarray(root_pos, dtype=np.float32)
-    root_rot_xyzw = np.asarray(root_rot_xyzw, dtype=np.float32)
-
-    joint_names = data.get("joint_names", None)
-    if joint_names is not None:
-        src_names = joint_names.tolist()
-        target_names = list(dataset_joint_names)
-        if src_names != target_names:
-            name_to_idx = {n: i for i, n in enumerate(src_names)}
-            remap = np.zeros((joint_pos.shape[0], len(target_names)), dtype=np.float32)
-            for i, n in enumerate(target_names):
-                j = name_to_idx.get(n, None)
-                if j is not None:
-                    remap[:, i] = joint_pos[:, j]
-            joint_pos = remap
-    else:
-        joint_pos = mapping_joints(joint_pos, dataset_joint_names)
+                         source_fps: float = DEFAULT_FPS,
+                         target_fps: float = DEFAULT_FPS,
+                         max_frames: Optional[int] = MAX_FRAMES) -> Tuple[Dict[str, np.ndarray], Optional[List[str]]]:
+    """Decode and resample a window, keeping the source joint order.
+
+    Returns ``(clip, source joint names or None)``; ``remap_clip`` then puts
+    the joints in each target's order.
+    """
+    # Only the [start, end) window (in source frames, capped at the source
+    # frames max_frames output frames need) is read from disk.
+    max_source = source_frames_for(max_frames, source_fps, target_fps)
+    window = read_npz_window(npz_path, ("dof_pos", "root_pos", "root_rot"), start, end, max_source)
+    joint_pos = np.asarray(window["dof_pos"], dtype=np.float32)
+    root_pos = np.asarray(window["root_pos"], dtype=np.float32)
+    root_rot_xyzw = np.asarray(window["root_rot"], dtype=np.float32)
+
+    joint_names = read_npz_member(npz_path, "joint_names")
+    source_names = joint_names.tolist() if joint_names is not None else None
 
     if root_pos.ndim == 3:
         root_pos = root_pos[:, 0, :]
     root_quat = np.concatenate([root_rot_xyzw[:, 3:4], root_rot_xyzw[:, :3]], axis=-1)
 
-    return {
-        "joint_pos": joint_pos.tolist(),
-        "root_quat": root_quat.tolist(),
-        "root_pos": root_pos.tolist()
+    clip = {
+        "joint_pos": joint_pos,
+        "root_quat": root_quat,
+        "root_pos": root_pos
     }
+    return resample_clip(clip, source_fps, target_fps, max_frames), source_names
+
+
+def load_motion_sequence(npz_path: Path,
+                         start: int,
+                         end: int,
+                         dataset_joint_names: Iterable[str],
+                         source_fps: float = DEFAULT_FPS,
+                         target_fps: float = DEFAULT_FPS,
+                         max_frames: Optional[int] = MAX_FRAMES) -> Dict[str, np.ndarray]:
+    clip, source_names = load_source_sequence(npz_path, start, end, source_fps, target_fps, max_frames)
+    return remap_clip(clip, dataset_joint_names, source_names)
 
 
 def load_motion_clip(entry: Dict[str, object],
-                     dataset_joint_names: Iterable[str]) -> Dict[str, list]:
+                     dataset_joint_names: Iterable[str]) -> Dict[str, np.ndarray]:
     joint_pos = np.asarray(entry["joint_pos"], dtype=np.float32).reshape(1, -1)
-    joint_pos = mapping_joints(joint_pos, dataset_joint_names)
+    joint_pos = remap_joint_positions(joint_pos, dataset_joint_names)
     root_quat = np.asarray(entry["root_quat"], dtype=np.float32).reshape(1, 4)
     root_pos = np.asarray(entry["root_pos"], dtype=np.float32).reshape(1, 3)
     return {
-        "joint_pos": joint_pos.tolist(),
-        "root_quat": root_quat.tolist(),
-        "root_pos": root_pos.tolist()
+        "joint_pos": joint_pos,
+        "root_quat": root_quat,
+        "root_pos": root_pos
     }
 
 
-def write_motion_file(motions_dir: Path, name: str, clip: Dict[str, list]) -> None:
-    motion_path = motions_dir / f"{name}.json"
-    motion_path.write_text(json.dumps(clip, ensure_ascii=False, indent=2))
-
-
 def resolve_base_path(output_path: Path, motions_dir: Path) -> str:
     index_root = output_path.parent.resolve()
     motions_dir = motions_dir.resolve()
@@ -163,19 +170,18 @@ def resolve_base_path(output_path: Path, motions_dir: Path) -> str:
     return f"./{rel_str}" if rel_str else "."
 
 
-def export_motions(config_path: Path,
-                   repo_root: Path,
-                   output_path: Path,
-                   motions_dir: Path) -> None:
-    config = yaml.safe_load(config_path.read_text())
-    dataset_joint_names = config["dataset_joint_names"]
+def plan_motions(config: Dict[str, object],
+                 repo_root: Path,
+                 source_fps: float = DEFAULT_FPS) -> List[Tuple[str, Path, int, int, float]]:
+    """Resolve the config ``motions`` list into (name, path, start, end, fps) jobs.
 
-    repo_root = repo_root.resolve()
-    motions_dir.mkdir(parents=True, exist_ok=True)
-    seen_base = set()
-    index_entries = []
-    default_present = False
+    ``fps`` is the motion's own ``fps`` entry, else ``source_fps``.
 
+    Base-name dedupe happens here, before any work is scheduled, so the set of
+    exported motions never depends on worker completion order.
+    """
+    seen_base = set()
+    jobs = []
     for motion in config.get("motions", []):
         name = motion["name"]
         base = base_name(name)
@@ -186,23 +192,231 @@ def export_motions(config_path: Path,
         path = resolve_path(repo_root, str(motion["path"]))
         t0 = int(motion.get("start", 0))
         t1 = int(motion.get("end", -1))
-        clip = load_motion_sequence(path, t0, t1, dataset_joint_names)
-        write_motion_file(motions_dir, name, clip)
-        index_entries.append({"name": name, "file": f"{name}.json"})
-        if name == "default":
-            default_present = True
+        fps = float(motion.get("fps", source_fps))
+        jobs.append((name, path, t0, t1, fps))
+    return jobs
+
+
+def export_motion_job(task: Tuple[Tuple[str, Path, int, int, float], Tuple[int, ...]],
+                      targets: Sequence[Tuple[List[str], Path]],
+                      fmt: str,
+                      chunk_frames: int = 0,
+                      canonical: bool = False,
+                      target_fps: float = DEFAULT_FPS,
+                      validate: Optional[str] = None,
+                      model_path: Path = DEFAULT_MODEL,
+                      max_frames: Optional[int] = MAX_FRAMES) -> Dict[int, Tuple[Optional[Dict[str, object]], Optional[Dict[str, object]]]]:
+    """Convert one motion for the targets in ``task``.
+
+    The source is decoded once; each target ``(dataset_joint_names,
+    motions_dir)`` only remaps and writes it. Returns ``{target id: (index
+    entry or None, validation report or None)}``.
+    """
+    (name, path, t0, t1, fps), target_ids = task
+    source, source_names = load_source_sequence(path, t0, t1, fps, target_fps, max_frames)
+    results = {}
+    for target_id in target_ids:
+        dataset_joint_names, motions_dir = targets[target_id]
+        clip = remap_clip(source, dataset_joint_names, source_names)
+        report = None
+        if validate:
+            clip, report = check_clip(name, clip, dataset_joint_names, target_fps, validate, model_path)
+            if clip is None:
+                results[target_id] = (None, report)
+                continue
+        results[target_id] = (write_clip_entry(motions_dir, name, clip, fmt, chunk_frames, canonical, target_fps),
+                               report)
+    return results
+
+
+def write_clip_entry(motions_dir: Path,
+                     name: str,
+                     clip: Dict[str, np.ndarray],
+                     fmt: str,
+                     chunk_frames: int,
+                     canonical: bool,
+                     fps: float) -> Dict[str, object]:
+    features = clip_features(clip, fps)
+    if canonical:
+        clip = canonicalize_clip(clip)
+    entry = write_motion(motions_dir, name, clip, fmt, chunk_frames)
+    if canonical:
+        entry["canonical"] = True
+    entry["features"] = features
+    return entry
+
+
+def plan_target(manifest: Dict[str, object],
+                motion_jobs: List[Tuple[str, Path, int, int, float]],
+                motions_dir: Path,
+                fmt: str,
+                build_inputs: Dict[str, object],
+                max_frames: Optional[int],
+                force: bool) -> Tuple[Dict[str, Dict[str, object]], set]:
+    """Build one target's manifest records and return ``(records, stale motion names)``."""
+    records = {}
+    stale = set()
+    for name, path, t0, t1, fps in motion_jobs:
+        key = clip_file_name(name, fmt)
+        source = source_fingerprint(path, previous_source(manifest, key))
+        records[key] = clip_record(source, start=t0, end=t1, source_fps=fps, max_frames=max_frames, **build_inputs)
+        if force or not is_fresh(manifest, key, motions_dir, records[key]):
+            stale.add(name)
+        else:
+            records[key]["entry"] = manifest["clips"][key]["entry"]
+            records[key]["validation"] = manifest["clips"][key].get("validation")
+    return records, stale
 
-    for clip in config.get("motion_clips", []):
-        name = clip["name"]
-        clip_data = load_motion_clip(clip, dataset_joint_names)
-        write_motion_file(motions_dir, name, clip_data)
-        index_entries.append({"name": name, "file": f"{name}.json"})
-        if name == "default":
-            default_present = True
 
-    if not default_present:
+def export_motions(config_path: Path,
+                   repo_root: Path,
+                   output_path: Path,
+                   motions_dir: Path,
+                   fmt: str = "json",
+                   jobs: int = 1,
+                   force: bool = False,
+                   chunk_frames: int = 0,
+                   canonical: bool = False,
+                   target_fps: float = DEFAULT_FPS,
+                   source_fps: Optional[float] = None,
+                   validate: Optional[str] = None,
+                   model_path: Path = DEFAULT_MODEL,
+                   pack: bool = False,
+                   max_frames: Optional[int] = MAX_FRAMES,
+                   extra_targets: Sequence[Tuple[List[str], Path, Path]] = ()) -> None:
+    """Export the config's motions for the yaml target and any ``extra_targets``.
+
+    ``extra_targets`` are ``(dataset_joint_names, output_path, motions_dir)``;
+    every target gets its own index, manifest, clips and reports, while each
+    source npz is decoded once for all targets that need it rebuilt.
+    """
+    config = yaml.safe_load(config_path.read_text())
+    targets = [(list(config["dataset_joint_names"]), output_path, motions_dir)]
+    targets += [(list(names), out, clips_dir) for names, out, clips_dir in extra_targets]
+
+    repo_root = repo_root.resolve()
+    if source_fps is None:
+        source_fps = float(config.get("source_fps", target_fps))
+    motion_jobs = plan_motions(config, repo_root, source_fps)
+    clip_entries = config.get("motion_clips", [])
+
+    names = [job[0] for job in motion_jobs] + [clip["name"] for clip in clip_entries]
+    if "default" not in names:
         raise ValueError("Generated motions do not include a 'default' clip.")
 
+    shared_inputs = {
+        "encoding": fmt,
+        "chunk_frames": chunk_frames,
+        "canonical": canonical,
+        "fps": target_fps,
+        "validate": validate,
+        "exporter_version": EXPORTER_VERSION
+    }
+    if validate:
+        shared_inputs["joint_limits"] = hash_json(load_joint_limits(model_path))
+
+    plans = []
+    for dataset_joint_names, target_output, target_motions in targets:
+        target_motions.mkdir(parents=True, exist_ok=True)
+        manifest = load_manifest(manifest_path_for(target_output))
+        build_inputs = {"dataset_joint_names": hash_json(dataset_joint_names), **shared_inputs}
+        records, stale = plan_target(manifest, motion_jobs, target_motions, fmt, build_inputs, max_frames, force)
+        plans.append({"manifest": manifest, "build_inputs": build_inputs, "records": records, "stale": stale})
+
+    # One task per source that is stale for at least one target.
+    tasks = []
+    for job in motion_jobs:
+        target_ids = tuple(i for i, plan in enumerate(plans) if job[0] in plan["stale"])
+        if target_ids:
+            tasks.append((job, target_ids))
+
+    worker = partial(export_motion_job,
+                     targets=tuple((names, clips_dir) for names, _, clips_dir in targets),
+                     fmt=fmt,
+                     chunk_frames=chunk_frames,
+                     canonical=canonical,
+                     target_fps=target_fps,
+                     validate=validate,
+                     model_path=model_path,
+                     max_frames=max_frames)
+    if jobs > 1 and len(tasks) > 1:
+        # executor.map yields results in submission order; the indexes below
+        # are assembled from the planned jobs, so they stay in config order.
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            task_results = list(executor.map(worker, tasks, chunksize=1))
+    else:
+        task_results = [worker(task) for task in tasks]
+    for (job, _), results in zip(tasks, task_results):
+        key = clip_file_name(job[0], fmt)
+        for target_id, (entry, report) in results.items():
+            plans[target_id]["records"][key]["entry"] = entry
+            plans[target_id]["records"][key]["validation"] = report
+    if len(targets) > 1 and tasks:
+        print(f"Decoded {len(tasks)} source(s) once for {len(targets)} target(s).")
+
+    if validate:
+        invalid_total = 0
+        for (_, target_output, _), plan in zip(targets, plans):
+            reports = [plan["records"][clip_file_name(job[0], fmt)]["validation"] for job in motion_jobs]
+            report_path = report_path_for(target_output)
+            invalid = write_report(report_path, reports, validate)
+            print(f"Validated {len(reports)} clip(s), {invalid} invalid; report at {report_path}")
+            invalid_total += invalid
+        if invalid_total and validate == "fail":
+            raise ValueError(f"{invalid_total} motion(s) failed validation; see the validation reports")
+
+    for (dataset_joint_names, target_output, target_motions), plan in zip(targets, plans):
+        write_target(plan, motion_jobs, clip_entries, dataset_joint_names, target_output, target_motions,
+                     fmt, canonical, force, pack)
+
+
+def write_target(plan: Dict[str, object],
+                 motion_jobs: List[Tuple[str, Path, int, int, float]],
+                 clip_entries: List[Dict[str, object]],
+                 dataset_joint_names: List[str],
+                 output_path: Path,
+                 motions_dir: Path,
+                 fmt: str,
+                 canonical: bool,
+                 force: bool,
+                 pack: bool) -> None:
+    """Finish one target: static clips, manifest, index and optional pack."""
+    manifest = plan["manifest"]
+    records = plan["records"]
+    build_inputs = plan["build_inputs"]
+    for job in motion_jobs:
+        key = clip_file_name(job[0], fmt)
+        if records[key]["entry"] is None:
+            print(f"Dropping {job[0]}: no valid frames left after trimming")
+            del records[key]
+    index_entries = [records[key]["entry"] for key in (clip_file_name(job[0], fmt) for job in motion_jobs)
+                     if key in records]
+
+    rebuilt = len(plan["stale"])
+    reused = len(motion_jobs) - rebuilt
+    for clip in clip_entries:
+        name = clip["name"]
+        key = clip_file_name(name, fmt)
+        records[key] = clip_record({"sha256": hash_json(clip)}, **build_inputs)
+        if force or not is_fresh(manifest, key, motions_dir, records[key]):
+            clip_data = load_motion_clip(clip, dataset_joint_names)
+            records[key]["entry"] = write_clip_entry(motions_dir, name, clip_data, fmt, 0, canonical,
+                                                       build_inputs["fps"])
+            rebuilt += 1
+        else:
+            records[key]["entry"] = manifest["clips"][key]["entry"]
+            reused += 1
+        index_entries.append(records[key]["entry"])
+
+    for record in records.values():
+        record["outputs"] = entry_files(record["entry"])
+    removed = remove_orphans(manifest, motions_dir, records)
+    manifest["dataset_joint_names"] = dataset_joint_names
+    manifest["exporter_version"] = EXPORTER_VERSION
+    manifest["clips"] = records
+    save_manifest(manifest_path_for(output_path), manifest)
+    print(f"Rebuilt {rebuilt} clip(s), reused {reused}, removed {removed} orphan(s).")
+
     output_path.parent.mkdir(parents=True, exist_ok=True)
     base_path = resolve_base_path(output_path, motions_dir)
     index = {
@@ -210,9 +424,14 @@ def export_motions(config_path: Path,
         "base_path": base_path,
         "motions": index_entries
     }
-    output_path.write_text(json.dumps(index, ensure_ascii=False, indent=2))
+    atomic_write_text(output_path, json.dumps(index, ensure_ascii=False, indent=2))
     print(f"Wrote motion index to {output_path} (count={len(index_entries)})")
 
+    if pack:
+        pack_path = output_path.with_suffix(PACK_EXTENSION)
+        size = write_pack(pack_path, motions_dir, index_entries)
+        print(f"Wrote motion pack to {pack_path} ({size} bytes)")
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Export tracking motions to JSON.")
@@ -240,13 +459,119 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Directory for per-motion JSON files (default: output/motions)."
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help="Per-motion file encoding: json (default), binary float32 clips, "
+             "or quantized / quantized-delta int16 clips."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to convert motions (default: 1)."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every clip even if the build manifest says it is up to date."
+    )
+    parser.add_argument(
+        "--chunk-seconds",
+        type=float,
+        default=0.0,
+        help="Split clips into chunks of this many seconds for progressive playback (default: off)."
+    )
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=50.0,
+        help="Frame rate of the exported clips (the policy control rate); sources are "
+             "resampled to it and chunks are sized with it (default: 50)."
+    )
+    parser.add_argument(
+        "--source-fps",
+        type=float,
+        default=None,
+        help="Frame rate of the source npz files when a motion has no 'fps' entry "
+             "(default: the config's source_fps, else --fps)."
+    )
+    parser.add_argument(
+        "--canonicalize",
+        action="store_true",
+        help="Start every clip at the XY origin with zero yaw so the viewer can align it lazily."
+    )
+    parser.add_argument(
+        "--target",
+        nargs="+",
+        action="append",
+        type=Path,
+        default=[],
+        metavar="POLICY_JSON OUTPUT [MOTIONS_DIR]",
+        help="Additional export target: a policy config (for its dataset_joint_names), the index "
+             "path to write and optionally its clip directory (default: <OUTPUT stem>_motions/ next "
+             "to OUTPUT). Repeatable."
+    )
+    parser.add_argument(
+        "--max-frames",
+        type=int,
+        default=MAX_FRAMES,
+        help=f"Maximum frames per clip at --fps; 0 exports full-length clips (default: {MAX_FRAMES})."
+    )
+    parser.add_argument(
+        "--pack",
+        action="store_true",
+        help="Also write all clips into a single <output stem>.pack file for HTTP Range loading "
+             "(needs a binary --format and no chunking)."
+    )
+    parser.add_argument(
+        "--validate",
+        choices=VALIDATION_MODES,
+        default=None,
+        help="Check clips against the robot model and write <output>.validation.json: "
+             "report only, fail the export on invalid clips, or trim them to their longest valid run."
+    )
+    parser.add_argument(
+        "--model",
+        type=Path,
+        default=DEFAULT_MODEL,
+        help="MJCF used for joint limits when validating (default: the bundled g1.xml)."
+    )
+    args = parser.parse_args()
+    if args.pack and (args.format == "json" or args.chunk_seconds > 0):
+        parser.error("--pack needs a binary --format and cannot be combined with --chunk-seconds")
+    if any(len(target) not in (2, 3) for target in args.target):
+        parser.error("--target takes POLICY_JSON OUTPUT [MOTIONS_DIR]")
+    args.motions_dir = args.motions_dir or (args.output.parent / "motions")
+    args.target = [(policy, output, clips_dir[0] if clips_dir else target_motions_dir(output))
+                   for policy, output, *clips_dir in args.target]
+    # Every target remaps the clips into its own joint order under the same names.
+    seen: Dict[Path, Path] = {}
+    for output, clips_dir in [(args.output, args.motions_dir)] + [(out, d) for _, out, d in args.target]:
+        key = clips_dir.resolve()
+        if key in seen:
+            parser.error(f"{seen[key]} and {output} would both write clips to {key}; "
+                         "give each target its own MOTIONS_DIR")
+        seen[key] = output
+    return args
+
+
+def target_motions_dir(output_path: Path) -> Path:
+    """Default clip directory of an extra --target: ``<index stem>_motions`` next to the index."""
+    return output_path.with_name(f"{output_path.stem}_motions")
 
 
 def main() -> None:
     args = parse_args()
-    motions_dir = args.motions_dir or (args.output.parent / "motions")
-    export_motions(args.config, args.repo_root, args.output, motions_dir)
+    motions_dir = args.motions_dir
+    extra_targets = [(load_policy_dataset_joint_names(policy), output, clips_dir)
+                     for policy, output, clips_dir in args.target]
+    chunk_frames = int(round(args.chunk_seconds * args.fps)) if args.chunk_seconds > 0 else 0
+    export_motions(args.config, args.repo_root, args.output, motions_dir, args.format,
+                   max(1, args.jobs), args.force, chunk_frames, args.canonicalize,
+                   args.fps, args.source_fps, args.validate, args.model, args.pack,
+                   args.max_frames or None, extra_targets)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,112 @@
+"""
+Joint-order remapping shared by the motion exporters.
+
+Source trajectories come either with explicit ``joint_names`` or as bare 29/23
+DoF arrays in the canonical G1 orders below. ``remap_joint_positions`` turns
+them into the policy's ``dataset_joint_names`` order with one fancy-indexing
+gather. The gather index (and the mask of target joints missing from the
+source, which are filled with zeros) is computed once per
+``(source names, target names)`` pair and cached, so exporting one decoded
+source to several policies (``remap_clip`` per target) only pays for the gather.
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+JOINT_NAMES_29 = (
+    "left_hip_pitch_joint", "left_hip_roll_joint", "left_hip_yaw_joint",
+    "left_knee_joint", "left_ankle_pitch_joint", "left_ankle_roll_joint",
+    "right_hip_pitch_joint", "right_hip_roll_joint", "right_hip_yaw_joint",
+    "right_knee_joint", "right_ankle_pitch_joint", "right_ankle_roll_joint",
+    "waist_yaw_joint", "waist_roll_joint", "waist_pitch_joint",
+    "left_shoulder_pitch_joint", "left_shoulder_roll_joint", "left_shoulder_yaw_joint",
+    "left_elbow_joint", "left_wrist_roll_joint", "left_wrist_pitch_joint", "left_wrist_yaw_joint",
+    "right_shoulder_pitch_joint", "right_shoulder_roll_joint", "right_shoulder_yaw_joint",
+    "right_elbow_joint", "right_wrist_roll_joint", "right_wrist_pitch_joint", "right_wrist_yaw_joint"
+)
+
+JOINT_NAMES_23 = (
+    "left_hip_pitch_joint", "left_hip_roll_joint", "left_hip_yaw_joint",
+    "left_knee_joint", "left_ankle_pitch_joint", "left_ankle_roll_joint",
+    "right_hip_pitch_joint", "right_hip_roll_joint", "right_hip_yaw_joint",
+    "right_knee_joint", "right_ankle_pitch_joint", "right_ankle_roll_joint",
+    "waist_yaw_joint", "left_shoulder_pitch_joint", "left_shoulder_roll_joint",
+    "left_shoulder_yaw_joint", "left_elbow_joint", "left_wrist_roll_joint",
+    "right_shoulder_pitch_joint", "right_shoulder_roll_joint", "right_shoulder_yaw_joint",
+    "right_elbow_joint", "right_wrist_roll_joint"
+)
+
+
+def default_source_names(cols: int, target: Sequence[str]) -> Tuple[str, ...]:
+    """Guess the joint order of an unnamed ``(T, cols)`` array."""
+    if cols == len(target):
+        return tuple(target)
+    if cols == len(JOINT_NAMES_29):
+        return JOINT_NAMES_29
+    if cols == len(JOINT_NAMES_23):
+        return JOINT_NAMES_23
+    raise ValueError(f"Unsupported joint dimension {cols}")
+
+
+@lru_cache(maxsize=None)
+def remap_table(source: Tuple[str, ...], target: Tuple[str, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(index, present)`` so that ``data[:, index]`` is in ``target`` order.
+
+    ``present[j]`` is False for target joints absent from ``source``; their
+    index points at column 0 and the caller must zero them.
+    """
+    lookup = {name: i for i, name in enumerate(source)}
+    index = np.array([lookup.get(name, 0) for name in target], dtype=np.intp)
+    present = np.array([name in lookup for name in target], dtype=bool)
+    index.setflags(write=False)
+    present.setflags(write=False)
+    return index, present
+
+
+def remap_joint_positions(data: np.ndarray,
+                          target: Iterable[str],
+                          source_names: Optional[Iterable[str]] = None) -> np.ndarray:
+    """Reorder ``(T, J)`` joint positions into ``target`` order as float32.
+
+    ``source_names`` is the column order of ``data``; when omitted it is
+    inferred from the column count (see ``default_source_names``).
+    """
+    data = np.asarray(data, dtype=np.float32)
+    target = tuple(target)
+    if source_names is None:
+        source = default_source_names(data.shape[1], target)
+    else:
+        source = tuple(str(name) for name in source_names)
+    if source == target:
+        return data.copy()
+    index, present = remap_table(source, target)
+    remapped = data[:, index]
+    if not present.all():
+        remapped[:, ~present] = 0.0
+    return remapped
+
+
+def remap_clip(clip: Dict[str, np.ndarray],
+               target: Iterable[str],
+               source_names: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """Return ``clip`` with ``joint_pos`` in ``target`` order; root arrays are shared."""
+    remapped = dict(clip)
+    remapped["joint_pos"] = remap_joint_positions(clip["joint_pos"], target, source_names)
+    return remapped
+
+
+def load_policy_dataset_joint_names(policy_path: Path) -> List[str]:
+    """Read the dataset joint order a policy config expects."""
+    config = json.loads(Path(policy_path).read_text())
+    tracking = config.get("tracking") or {}
+    names = tracking.get("dataset_joint_names") or config.get("policy_joint_names")
+    if not names:
+        raise ValueError("Policy config missing tracking.dataset_joint_names or policy_joint_names")
+    return list(names)
@@ -0,0 +1,164 @@
+"""
+Compact per-clip descriptors for searching and deduplicating motion libraries.
+
+``clip_features`` summarizes a clip in a few hundred numbers, stored as the
+``features`` field of its index entry:
+
+  * ``duration``   - clip length in seconds,
+  * ``joints``     - ``FEATURE_SAMPLES`` joint-position rows taken at evenly
+                     spaced fractions of the clip (linearly interpolated), stored
+                     as base64 little-endian float16 so the index stays small,
+  * ``root_speed`` - fraction of frames per horizontal root speed bin (``SPEED_BINS``),
+  * ``yaw_rate``   - fraction of frames per root yaw rate bin (``YAW_RATE_BINS``).
+
+``feature_matrix`` turns those into fixed-length vectors whose Euclidean
+distance weighs the blocks by ``FEATURE_WEIGHTS``; the joint block is scaled so
+its contribution is the RMS joint difference in radians. Descriptors are in the
+index's joint order, so only clips of the same index are comparable.
+
+Search never compares full trajectories. ``nearest`` is one matrix-vector
+pass; ``near_pairs`` projects the vectors onto their leading principal
+components, finds candidate pairs there in blocks of rows (a projection never
+increases distances, so no pair is missed) and confirms them on the full
+vectors.
+"""
+
+from __future__ import annotations
+
+import base64
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from motion_transforms import quat_yaw
+
+
+FEATURES_VERSION = 1
+FEATURE_SAMPLES = 8
+FEATURE_PRECISION = 3
+SPEED_BINS = (0.0, 0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 4.0, np.inf)  # m/s
+YAW_RATE_BINS = (-np.inf, -3.0, -1.5, -0.75, -0.25, 0.25, 0.75, 1.5, 3.0, np.inf)  # rad/s
+FEATURE_WEIGHTS = {"joints": 1.0, "root_speed": 0.5, "yaw_rate": 0.5, "duration": 0.25}
+SEARCH_DIMS = 32
+_BLOCK_ELEMENTS = 1 << 23
+
+
+def _histogram(values: np.ndarray, edges: Sequence[float]) -> List[float]:
+    counts, _ = np.histogram(values, bins=np.asarray(edges, dtype=np.float64))
+    total = max(int(counts.sum()), 1)
+    return [round(float(c) / total, FEATURE_PRECISION) for c in counts]
+
+
+def clip_features(clip: Dict[str, np.ndarray], fps: float) -> Dict[str, object]:
+    """Describe ``clip`` (sampled at ``fps``) for the index."""
+    joint_pos = np.asarray(clip["joint_pos"], dtype=np.float64)
+    root_pos = np.asarray(clip["root_pos"], dtype=np.float64)
+    frames = joint_pos.shape[0]
+    if frames == 0:
+        raise ValueError("Cannot describe an empty clip")
+
+    u = np.linspace(0.0, frames - 1, FEATURE_SAMPLES)
+    i0 = np.floor(u).astype(np.intp)
+    i1 = np.minimum(i0 + 1, frames - 1)
+    a = (u - i0)[:, None]
+    joints = (1.0 - a) * joint_pos[i0] + a * joint_pos[i1]
+
+    speed = np.linalg.norm(np.diff(root_pos[:, :2], axis=0), axis=1) * fps
+    yaw = np.unwrap(quat_yaw(clip["root_quat"]))
+    yaw_rate = np.diff(yaw) * fps
+    return {
+        "version": FEATURES_VERSION,
+        "duration": round(frames / fps, FEATURE_PRECISION),
+        "joints": base64.b64encode(joints.astype("<f2").tobytes()).decode("ascii"),
+        "root_speed": _histogram(speed, SPEED_BINS),
+        "yaw_rate": _histogram(yaw_rate, YAW_RATE_BINS)
+    }
+
+
+def decode_joints(features: Dict[str, object]) -> np.ndarray:
+    raw = base64.b64decode(str(features["joints"]))
+    return np.frombuffer(raw, dtype="<f2").astype(np.float64).reshape(FEATURE_SAMPLES, -1)
+
+
+def has_features(entry: Dict[str, object]) -> bool:
+    features = entry.get("features")
+    return isinstance(features, dict) and features.get("version") == FEATURES_VERSION
+
+
+def feature_matrix(entries: Sequence[Dict[str, object]]) -> np.ndarray:
+    """Stack the descriptors of ``entries`` into ``(N, D)`` float32 vectors."""
+    if not entries:
+        return np.zeros((0, 0), dtype=np.float32)
+    try:
+        joints = np.stack([decode_joints(entry["features"]) for entry in entries])
+    except ValueError as exc:
+        raise ValueError("Clip descriptors have different joint counts") from exc
+    joints = joints.reshape(len(entries), -1) * (FEATURE_WEIGHTS["joints"] / np.sqrt(joints.shape[1] * joints.shape[2]))
+    speed = np.asarray([entry["features"]["root_speed"] for entry in entries]) * FEATURE_WEIGHTS["root_speed"]
+    yaw_rate = np.asarray([entry["features"]["yaw_rate"] for entry in entries]) * FEATURE_WEIGHTS["yaw_rate"]
+    duration = np.log1p([[entry["features"]["duration"]] for entry in entries]) * FEATURE_WEIGHTS["duration"]
+    return np.concatenate([joints, speed, yaw_rate, duration], axis=1).astype(np.float32)
+
+
+def nearest(vectors: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(indices, distances)`` of the ``k`` rows closest to ``query``."""
+    dist = np.linalg.norm(vectors - query[None, :], axis=1)
+    k = min(k, dist.shape[0])
+    order = np.argpartition(dist, k - 1)[:k] if k else np.zeros(0, dtype=np.intp)
+    order = order[np.argsort(dist[order], kind="stable")]
+    return order, dist[order]
+
+
+def project(vectors: np.ndarray, dims: int = SEARCH_DIMS) -> np.ndarray:
+    """Orthogonally project ``vectors`` onto their ``dims`` leading principal components."""
+    if vectors.shape[1] <= dims:
+        return vectors
+    centered = vectors - vectors.mean(axis=0)
+    _, _, vt = np.linalg.svd(centered, full_matrices=False)
+    return centered @ vt[:dims].T
+
+
+def near_pairs(vectors: np.ndarray,
+               threshold: float,
+               dims: Optional[int] = SEARCH_DIMS) -> List[Tuple[int, int, float]]:
+    """All pairs ``(i, j, distance)`` with ``i < j`` closer than ``threshold``."""
+    count = vectors.shape[0]
+    vectors = np.asarray(vectors, dtype=np.float64)
+    reduced = project(vectors, dims) if dims else vectors
+    norms = np.einsum("ij,ij->i", reduced, reduced)
+    rows = max(1, _BLOCK_ELEMENTS // max(count, 1))
+    pairs = []
+    for start in range(0, count, rows):
+        block = reduced[start:start + rows]
+        # Squared distances to the rows after each block row only.
+        d2 = norms[start:start + rows, None] + norms[None, start:] - 2.0 * (block @ reduced[start:].T)
+        d2[np.tril_indices(block.shape[0], 0, d2.shape[1])] = np.inf
+        bi, bj = np.nonzero(d2 < threshold * threshold + 1e-9)
+        if bi.size == 0:
+            continue
+        i = bi + start
+        j = bj + start
+        exact = np.linalg.norm(vectors[i] - vectors[j], axis=1)
+        keep = exact < threshold
+        pairs.extend(zip(i[keep].tolist(), j[keep].tolist(), exact[keep].tolist()))
+    return pairs
+
+
+def duplicate_groups(count: int, pairs: List[Tuple[int, int, float]]) -> List[List[int]]:
+    """Union near pairs into groups (sorted indices, lowest first) of two or more clips."""
+    parent = list(range(count))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j, _ in pairs:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+    groups: Dict[int, List[int]] = {}
+    for i in range(count):
+        groups.setdefault(find(i), []).append(i)
+    return [members for members in groups.values() if len(members) > 1]
@@ -0,0 +1,460 @@
+"""
+Clip serialization shared by the tracking motion exporters.
+
+Per-motion files can be written in these encodings (``--format``):
+
+  * ``json``            - the original ``{"joint_pos": [[...]], "root_quat": ..., "root_pos": ...}``
+                          layout, kept as the fallback for hand-edited clips and old viewers.
+                          Written one frame per line with ``JSON_PRECISION`` decimals by
+                          ``write_clip_json``, which streams ``JSON_BLOCK_ROWS`` rows at a
+                          time so memory does not grow with clip length.
+  * ``binary``          - ``CLIP_MAGIC`` + uint32 header length + JSON header + raw
+                          little-endian float32 blocks for ``joint_pos``/``root_quat``/``root_pos``.
+                          The viewer fetches it as a single ArrayBuffer and wraps each block
+                          in typed-array views without copying.
+  * ``quantized``       - same container, but every block is int16 with a per-column
+                          ``scale``/``bias`` (``x = q * scale + bias``).
+  * ``quantized-delta`` - as ``quantized``, with each row stored as the wrapping int16
+                          difference from the previous row so the bytes gzip far better.
+
+In both quantized formats ``root_pos`` is stored as steps instead
+(``"integrate": true``): ``bias`` is the clip's (or chunk's) first row and
+each int16 is the step of the integer code ``rint((x - bias) / scale)`` from
+the previous row, summed without wrapping on decode. ``scale`` is set by the
+largest per-frame move (never finer than ``ROOT_POS_RESOLUTION``), so the
+error does not grow with the distance travelled, which with an absolute range
+would run out of int16 codes for roots that travel more than about +-65 m.
+
+int16 halves the raw size of float32; the rest of the saving comes from gzip
+(``scripts/compress_artifacts.py``), which squeezes the small, repetitive
+row-to-row steps of ``quantized-delta`` far better than float32 or absolute
+codes.
+
+Binary layout (all integers little-endian):
+
+  offset 0   4 bytes   magic ``b"TMC1"``
+  offset 4   uint32    header length H (bytes, padded so blocks are 4-byte aligned)
+  offset 8   H bytes   UTF-8 JSON header (space padded)
+  ...        blocks    row-major arrays at the offsets listed in the header
+
+Quantized clips are checked against ``QUANT_TOLERANCES`` when written; the
+measured max error per block is stored in the header and printed.
+
+``write_motion`` can also split a clip into fixed-length chunks
+(``<name>.000.bin``, ``<name>.001.bin``, ...) in any of the encodings above. The
+index entry then lists ``chunks`` instead of a single ``file`` so the viewer can
+start playback after the first chunk and stream the rest.
+
+``write_pack`` concatenates binary clips into one library file the viewer can
+load with HTTP ``Range`` requests:
+
+  offset 0   4 bytes   magic ``b"TMP1"``
+  offset 4   uint32    header length H
+  offset 8   H bytes   UTF-8 JSON header: ``{"format": "tracking-motion-pack-v1",
+                       "motions": [{"name", "frames", "dtype", "encoding",
+                       "offset", "length", ...}]}`` (space padded)
+  ...        clips     each a complete binary clip as above, at absolute
+                       ``offset`` and 8-byte aligned
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import shutil
+import struct
+from pathlib import Path
+from typing import BinaryIO, Dict, List, TextIO, Tuple
+
+import numpy as np
+
+from atomic_io import atomic_writer
+
+CLIP_MAGIC = b"TMC1"
+CLIP_BINARY_FORMAT = "tracking-motion-clip-v1"
+CLIP_FIELDS = ("joint_pos", "root_quat", "root_pos")
+OUTPUT_FORMATS = ("json", "binary", "quantized", "quantized-delta")
+FORMAT_EXTENSIONS = {"json": ".json", "binary": ".bin", "quantized": ".bin", "quantized-delta": ".bin"}
+# Encoding the viewer needs to pick a decoder; quantized clips share the binary container.
+FORMAT_ENCODINGS = {"json": "json", "binary": "binary", "quantized": "binary", "quantized-delta": "binary"}
+
+# Max absolute reconstruction error allowed per block (rad, unit quaternion, m).
+QUANT_TOLERANCES = {"joint_pos": 1e-3, "root_quat": 1e-4, "root_pos": 2e-3}
+_QUANT_LEVELS = 32767
+# Finest root_pos code step (m); coarser only when a frame moves more than 32766 codes.
+ROOT_POS_RESOLUTION = 1e-4
+
+JSON_PRECISION = 6
+JSON_BLOCK_ROWS = 1024
+
+_PRELUDE = struct.Struct("<4sI")
+_ALIGN = 4
+
+PACK_MAGIC = b"TMP1"
+PACK_FORMAT = "tracking-motion-pack-v1"
+PACK_EXTENSION = ".pack"
+_PACK_ALIGN = 8
+
+
+def clip_file_name(name: str, fmt: str) -> str:
+    return f"{name}{FORMAT_EXTENSIONS[fmt]}"
+
+
+def clip_index_entry(name: str, fmt: str) -> Dict[str, str]:
+    entry = {"name": name, "file": clip_file_name(name, fmt)}
+    encoding = FORMAT_ENCODINGS[fmt]
+    if encoding != "json":
+        entry["encoding"] = encoding
+    return entry
+
+
+def entry_files(entry: Dict[str, object]) -> List[str]:
+    """All files referenced by an index entry (one per chunk for chunked clips)."""
+    if "chunks" in entry:
+        return [chunk["file"] for chunk in entry["chunks"]]
+    return [entry["file"]]
+
+
+def _as_float32_rows(array: np.ndarray) -> np.ndarray:
+    array = np.asarray(array, dtype="<f4")
+    if array.ndim != 2:
+        raise ValueError(f"Clip arrays must be 2-D, got shape {array.shape}")
+    return np.ascontiguousarray(array)
+
+
+def _clip_arrays(clip: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    arrays = {field: _as_float32_rows(clip[field]) for field in CLIP_FIELDS}
+    frames = arrays["joint_pos"].shape[0]
+    for field, array in arrays.items():
+        if array.shape[0] != frames:
+            raise ValueError(f"{field} has {array.shape[0]} frames, expected {frames}")
+    return arrays
+
+
+def write_json_rows(out: TextIO, array: np.ndarray, precision: int = JSON_PRECISION, indent: int = 0) -> None:
+    """Write a ``(T, C)`` array as a JSON list of rows, one row per line."""
+    array = np.asarray(array)
+    if array.ndim != 2:
+        raise ValueError(f"Clip arrays must be 2-D, got shape {array.shape}")
+    if array.shape[0] == 0:
+        out.write("[]")
+        return
+    pad = " " * (indent + 2)
+    row = pad + "[" + ", ".join([f"%.{precision}f"] * array.shape[1]) + "]"
+    out.write("[\n")
+    for start in range(0, array.shape[0], JSON_BLOCK_ROWS):
+        block = np.asarray(array[start:start + JSON_BLOCK_ROWS], dtype=np.float64)
+        if not np.isfinite(block).all():
+            raise ValueError("Cannot write non-finite values to a JSON clip")
+        if start:
+            out.write(",\n")
+        out.write(",\n".join(row % tuple(values) for values in block.tolist()))
+    out.write("\n" + " " * indent + "]")
+
+
+def write_clip_json(out: TextIO, clip: Dict[str, np.ndarray], precision: int = JSON_PRECISION, indent: int = 0) -> None:
+    """Stream ``clip`` as a JSON object without materializing nested lists."""
+    pad = " " * (indent + 2)
+    out.write("{\n")
+    for i, field in enumerate(CLIP_FIELDS):
+        out.write(f'{pad}"{field}": ')
+        write_json_rows(out, clip[field], precision, indent + 2)
+        out.write(",\n" if i + 1 < len(CLIP_FIELDS) else "\n")
+    out.write(" " * indent + "}")
+
+
+def encode_clip_json(clip: Dict[str, np.ndarray], precision: int = JSON_PRECISION) -> str:
+    out = io.StringIO()
+    write_clip_json(out, clip, precision)
+    return out.getvalue()
+
+
+def _write_packed(out: BinaryIO,
+                  blocks: List[Tuple[str, np.ndarray, Dict[str, object]]],
+                  header_extra: Dict[str, object]) -> None:
+    """Write ``(field, array, meta)`` blocks after a JSON header."""
+
+    def build_header(data_start: int) -> bytes:
+        described = {}
+        offset = data_start
+        for field, array, meta in blocks:
+            described[field] = {"offset": offset, "shape": list(array.shape), **meta}
+            offset += array.nbytes
+            offset += (-offset) % _ALIGN
+        header = {"format": CLIP_BINARY_FORMAT, **header_extra, "blocks": described}
+        return json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    # Offsets depend on the header length, so size the header with a guess and
+    # pad to a fixed aligned length that leaves room for the real offsets.
+    raw = build_header(0)
+    header_len = len(raw) + 32
+    header_len += (-(_PRELUDE.size + header_len)) % _ALIGN
+    raw = build_header(_PRELUDE.size + header_len)
+    if len(raw) > header_len:
+        raise ValueError("Binary clip header does not fit its reserved size")
+
+    out.write(_PRELUDE.pack(CLIP_MAGIC, header_len))
+    out.write(raw.ljust(header_len, b" "))
+    for _, array, _ in blocks:
+        # Arrays are C-contiguous, so the buffer is written without a copy.
+        out.write(memoryview(array).cast("B"))
+        out.write(b"\0" * ((-array.nbytes) % _ALIGN))
+
+
+def _pack(blocks: List[Tuple[str, np.ndarray, Dict[str, object]]], header_extra: Dict[str, object]) -> bytes:
+    out = io.BytesIO()
+    _write_packed(out, blocks, header_extra)
+    return out.getvalue()
+
+
+def _binary_layout(clip: Dict[str, np.ndarray]) -> Tuple[List[Tuple[str, np.ndarray, Dict[str, object]]], Dict[str, object]]:
+    arrays = _clip_arrays(clip)
+    blocks = [(field, arrays[field], {"dtype": "float32"}) for field in CLIP_FIELDS]
+    return blocks, {"dtype": "float32", "frames": arrays["joint_pos"].shape[0]}
+
+
+def encode_clip_binary(clip: Dict[str, np.ndarray]) -> bytes:
+    return _pack(*_binary_layout(clip))
+
+
+def quantize_block(array: np.ndarray, delta: bool) -> Tuple[np.ndarray, Dict[str, object], float]:
+    """Quantize a ``(T, C)`` float32 block to int16 with per-column scale/bias.
+
+    Returns the stored int16 array, its header metadata and the max absolute
+    reconstruction error measured against ``array``.
+    """
+    lo = array.min(axis=0).astype(np.float64) if array.size else np.zeros(array.shape[1])
+    hi = array.max(axis=0).astype(np.float64) if array.size else np.zeros(array.shape[1])
+    bias = 0.5 * (lo + hi)
+    span = hi - lo
+    scale = np.where(span > 0, span / (2 * _QUANT_LEVELS), 1.0)
+    q = np.rint((array - bias) / scale)
+    q = np.clip(q, -_QUANT_LEVELS, _QUANT_LEVELS).astype("<i2")
+
+    restored = (q.astype(np.float64) * scale + bias).astype(np.float32)
+    max_error = float(np.abs(restored - array).max()) if array.size else 0.0
+
+    stored = q
+    if delta and q.shape[0] > 1:
+        # int16 subtraction wraps; the decoder's wrapping cumulative sum undoes it.
+        stored = q.copy()
+        stored[1:] = q[1:] - q[:-1]
+    meta = {
+        "dtype": "int16",
+        "scale": scale.tolist(),
+        "bias": bias.tolist(),
+        "delta": bool(delta),
+        "max_error": max_error
+    }
+    return np.ascontiguousarray(stored), meta, max_error
+
+
+def integrate_block(array: np.ndarray, resolution: float) -> Tuple[np.ndarray, Dict[str, object], float]:
+    """Quantize a ``(T, C)`` float32 block as int16 steps of an unbounded integer code.
+
+    Codes are ``rint((x - first row) / scale)`` per column; each row stores the
+    step from the previous row's code, so consecutive codes only need to be
+    within int16 of each other and the absolute range is unlimited.
+    """
+    first = array[0].astype(np.float64) if array.size else np.zeros(array.shape[1])
+    step = np.abs(np.diff(array.astype(np.float64), axis=0)).max(axis=0) if array.shape[0] > 1 \
+        else np.zeros(array.shape[1])
+    # rint adds at most one code to a step, hence _QUANT_LEVELS - 1.
+    scale = np.maximum(step / (_QUANT_LEVELS - 1), resolution)
+    codes = np.rint((array - first) / scale).astype(np.int64)
+
+    restored = (codes * scale + first).astype(np.float32)
+    max_error = float(np.abs(restored - array).max()) if array.size else 0.0
+
+    stored = codes.copy()
+    stored[1:] = codes[1:] - codes[:-1]
+    meta = {
+        "dtype": "int16",
+        "scale": scale.tolist(),
+        "bias": first.tolist(),
+        "delta": False,
+        "integrate": True,
+        "max_error": max_error
+    }
+    return np.ascontiguousarray(stored.astype("<i2")), meta, max_error
+
+
+def _quantized_layout(clip: Dict[str, np.ndarray], delta: bool):
+    arrays = _clip_arrays(clip)
+    blocks = []
+    errors = {}
+    for field in CLIP_FIELDS:
+        if field == "root_pos":
+            stored, meta, max_error = integrate_block(arrays[field], ROOT_POS_RESOLUTION)
+        else:
+            stored, meta, max_error = quantize_block(arrays[field], delta)
+        blocks.append((field, stored, meta))
+        errors[field] = max_error
+    return blocks, {"frames": arrays["joint_pos"].shape[0]}, errors
+
+
+def encode_clip_quantized(clip: Dict[str, np.ndarray], delta: bool = False) -> Tuple[bytes, Dict[str, float]]:
+    """Encode ``clip`` as int16 blocks and return ``(payload, max error per block)``."""
+    blocks, header_extra, errors = _quantized_layout(clip, delta)
+    return _pack(blocks, header_extra), errors
+
+
+def check_quantization(name: str, errors: Dict[str, float]) -> None:
+    exceeded = {field: err for field, err in errors.items() if err > QUANT_TOLERANCES[field]}
+    if exceeded:
+        details = ", ".join(f"{field}={err:.3g} (limit {QUANT_TOLERANCES[field]:g})" for field, err in exceeded.items())
+        raise ValueError(f"Quantization error too large for {name}: {details}")
+
+
+def _dequantize(stored: np.ndarray, block: Dict[str, object]) -> np.ndarray:
+    q = stored
+    if block.get("integrate"):
+        q = np.cumsum(stored, axis=0, dtype=np.int64)
+    elif block.get("delta"):
+        q = np.cumsum(stored, axis=0, dtype=np.int16)
+    scale = np.asarray(block["scale"], dtype=np.float64)
+    bias = np.asarray(block["bias"], dtype=np.float64)
+    return (q.astype(np.float64) * scale + bias).astype(np.float32)
+
+
+def _parse_clip_header(payload: bytes) -> Dict[str, object]:
+    magic, header_len = _PRELUDE.unpack_from(payload, 0)
+    if magic != CLIP_MAGIC:
+        raise ValueError("Not a binary motion clip")
+    header = json.loads(payload[_PRELUDE.size:_PRELUDE.size + header_len])
+    if header.get("format") != CLIP_BINARY_FORMAT:
+        raise ValueError(f"Unsupported binary clip format {header.get('format')!r}")
+    return header
+
+
+def read_clip_header(path: Path) -> Dict[str, object]:
+    """Read only the JSON header of a binary clip file."""
+    with Path(path).open("rb") as f:
+        prelude = f.read(_PRELUDE.size)
+        _, header_len = _PRELUDE.unpack(prelude)
+        return _parse_clip_header(prelude + f.read(header_len))
+
+
+def decode_clip_binary(payload: bytes) -> Dict[str, np.ndarray]:
+    header = _parse_clip_header(payload)
+    clip = {}
+    for field, block in header["blocks"].items():
+        shape = tuple(block["shape"])
+        count = int(np.prod(shape))
+        dtype = block.get("dtype", header.get("dtype", "float32"))
+        if dtype == "int16":
+            stored = np.frombuffer(payload, dtype="<i2", count=count, offset=block["offset"]).reshape(shape)
+            clip[field] = _dequantize(stored, block)
+        else:
+            clip[field] = np.frombuffer(payload, dtype="<f4", count=count, offset=block["offset"]).reshape(shape)
+    return clip
+
+
+def read_clip(path: Path) -> Dict[str, np.ndarray]:
+    """Load a clip file in any of the encodings above."""
+    path = Path(path)
+    if path.suffix == ".json":
+        data = json.loads(path.read_text())
+        return {field: np.asarray(data[field], dtype=np.float32) for field in CLIP_FIELDS}
+    return decode_clip_binary(path.read_bytes())
+
+
+def read_motion(motions_dir: Path, entry: Dict[str, object]) -> Dict[str, np.ndarray]:
+    """Load the clip behind an index entry, joining chunked clips."""
+    parts = [read_clip(motions_dir / name) for name in entry_files(entry)]
+    if len(parts) == 1:
+        return parts[0]
+    return {field: np.concatenate([part[field] for part in parts]) for field in CLIP_FIELDS}
+
+
+def write_clip(motions_dir: Path, name: str, clip: Dict[str, np.ndarray], fmt: str = "json") -> str:
+    """Write ``clip`` in ``fmt`` (atomically) and return the file name relative to ``motions_dir``."""
+    file_name = clip_file_name(name, fmt)
+    motion_path = motions_dir / file_name
+    if fmt == "json":
+        with atomic_writer(motion_path) as f:
+            text = io.TextIOWrapper(f, encoding="utf-8", newline="\n")
+            write_clip_json(text, clip)
+            text.flush()
+            text.detach()
+    elif fmt == "binary":
+        with atomic_writer(motion_path) as f:
+            _write_packed(f, *_binary_layout(clip))
+    elif fmt in ("quantized", "quantized-delta"):
+        blocks, header_extra, errors = _quantized_layout(clip, delta=fmt == "quantized-delta")
+        check_quantization(name, errors)
+        with atomic_writer(motion_path) as f:
+            _write_packed(f, blocks, header_extra)
+        report = " ".join(f"{field}={err:.2e}" for field, err in errors.items())
+        print(f"{name}: max quantization error {report}")
+    else:
+        raise ValueError(f"Unsupported output format {fmt!r}")
+    return file_name
+
+
+def write_motion(motions_dir: Path,
+                 name: str,
+                 clip: Dict[str, np.ndarray],
+                 fmt: str = "json",
+                 chunk_frames: int = 0) -> Dict[str, object]:
+    """Write ``clip`` (split into ``chunk_frames``-row chunks when > 0) and return its index entry."""
+    frames = int(np.asarray(clip["joint_pos"]).shape[0])
+    if chunk_frames <= 0 or frames <= chunk_frames:
+        write_clip(motions_dir, name, clip, fmt)
+        return clip_index_entry(name, fmt)
+
+    chunks = []
+    for i, start in enumerate(range(0, frames, chunk_frames)):
+        part = {field: np.asarray(clip[field])[start:start + chunk_frames] for field in CLIP_FIELDS}
+        file_name = write_clip(motions_dir, f"{name}.{i:03d}", part, fmt)
+        chunks.append({"file": file_name, "frames": int(part["joint_pos"].shape[0])})
+    entry: Dict[str, object] = {"name": name, "frames": frames, "chunks": chunks}
+    encoding = FORMAT_ENCODINGS[fmt]
+    if encoding != "json":
+        entry["encoding"] = encoding
+    return entry
+
+
+def write_pack(pack_path: Path, motions_dir: Path, entries: List[Dict[str, object]]) -> int:
+    """Pack the single-file binary clips listed in ``entries`` into ``pack_path``.
+
+    Clips are streamed from ``motions_dir`` one at a time; returns the pack size.
+    """
+    described = []
+    for entry in entries:
+        if "chunks" in entry or entry.get("encoding") != "binary":
+            raise ValueError(f"Only single-file binary clips can be packed ({entry.get('name')})")
+        clip_path = motions_dir / str(entry["file"])
+        header = read_clip_header(clip_path)
+        joint_block = header["blocks"]["joint_pos"]
+        described.append({
+            **{key: value for key, value in entry.items() if key not in ("file", "features")},
+            "frames": int(header.get("frames", joint_block["shape"][0])),
+            "dtype": joint_block.get("dtype", header.get("dtype", "float32")),
+            "length": clip_path.stat().st_size
+        })
+
+    def build_header(data_start: int) -> bytes:
+        offset = data_start
+        for item in described:
+            offset += (-offset) % _PACK_ALIGN
+            item["offset"] = offset
+            offset += item["length"]
+        return json.dumps({"format": PACK_FORMAT, "motions": described}, separators=(",", ":")).encode("utf-8")
+
+    header_len = len(build_header(0)) + 64
+    header_len += (-(_PRELUDE.size + header_len)) % _PACK_ALIGN
+    raw = build_header(_PRELUDE.size + header_len)
+    if len(raw) > header_len:
+        raise ValueError("Pack header does not fit its reserved size")
+
+    with atomic_writer(pack_path) as out:
+        out.write(_PRELUDE.pack(PACK_MAGIC, header_len))
+        out.write(raw.ljust(header_len, b" "))
+        position = _PRELUDE.size + header_len
+        for entry, item in zip(entries, described):
+            out.write(b"\0" * (item["offset"] - position))
+            with (motions_dir / str(entry["file"])).open("rb") as clip_file:
+                shutil.copyfileobj(clip_file, out)
+            position = item["offset"] + item["length"]
+    return position
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Content search over a motion index using the descriptors in motion_features.py.
+
+  build   compute missing ``features`` for the clips of an index, in batch:
+            python3 scripts/motion_search.py build --index public/examples/checkpoints/g1/motions.json --jobs 8
+  query   list the clips closest to one clip:
+            python3 scripts/motion_search.py query walk1_subject1 -k 10
+  dedupe  group near-identical clips and write <index>.duplicates.json;
+          --apply also drops all but the first clip of each group from the index
+          (clip files are left in place):
+            python3 scripts/motion_search.py dedupe --threshold 0.05 --apply
+
+The exporters already store descriptors for the clips they write; ``build``
+fills in older entries. Descriptors are compared, never full trajectories, so
+query and dedupe stay fast on libraries of tens of thousands of clips.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from add_motion_clips import DEFAULT_FPS, load_or_init_index, resolve_motions_dir
+from atomic_io import atomic_write_text, file_lock
+from motion_features import SEARCH_DIMS, clip_features, duplicate_groups, feature_matrix, has_features, near_pairs, nearest
+from motion_format import entry_files, read_motion
+
+
+DEFAULT_THRESHOLD = 0.05
+
+
+def duplicates_path_for(index_path: Path) -> Path:
+    return index_path.with_name(f"{index_path.stem}.duplicates.json")
+
+
+def describe_entry(entry: Dict[str, object], motions_dir: Path, fps: float) -> Tuple[str, Optional[dict], Optional[str]]:
+    """Return ``(name, features or None, error or None)``; never raises."""
+    try:
+        return str(entry["name"]), clip_features(read_motion(motions_dir, entry), fps), None
+    except Exception as exc:  # noqa: BLE001 - reported per clip
+        return str(entry.get("name")), None, f"{type(exc).__name__}: {exc}"
+
+
+def described_entries(motions: List[dict]) -> List[dict]:
+    entries = [entry for entry in motions if isinstance(entry, dict) and has_features(entry)]
+    missing = len(motions) - len(entries)
+    if missing:
+        print(f"{missing} clip(s) have no descriptors; run `build` first to include them.", file=sys.stderr)
+    return entries
+
+
+def build(args: argparse.Namespace) -> None:
+    index, motions = load_or_init_index(args.index)
+    motions_dir = resolve_motions_dir(args.index, index, args.motions_dir)
+    todo = [entry for entry in motions
+            if isinstance(entry, dict) and entry.get("name") and (args.force or not has_features(entry))]
+    worker = partial(describe_entry, motions_dir=motions_dir, fps=args.fps)
+    if args.jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            results = list(executor.map(worker, todo, chunksize=16))
+    else:
+        results = [worker(entry) for entry in todo]
+
+    computed = {}
+    failed = 0
+    for entry, (name, features, error) in zip(todo, results):
+        if features is None:
+            failed += 1
+            print(f"Failed {name}: {error}", file=sys.stderr)
+        else:
+            computed[name] = (entry_files(entry), features)
+
+    # Merge into a fresh read so entries added or replaced meanwhile are kept.
+    updated = 0
+    with file_lock(args.index):
+        index, motions = load_or_init_index(args.index)
+        for entry in motions:
+            if not isinstance(entry, dict) or entry.get("name") not in computed:
+                continue
+            files, features = computed[entry["name"]]
+            if entry_files(entry) == files:
+                entry["features"] = features
+                updated += 1
+        index["motions"] = motions
+        atomic_write_text(args.index, json.dumps(index, ensure_ascii=False, indent=2))
+    print(f"Described {updated} clip(s), {len(motions) - len(todo)} already described, failed {failed}.")
+
+
+def query(args: argparse.Namespace) -> None:
+    _, motions = load_or_init_index(args.index)
+    entries = described_entries(motions)
+    names = [entry["name"] for entry in entries]
+    if args.name not in names:
+        raise ValueError(f"No described clip named {args.name!r} in {args.index}")
+    vectors = feature_matrix(entries)
+    order, dist = nearest(vectors, vectors[names.index(args.name)], args.k + 1)
+    for i, d in zip(order, dist):
+        if names[i] != args.name:
+            print(f"{d:8.4f}  {names[i]}")
+
+
+def dedupe(args: argparse.Namespace) -> None:
+    _, motions = load_or_init_index(args.index)
+    entries = described_entries(motions)
+    vectors = feature_matrix(entries)
+    pairs = near_pairs(vectors, args.threshold, args.dims or None)
+    groups = []
+    for members in duplicate_groups(len(entries), pairs):
+        keep = members[0]
+        groups.append({
+            "keep": entries[keep]["name"],
+            "duplicates": [{"name": entries[i]["name"],
+                            "distance": round(float(np.linalg.norm(vectors[i] - vectors[keep])), 6)}
+                           for i in members[1:]]
+        })
+    dropped = {item["name"] for group in groups for item in group["duplicates"]}
+
+    report_path = duplicates_path_for(args.index)
+    payload = {"threshold": args.threshold, "clips": len(entries), "duplicates": len(dropped), "groups": groups}
+    atomic_write_text(report_path, json.dumps(payload, ensure_ascii=False, indent=2))
+    for group in groups:
+        print(f"{group['keep']}: {', '.join(item['name'] for item in group['duplicates'])}")
+    print(f"{len(dropped)} duplicate(s) in {len(groups)} group(s) among {len(entries)} clip(s); report at {report_path}")
+
+    if args.apply and dropped:
+        with file_lock(args.index):
+            index, motions = load_or_init_index(args.index)
+            index["motions"] = [entry for entry in motions
+                                if not (isinstance(entry, dict) and entry.get("name") in dropped)]
+            atomic_write_text(args.index, json.dumps(index, ensure_ascii=False, indent=2))
+        print(f"Removed {len(motions) - len(index['motions'])} clip(s) from {args.index}")
+
+
+def parse_args() -> argparse.Namespace:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--index",
+        type=Path,
+        default=Path("public/examples/checkpoints/g1/motions.json"),
+        help="Motion index JSON path."
+    )
+    parser = argparse.ArgumentParser(description="Describe, search and deduplicate motion clips.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", parents=[common], help="Compute missing clip descriptors.")
+    build_parser.add_argument(
+        "--motions-dir",
+        type=Path,
+        default=None,
+        help="Clip directory (defaults to the index base_path)."
+    )
+    build_parser.add_argument(
+        "--fps",
+        type=float,
+        default=DEFAULT_FPS,
+        help="Frame rate of the exported clips."
+    )
+    build_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes."
+    )
+    build_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Recompute descriptors that are already present."
+    )
+    build_parser.set_defaults(func=build)
+
+    query_parser = commands.add_parser("query", parents=[common], help="List the clips closest to one clip.")
+    query_parser.add_argument("name", help="Motion name to search from.")
+    query_parser.add_argument(
+        "-k",
+        type=int,
+        default=10,
+        help="Number of neighbours to list."
+    )
+    query_parser.set_defaults(func=query)
+
+    dedupe_parser = commands.add_parser("dedupe", parents=[common], help="Group near-identical clips.")
+    dedupe_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Descriptor distance below which two clips count as duplicates (~RMS joint difference in rad)."
+    )
+    dedupe_parser.add_argument(
+        "--dims",
+        type=int,
+        default=SEARCH_DIMS,
+        help="Principal components used to find candidate pairs (0 = full descriptors)."
+    )
+    dedupe_parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Remove all but the first clip of each group from the index."
+    )
+    dedupe_parser.set_defaults(func=dedupe)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Vectorized whole-clip transforms applied by the exporters before writing:
+resampling to the policy control rate and yaw/position canonicalization.
+
+Quaternions are ``wxyz`` throughout, matching the exported ``root_quat``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+
+
+def quat_multiply(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Hamilton product of ``(..., 4)`` wxyz quaternions (broadcasting)."""
+    aw, ax, ay, az = np.moveaxis(np.asarray(a), -1, 0)
+    bw, bx, by, bz = np.moveaxis(np.asarray(b), -1, 0)
+    return np.stack([
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw
+    ], axis=-1)
+
+
+def quat_yaw(quat: np.ndarray) -> np.ndarray:
+    w, x, y, z = np.moveaxis(np.asarray(quat, dtype=np.float64), -1, 0)
+    return np.arctan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+
+
+def canonicalize_clip(clip: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Move the first frame to the XY origin with zero yaw.
+
+    Every frame gets the same rigid transform (translation in XY, rotation
+    about Z), so root height, relative motion and joint angles are unchanged.
+    The viewer then aligns a canonical clip to the robot with a single yaw
+    rotation plus XY offset, applied lazily per frame.
+    """
+    root_pos = np.asarray(clip["root_pos"], dtype=np.float64)
+    root_quat = np.asarray(clip["root_quat"], dtype=np.float64)
+    if root_pos.shape[0] == 0:
+        return dict(clip)
+
+    yaw = float(quat_yaw(root_quat[0]))
+    c, s = np.cos(yaw), np.sin(yaw)
+    dx = root_pos[:, 0] - root_pos[0, 0]
+    dy = root_pos[:, 1] - root_pos[0, 1]
+    canonical_pos = root_pos.copy()
+    canonical_pos[:, 0] = c * dx + s * dy
+    canonical_pos[:, 1] = -s * dx + c * dy
+
+    inv_yaw = np.array([np.cos(0.5 * yaw), 0.0, 0.0, -np.sin(0.5 * yaw)])
+    canonical_quat = quat_multiply(inv_yaw, root_quat)
+
+    result = dict(clip)
+    result["root_pos"] = canonical_pos.astype(np.float32)
+    result["root_quat"] = canonical_quat.astype(np.float32)
+    return result
+
+
+def quat_slerp(q0: np.ndarray, q1: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Batched slerp between ``(N, 4)`` wxyz quaternions at fractions ``t`` (N,)."""
+    q0 = np.asarray(q0, dtype=np.float64)
+    q1 = np.asarray(q1, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)[:, None]
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+    # Take the short way round; q and -q are the same rotation.
+    q1 = np.where(dot < 0.0, -q1, q1)
+    dot = np.abs(dot)
+
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_theta = np.sin(theta)
+    near = sin_theta < 1e-6
+    safe = np.where(near, 1.0, sin_theta)
+    w0 = np.where(near, 1.0 - t, np.sin((1.0 - t) * theta) / safe)
+    w1 = np.where(near, t, np.sin(t * theta) / safe)
+    out = w0 * q0 + w1 * q1
+    return out / np.linalg.norm(out, axis=-1, keepdims=True)
+
+
+def resampled_length(frames: int, source_fps: float, target_fps: float) -> int:
+    """Number of ``target_fps`` frames that fit inside ``frames`` source frames."""
+    if frames <= 0:
+        return 0
+    return int(np.floor((frames - 1) * target_fps / source_fps + 1e-9)) + 1
+
+
+def source_frames_for(frames: Optional[int], source_fps: float, target_fps: float) -> Optional[int]:
+    """Source frames needed to produce ``frames`` resampled frames (None = all)."""
+    if frames is None:
+        return None
+    if frames <= 0:
+        return 0
+    return int(np.ceil((frames - 1) * source_fps / target_fps - 1e-9)) + 1
+
+
+def resample_clip(clip: Dict[str, np.ndarray],
+                  source_fps: float,
+                  target_fps: float,
+                  max_frames: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Resample a clip from ``source_fps`` to ``target_fps``.
+
+    Joint positions and root position are linearly interpolated and root
+    quaternions slerped, all as whole-array gathers. Output frame ``k`` samples
+    source time ``k / target_fps``; the clip is cut at ``max_frames``.
+    """
+    if source_fps <= 0 or target_fps <= 0:
+        raise ValueError(f"Frame rates must be positive, got {source_fps} -> {target_fps}")
+    frames = int(np.asarray(clip["joint_pos"]).shape[0])
+    if source_fps == target_fps or frames == 0:
+        if max_frames is None:
+            return dict(clip)
+        return {key: np.asarray(value)[:max_frames] for key, value in clip.items()}
+
+    count = resampled_length(frames, source_fps, target_fps)
+    if max_frames is not None:
+        count = min(count, max_frames)
+    u = np.arange(count, dtype=np.float64) * (source_fps / target_fps)
+    i0 = np.minimum(np.floor(u).astype(np.intp), frames - 1)
+    i1 = np.minimum(i0 + 1, frames - 1)
+    alpha = u - i0
+
+    result = dict(clip)
+    a = alpha[:, None]
+    for field in ("joint_pos", "root_pos"):
+        data = np.asarray(clip[field], dtype=np.float64)
+        result[field] = ((1.0 - a) * data[i0] + a * data[i1]).astype(np.float32)
+    quat = np.asarray(clip["root_quat"], dtype=np.float64)
+    result["root_quat"] = quat_slerp(quat[i0], quat[i1], alpha).astype(np.float32)
+    return result
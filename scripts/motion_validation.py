@@ -0,0 +1,210 @@
+"""
+Export-time validation of motion clips against the G1 model.
+
+``validate_clip`` checks a whole clip at once (every check is one vectorized
+pass over the ``(T, J)`` arrays) and returns a JSON-serializable report plus a
+per-frame mask of bad frames:
+
+  * ``non_finite``        - NaN/inf in any field,
+  * ``joint_limits``      - joints outside the MJCF ``range`` (+ ``JOINT_LIMIT_MARGIN``),
+  * ``quat_norm``         - root quaternions whose norm is off by more than ``QUAT_NORM_TOL``,
+  * ``joint_velocity``    - frame-to-frame joint speed above ``MAX_JOINT_VELOCITY``,
+  * ``root_velocity``     - frame-to-frame root speed above ``MAX_ROOT_VELOCITY``,
+  * ``root_height``       - root below ``MIN_ROOT_HEIGHT``.
+
+Checks run on the clip as it will be exported (remapped and resampled).
+``trim_clip`` cuts a clip down to its longest run of good frames.
+"""
+
+from __future__ import annotations
+
+import json
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from atomic_io import atomic_write_text
+
+
+DEFAULT_MODEL = Path(__file__).resolve().parents[1] / "public" / "examples" / "scenes" / "g1" / "g1.xml"
+VALIDATION_MODES = ("report", "fail", "trim")
+
+JOINT_LIMIT_MARGIN = 0.05  # rad; retargeted mocap grazes the limits
+QUAT_NORM_TOL = 1e-2
+MAX_JOINT_VELOCITY = 30.0  # rad/s
+MAX_ROOT_VELOCITY = 10.0  # m/s
+MIN_ROOT_HEIGHT = 0.1  # m; the pelvis collision sphere alone sits higher
+
+
+def _resolve_joint_defaults(default: ET.Element,
+                            inherited: Dict[str, str],
+                            classes: Dict[str, Dict[str, str]]) -> None:
+    attrs = dict(inherited)
+    joint = default.find("joint")
+    if joint is not None:
+        attrs.update(joint.attrib)
+    classes[default.get("class", "main")] = attrs
+    for child in default.findall("default"):
+        _resolve_joint_defaults(child, attrs, classes)
+
+
+def _collect_joints(body: ET.Element,
+                    childclass: str,
+                    classes: Dict[str, Dict[str, str]],
+                    limits: Dict[str, Tuple[float, float]]) -> None:
+    childclass = body.get("childclass", childclass)
+    for joint in body.findall("joint"):
+        attrs = dict(classes.get(joint.get("class", childclass), {}))
+        attrs.update(joint.attrib)
+        if "name" in attrs and "range" in attrs:
+            lo, hi = (float(v) for v in attrs["range"].split())
+            limits[attrs["name"]] = (lo, hi)
+    for child in body.findall("body"):
+        _collect_joints(child, childclass, classes, limits)
+
+
+@lru_cache(maxsize=None)
+def load_joint_limits(model_path: Path) -> Dict[str, Tuple[float, float]]:
+    """Read ``{joint name: (lo, hi)}`` from an MJCF, resolving default classes."""
+    root = ET.parse(model_path).getroot()
+    compiler = root.find("compiler")
+    if compiler is not None and compiler.get("angle", "degree") != "radian":
+        raise ValueError(f"{model_path} uses degrees; only radian models are supported")
+    classes: Dict[str, Dict[str, str]] = {}
+    for default in root.findall("default"):
+        _resolve_joint_defaults(default, {}, classes)
+    limits: Dict[str, Tuple[float, float]] = {}
+    worldbody = root.find("worldbody")
+    if worldbody is not None:
+        _collect_joints(worldbody, "main", classes, limits)
+    return limits
+
+
+@lru_cache(maxsize=None)
+def limit_arrays(model_path: Path, joint_names: Tuple[str, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-column ``(lo, hi)`` for ``joint_names``; joints without a range get +-inf."""
+    limits = load_joint_limits(model_path)
+    lo = np.array([limits.get(name, (-np.inf, np.inf))[0] for name in joint_names])
+    hi = np.array([limits.get(name, (-np.inf, np.inf))[1] for name in joint_names])
+    lo.setflags(write=False)
+    hi.setflags(write=False)
+    return lo, hi
+
+
+def _summarize(bad: np.ndarray, excess: Optional[np.ndarray] = None) -> Dict[str, object]:
+    frames = np.flatnonzero(bad)
+    summary: Dict[str, object] = {"frames": int(frames.size), "first_frame": int(frames[0])}
+    if excess is not None:
+        summary["max"] = float(np.max(excess[bad]))
+    return summary
+
+
+def longest_good_run(bad: np.ndarray) -> Tuple[int, int]:
+    """Return ``[start, stop)`` of the longest run of False in ``bad``."""
+    padded = np.concatenate([[True], bad, [True]])
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    if edges.size == 0:
+        return 0, 0
+    starts, stops = edges[0::2], edges[1::2]
+    best = int(np.argmax(stops - starts))
+    return int(starts[best]), int(stops[best])
+
+
+def validate_clip(clip: Dict[str, np.ndarray],
+                  joint_names: Sequence[str],
+                  fps: float,
+                  model_path: Path = DEFAULT_MODEL) -> Tuple[Dict[str, object], np.ndarray]:
+    """Check ``clip`` and return ``(report, bad)`` where ``bad`` flags frames."""
+    joint_pos = np.asarray(clip["joint_pos"], dtype=np.float64)
+    root_quat = np.asarray(clip["root_quat"], dtype=np.float64)
+    root_pos = np.asarray(clip["root_pos"], dtype=np.float64)
+    frames = joint_pos.shape[0]
+    issues: Dict[str, Dict[str, object]] = {}
+    bad = np.zeros(frames, dtype=bool)
+
+    def flag(check: str, mask: np.ndarray, excess: Optional[np.ndarray] = None) -> None:
+        if mask.any():
+            issues[check] = _summarize(mask, excess)
+            bad[:] |= mask
+
+    finite = np.isfinite(joint_pos).all(axis=1) & np.isfinite(root_quat).all(axis=1) & np.isfinite(root_pos).all(axis=1)
+    flag("non_finite", ~finite)
+
+    with np.errstate(invalid="ignore"):
+        lo, hi = limit_arrays(Path(model_path), tuple(joint_names))
+        over_cols = np.maximum(lo - joint_pos, joint_pos - hi)
+        over = over_cols.max(axis=1) if frames else np.zeros(0)
+        flag("joint_limits", over > JOINT_LIMIT_MARGIN, over)
+        if "joint_limits" in issues:
+            columns = (over_cols > JOINT_LIMIT_MARGIN).any(axis=0)
+            issues["joint_limits"]["joints"] = [name for name, hit in zip(joint_names, columns) if hit]
+
+        norm_error = np.abs(np.linalg.norm(root_quat, axis=1) - 1.0)
+        flag("quat_norm", norm_error > QUAT_NORM_TOL, norm_error)
+
+        # A spike is charged to the later frame of the pair.
+        joint_speed = np.zeros(frames)
+        root_speed = np.zeros(frames)
+        if frames > 1:
+            joint_speed[1:] = np.abs(np.diff(joint_pos, axis=0)).max(axis=1) * fps
+            root_speed[1:] = np.linalg.norm(np.diff(root_pos, axis=0), axis=1) * fps
+        flag("joint_velocity", joint_speed > MAX_JOINT_VELOCITY, joint_speed)
+        flag("root_velocity", root_speed > MAX_ROOT_VELOCITY, root_speed)
+
+        flag("root_height", root_pos[:, 2] < MIN_ROOT_HEIGHT, MIN_ROOT_HEIGHT - root_pos[:, 2])
+
+    report: Dict[str, object] = {
+        "frames": frames,
+        "ok": not issues,
+        "bad_frames": int(bad.sum()),
+        "issues": issues
+    }
+    if issues:
+        report["longest_valid"] = list(longest_good_run(bad))
+    return report, bad
+
+
+def trim_clip(clip: Dict[str, np.ndarray], bad: np.ndarray) -> Tuple[Dict[str, np.ndarray], Tuple[int, int]]:
+    """Keep only the longest run of good frames of ``clip``."""
+    start, stop = longest_good_run(bad)
+    trimmed = {key: np.asarray(value)[start:stop] for key, value in clip.items()}
+    return trimmed, (start, stop)
+
+
+def check_clip(name: str,
+               clip: Dict[str, np.ndarray],
+               joint_names: Sequence[str],
+               fps: float,
+               mode: str,
+               model_path: Path = DEFAULT_MODEL) -> Tuple[Optional[Dict[str, np.ndarray]], Dict[str, object]]:
+    """Validate ``clip`` and apply ``mode``.
+
+    Returns ``(clip or None, report)``: ``report`` mode passes the clip through,
+    ``trim`` cuts it to its longest good run (None if nothing is left), and
+    ``fail`` returns None for invalid clips so the caller can stop the export.
+    """
+    report, bad = validate_clip(clip, joint_names, fps, model_path)
+    report = {"name": name, **report}
+    if report["ok"] or mode == "report":
+        return clip, report
+    if mode == "trim":
+        clip, (start, stop) = trim_clip(clip, bad)
+        report["trimmed"] = [start, stop]
+        return (clip if stop > start else None), report
+    return None, report
+
+
+def report_path_for(index_path: Path) -> Path:
+    return index_path.with_name(f"{index_path.stem}.validation.json")
+
+
+def write_report(path: Path, reports: List[Dict[str, object]], mode: str) -> int:
+    """Write the per-clip report and return the number of invalid clips."""
+    invalid = sum(1 for report in reports if not report["ok"])
+    payload = {"mode": mode, "clips": len(reports), "invalid": invalid, "reports": reports}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, json.dumps(payload, ensure_ascii=False, indent=2))
+    return invalid
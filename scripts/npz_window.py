@@ -0,0 +1,144 @@
+"""
+Read a ``[start, stop)`` frame window from ``.npz`` members without loading
+the whole array.
+
+``np.load`` on an npz decompresses every member it is asked for in full, so a
+120 s slice of an hour-long capture costs the memory of the entire capture.
+``read_npz_window`` instead:
+
+  * memory-maps members stored uncompressed (``np.savez``) and copies out only
+    the requested rows, and
+  * streams compressed members (``np.savez_compressed``) in bounded chunks,
+    discarding rows before ``start`` and stopping after ``stop``.
+
+Peak memory therefore tracks the exported window, not the source file. Members
+that cannot be windowed (object dtype, Fortran order) fall back to ``np.load``.
+"""
+
+from __future__ import annotations
+
+import struct
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+CHUNK_BYTES = 4 << 20
+
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+
+
+def _read_npy_header(fp) -> Tuple[Tuple[int, ...], bool, np.dtype]:
+    version = np.lib.format.read_magic(fp)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(fp)
+    return np.lib.format.read_array_header_2_0(fp)
+
+
+def _member_data_offset(npz_path: Path, info: zipfile.ZipInfo) -> int:
+    with npz_path.open("rb") as f:
+        f.seek(info.header_offset)
+        fields = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+        name_len, extra_len = fields[-2], fields[-1]
+        return info.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+
+
+def resolve_window(frames: int, start: int, end: Optional[int], max_frames: Optional[int]) -> Tuple[int, int]:
+    """Translate ``start``/``end`` (``-1``/``None`` = to the end) and a frame cap into ``[lo, hi)``."""
+    stop = None if end is None or end == -1 else end
+    lo, hi, _ = slice(start, stop).indices(frames)
+    hi = max(hi, lo)
+    if max_frames is not None:
+        hi = min(hi, lo + max_frames)
+    return lo, hi
+
+
+def _read_stored(npz_path: Path, info: zipfile.ZipInfo, lo: int, hi: int) -> Optional[np.ndarray]:
+    offset = _member_data_offset(npz_path, info)
+    with npz_path.open("rb") as f:
+        f.seek(offset)
+        shape, fortran_order, dtype = _read_npy_header(f)
+        header_end = f.tell()
+    if fortran_order or dtype.hasobject or not shape:
+        return None
+    lo, hi = min(lo, shape[0]), min(hi, shape[0])
+    if hi <= lo:
+        return np.empty((0,) + tuple(shape[1:]), dtype=dtype)
+    mapped = np.memmap(npz_path, dtype=dtype, mode="r", offset=header_end, shape=tuple(shape))
+    window = np.array(mapped[lo:hi])
+    del mapped
+    return window
+
+
+def _read_compressed(zf: zipfile.ZipFile, info: zipfile.ZipInfo, lo: int, hi: int) -> Optional[np.ndarray]:
+    with zf.open(info) as fp:
+        shape, fortran_order, dtype = _read_npy_header(fp)
+        if fortran_order or dtype.hasobject or not shape:
+            return None
+        lo, hi = min(lo, shape[0]), min(hi, shape[0])
+        row_bytes = int(np.prod(shape[1:], dtype=np.int64)) * dtype.itemsize
+        window = np.empty((max(hi - lo, 0),) + tuple(shape[1:]), dtype=dtype)
+
+        skip = lo * row_bytes
+        while skip > 0:
+            chunk = fp.read(min(CHUNK_BYTES, skip))
+            if not chunk:
+                raise ValueError(f"Truncated npz member {info.filename}")
+            skip -= len(chunk)
+
+        out = window.reshape(-1).view(np.uint8)
+        pos = 0
+        while pos < out.size:
+            chunk = fp.read(min(CHUNK_BYTES, out.size - pos))
+            if not chunk:
+                raise ValueError(f"Truncated npz member {info.filename}")
+            out[pos:pos + len(chunk)] = np.frombuffer(chunk, dtype=np.uint8)
+            pos += len(chunk)
+    return window
+
+
+def member_frames(npz_path: Path, key: str) -> int:
+    """Return the leading dimension of ``key`` without reading its data."""
+    with zipfile.ZipFile(npz_path) as zf:
+        with zf.open(f"{key}.npy") as fp:
+            shape, _, _ = _read_npy_header(fp)
+    return int(shape[0])
+
+
+def read_npz_window(npz_path: Path,
+                    keys: Iterable[str],
+                    start: int = 0,
+                    end: Optional[int] = None,
+                    max_frames: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Read rows ``[start, end)`` (capped at ``max_frames``) of each key in ``keys``.
+
+    The window is resolved against the first key's frame count so every member
+    is cut to the same rows.
+    """
+    npz_path = Path(npz_path)
+    keys = list(keys)
+    lo, hi = resolve_window(member_frames(npz_path, keys[0]), start, end, max_frames)
+
+    arrays: Dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(npz_path) as zf:
+        for key in keys:
+            info = zf.getinfo(f"{key}.npy")
+            if info.compress_type == zipfile.ZIP_STORED:
+                window = _read_stored(npz_path, info, lo, hi)
+            else:
+                window = _read_compressed(zf, info, lo, hi)
+            if window is None:
+                with np.load(npz_path, allow_pickle=True) as data:
+                    window = np.asarray(data[key])[lo:hi]
+            arrays[key] = window
+    return arrays
+
+
+def read_npz_member(npz_path: Path, key: str, default: object = None) -> object:
+    """Load one small member (e.g. ``joint_names``) without touching the others."""
+    with np.load(npz_path, allow_pickle=True) as data:
+        if key not in data.files:
+            return default
+        return data[key]
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Offline mesh optimization for the MJCF scenes under public/examples/scenes.
+
+For every ``<mesh>`` of a scene this writes, into ``<meshdir>/opt/``:
+
+  * ``<stem>.lod0.msh`` - the source STL with exact duplicate vertices merged
+                          and degenerate/duplicate triangles dropped (lossless),
+  * ``<stem>.lodN.msh`` - decimated render LODs, one per ``--lod-error``, made
+                          by vertex clustering on a grid whose cells are small
+                          enough that no vertex moves further than that error.
+
+``.msh`` is MuJoCo's binary indexed mesh format: four int32 counts (vertices,
+normals, texcoords, faces), float32 vertices and int32 faces; normals are left
+to MuJoCo as for STL. ``--format obj`` writes indexed OBJ instead.
+
+The scene XML is rewritten so each mesh references ``--render-lod``; meshes
+used by a colliding geom always keep LOD 0 so contacts are unchanged. Then
+``generate_index.py`` refreshes ``files.json``, which lists only meshes some
+scene references, so the source STLs and unused LODs are not downloaded.
+
+Meshes are processed in a worker pool. ``opt/manifest.json`` remembers each
+mesh's source file and hash, so re-running is incremental and keeps working
+after the XML stops pointing at the STLs:
+
+  python3 scripts/optimize_meshes.py --scene public/examples/scenes/g1/g1.xml --jobs 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import struct
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from atomic_io import atomic_write_bytes, atomic_write_text
+
+
+DEFAULT_SCENE = Path(__file__).resolve().parents[1] / "public" / "examples" / "scenes" / "g1" / "g1.xml"
+DEFAULT_LOD_ERRORS = (0.0005, 0.002)  # m
+DEFAULT_RENDER_LOD = 1
+MESH_FORMATS = ("msh", "obj")
+OPT_DIR = "opt"
+MANIFEST_NAME = "manifest.json"
+# Bump whenever the meshes produced for the same inputs change.
+OPTIMIZER_VERSION = 1
+_STL_RECORD = np.dtype([("normal", "<f4", 3), ("vertices", "<f4", (3, 3)), ("attr", "<u2")])
+
+
+def read_stl(path: Path) -> np.ndarray:
+    """Return the ``(F, 3, 3)`` float32 triangles of a binary or ASCII STL."""
+    data = path.read_bytes()
+    if len(data) >= 84:
+        (count,) = struct.unpack_from("<I", data, 80)
+        if len(data) == 84 + count * _STL_RECORD.itemsize:
+            return np.frombuffer(data, dtype=_STL_RECORD, count=count, offset=84)["vertices"].astype(np.float32)
+    coords = re.findall(rb"vertex\s+(\S+)\s+(\S+)\s+(\S+)", data)
+    if not coords or len(coords) % 3:
+        raise ValueError(f"{path} is not a valid STL file")
+    return np.asarray(coords, dtype=np.float32).reshape(-1, 3, 3)
+
+
+def _clean_faces(faces: np.ndarray) -> np.ndarray:
+    """Drop triangles with repeated corners and repeats of the same oriented triangle."""
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])]
+    if faces.size == 0:
+        return faces.reshape(0, 3)
+    # Rotate each triangle so its smallest index comes first; orientation is kept.
+    shift = np.argmin(faces, axis=1)
+    rows = np.arange(faces.shape[0])[:, None]
+    rotated = faces[rows, (shift[:, None] + np.arange(3)) % 3]
+    _, first = np.unique(rotated, axis=0, return_index=True)
+    return faces[np.sort(first)]
+
+
+def weld(triangles: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge bit-identical vertices; returns ``(vertices, faces)``."""
+    vertices, inverse = np.unique(triangles.reshape(-1, 3), axis=0, return_inverse=True)
+    faces = _clean_faces(inverse.reshape(-1, 3).astype(np.int32))
+    return _compact(vertices, faces)
+
+
+def _compact(vertices: np.ndarray, faces: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    used, faces = np.unique(faces, return_inverse=True)
+    return vertices[used].astype(np.float32), faces.reshape(-1, 3).astype(np.int32)
+
+
+def cluster(vertices: np.ndarray, faces: np.ndarray, error: float) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Decimate by vertex clustering so that no vertex moves more than ``error``.
+
+    Vertices are binned into cubes whose diagonal is ``error`` and replaced by
+    their cell's centroid. The centroid lies in the same cube, so no vertex
+    moves further than the diagonal. Returns ``(vertices, faces, measured max
+    displacement)``.
+    """
+    cell = error / np.sqrt(3.0)
+    keys = np.floor((vertices - vertices.min(axis=0)) / cell).astype(np.int64)
+    _, labels = np.unique(keys, axis=0, return_inverse=True)
+    labels = labels.reshape(-1)
+    counts = np.bincount(labels).astype(np.float64)
+    centroids = np.stack([np.bincount(labels, weights=vertices[:, axis]) for axis in range(3)], axis=1)
+    centroids /= counts[:, None]
+    displacement = float(np.max(np.linalg.norm(centroids[labels] - vertices, axis=1))) if len(vertices) else 0.0
+    merged_faces = _clean_faces(labels[faces].astype(np.int32))
+    merged, merged_faces = _compact(centroids, merged_faces)
+    return merged, merged_faces, displacement
+
+
+def encode_msh(vertices: np.ndarray, faces: np.ndarray) -> bytes:
+    header = np.array([len(vertices), 0, 0, len(faces)], dtype="<i4")
+    return header.tobytes() + vertices.astype("<f4").tobytes() + faces.astype("<i4").tobytes()
+
+
+def encode_obj(vertices: np.ndarray, faces: np.ndarray) -> bytes:
+    lines = [f"v {x:.7g} {y:.7g} {z:.7g}" for x, y, z in vertices.tolist()]
+    lines += [f"f {a} {b} {c}" for a, b, c in (faces + 1).tolist()]
+    return ("\n".join(lines) + "\n").encode("ascii")
+
+
+def optimize_mesh(task: Tuple[str, Path, Path],
+                  errors: Sequence[float],
+                  fmt: str) -> Dict[str, object]:
+    """Write LOD 0 and one decimated LOD per error for one source mesh."""
+    name, source, out_dir = task
+    vertices, faces = weld(read_stl(source))
+    encode = encode_msh if fmt == "msh" else encode_obj
+    levels = []
+    for lod, error in enumerate([0.0, *errors]):
+        if lod == 0:
+            lod_vertices, lod_faces, displacement = vertices, faces, 0.0
+        else:
+            lod_vertices, lod_faces, displacement = cluster(vertices, faces, error)
+        payload = encode(lod_vertices, lod_faces)
+        file_name = f"{source.stem}.lod{lod}.{fmt}"
+        atomic_write_bytes(out_dir / file_name, payload)
+        levels.append({"file": file_name, "error": error, "max_displacement": round(displacement, 7),
+                       "vertices": int(len(lod_vertices)), "faces": int(len(lod_faces)), "bytes": len(payload)})
+    return {"name": name, "levels": levels}
+
+
+def _resolve_geom_defaults(default: ET.Element,
+                           inherited: Dict[str, str],
+                           classes: Dict[str, Dict[str, str]]) -> None:
+    attrs = dict(inherited)
+    geom = default.find("geom")
+    if geom is not None:
+        attrs.update(geom.attrib)
+    classes[default.get("class", "main")] = attrs
+    for child in default.findall("default"):
+        _resolve_geom_defaults(child, attrs, classes)
+
+
+def colliding_meshes(root: ET.Element) -> set:
+    """Names of meshes used by at least one geom that can take part in contacts."""
+    classes: Dict[str, Dict[str, str]] = {}
+    for default in root.findall("default"):
+        _resolve_geom_defaults(default, {}, classes)
+    colliding = set()
+
+    def visit(body: ET.Element, childclass: str) -> None:
+        childclass = body.get("childclass", childclass)
+        for geom in body.findall("geom"):
+            attrs = dict(classes.get(geom.get("class", childclass), {}))
+            attrs.update(geom.attrib)
+            if "mesh" in attrs and (int(attrs.get("contype", 1)) or int(attrs.get("conaffinity", 1))):
+                colliding.add(attrs["mesh"])
+        for child in body.findall("body"):
+            visit(child, childclass)
+
+    worldbody = root.find("worldbody")
+    if worldbody is not None:
+        visit(worldbody, "main")
+    return colliding
+
+
+def file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def rewrite_mesh_files(xml_text: str, files: Dict[str, str]) -> str:
+    """Point each ``<mesh name=...>`` at ``files[name]``, leaving the rest of the XML untouched."""
+    def replace(match: re.Match) -> str:
+        tag = match.group(0)
+        name = re.search(r'\bname="([^"]*)"', tag)
+        old = re.search(r'\bfile="([^"]*)"', tag)
+        if old is None:
+            return tag
+        key = name.group(1) if name else Path(old.group(1)).stem
+        if key not in files:
+            return tag
+        return tag[:old.start(1)] + files[key] + tag[old.end(1):]
+
+    return re.sub(r"<mesh\b[^>]*>", replace, xml_text)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Weld, decimate and convert the meshes of an MJCF scene.")
+    parser.add_argument(
+        "--scene",
+        type=Path,
+        default=DEFAULT_SCENE,
+        help="MJCF scene whose meshes are optimized and whose references are updated."
+    )
+    parser.add_argument(
+        "--lod-error",
+        type=float,
+        nargs="*",
+        default=list(DEFAULT_LOD_ERRORS),
+        help="Maximum vertex displacement (m) of each decimated LOD, finest first."
+    )
+    parser.add_argument(
+        "--render-lod",
+        type=int,
+        default=DEFAULT_RENDER_LOD,
+        help="LOD the scene references for render-only meshes (0 = lossless)."
+    )
+    parser.add_argument(
+        "--format",
+        choices=MESH_FORMATS,
+        default="msh",
+        help="Output mesh format."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild meshes even when their manifest entry is up to date."
+    )
+    args = parser.parse_args()
+    if not 0 <= args.render_lod <= len(args.lod_error):
+        parser.error(f"--render-lod must be between 0 and {len(args.lod_error)}")
+    if sorted(args.lod_error) != args.lod_error or any(error <= 0 for error in args.lod_error):
+        parser.error("--lod-error values must be positive and increasing")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    scene = args.scene.resolve()
+    root = ET.parse(scene).getroot()
+    compiler = root.find("compiler")
+    meshdir = scene.parent / ((compiler.get("meshdir") if compiler is not None else None) or ".")
+    out_dir = meshdir / OPT_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    meshes = manifest.get("meshes", {}) if manifest.get("version") == OPTIMIZER_VERSION else {}
+
+    build_inputs = {"errors": args.lod_error, "format": args.format}
+    tasks = []
+    sources: Dict[str, Dict[str, str]] = {}
+    for mesh in root.iter("mesh"):
+        file_name = mesh.get("file")
+        if not file_name:
+            continue
+        name = mesh.get("name") or Path(file_name).stem
+        previous = meshes.get(name, {})
+        # Once the XML points into opt/, the manifest remembers the real source.
+        source_name = previous.get("source") if file_name.startswith(f"{OPT_DIR}/") else file_name
+        if not source_name:
+            raise ValueError(f"Mesh {name} points at {file_name} but {manifest_path} has no source for it")
+        source = meshdir / source_name
+        sources[name] = {"source": source_name, "sha256": file_sha256(source)}
+        fresh = (previous.get("sha256") == sources[name]["sha256"] and previous.get("inputs") == build_inputs
+                 and all((out_dir / level["file"]).exists() for level in previous.get("levels", [])))
+        if args.force or not fresh:
+            tasks.append((name, source, out_dir))
+
+    worker = partial(optimize_mesh, errors=args.lod_error, fmt=args.format)
+    if args.jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            results = list(executor.map(worker, tasks))
+    else:
+        results = [worker(task) for task in tasks]
+    for result in results:
+        meshes[result["name"]] = {**sources[result["name"]], "inputs": build_inputs, "levels": result["levels"]}
+    meshes = {name: meshes[name] for name in sources}
+
+    colliding = colliding_meshes(root)
+    files = {}
+    before = after = 0
+    for name, record in meshes.items():
+        lod = 0 if name in colliding else args.render_lod
+        files[name] = f"{OPT_DIR}/{record['levels'][lod]['file']}"
+        record["render_lod"] = lod
+        before += (meshdir / record["source"]).stat().st_size
+        after += record["levels"][lod]["bytes"]
+    atomic_write_text(manifest_path, json.dumps({"version": OPTIMIZER_VERSION, "meshes": meshes}, indent=2))
+    atomic_write_text(scene, rewrite_mesh_files(scene.read_text(), files))
+    print(f"Optimized {len(tasks)} mesh(es), reused {len(meshes) - len(tasks)}; "
+          f"{len(colliding & set(meshes))} colliding mesh(es) kept at LOD 0.")
+    print(f"Scene meshes: {before} -> {after} bytes")
+
+    generator = scene.parent.parent / "generate_index.py"
+    if generator.exists():
+        subprocess.run([sys.executable, str(generator)], check=True)
+        print(f"Refreshed {generator.parent / 'files.json'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Multi-target export checks for export_tracking_motions_npz.py and
+add_motion_clips.py.
+
+Exports one synthetic bundle for two policies with different joint orders,
+both indexes in the same folder, and checks that every target gets its own
+clip directory holding clips in its own joint order. Also checks that both
+scripts refuse targets sharing a clip directory. Runs offline:
+
+  python3 scripts/test_export_targets.py
+  python3 -m pytest scripts/test_export_targets.py
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from benchmark_exporters import prepare_inputs
+from joint_remap import JOINT_NAMES_29
+from motion_format import read_motion
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+SCRIPT = SCRIPTS_DIR / "export_tracking_motions_npz.py"
+
+
+def run_export(inputs, out_dir: Path, *extra: str) -> subprocess.CompletedProcess:
+    command = [sys.executable, str(SCRIPT), "--config", str(inputs["config"]), "--repo-root", str(inputs["dir"]),
+               "--output", str(out_dir / "motions.json"), "--format", "binary", "--max-frames", "0",
+               "--jobs", "1", *extra]
+    return subprocess.run(command, capture_output=True, text=True)
+
+
+def load_clips(index_path: Path):
+    index = json.loads(index_path.read_text())
+    motions_dir = (index_path.parent / index["base_path"]).resolve()
+    return motions_dir, {entry["name"]: read_motion(motions_dir, entry) for entry in index["motions"]}
+
+
+def test_targets_with_different_joint_orders():
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        inputs = prepare_inputs(work_dir, "29dof", [120])
+        # Name the source columns so each target's order is an explicit remap.
+        bundle = inputs["bundles"][0]
+        with np.load(bundle) as data:
+            source = dict(data)
+        np.savez(bundle, joint_names=np.array(JOINT_NAMES_29), **source)
+        reversed_names = list(reversed(JOINT_NAMES_29))
+        reversed_policy = work_dir / "reversed_policy.json"
+        reversed_policy.write_text(json.dumps({"tracking": {"dataset_joint_names": reversed_names}}))
+
+        out_dir = work_dir / "out"
+        result = run_export(inputs, out_dir, "--target", str(reversed_policy), str(out_dir / "reversed.json"))
+        assert result.returncode == 0, result.stderr
+
+        primary_dir, primary = load_clips(out_dir / "motions.json")
+        reversed_dir, flipped = load_clips(out_dir / "reversed.json")
+        assert primary_dir != reversed_dir
+        assert reversed_dir == (out_dir / "reversed_motions").resolve()
+        assert sorted(primary) == sorted(flipped)
+        for name, clip in primary.items():
+            np.testing.assert_array_equal(flipped[name]["joint_pos"], clip["joint_pos"][:, ::-1])
+            np.testing.assert_array_equal(flipped[name]["root_pos"], clip["root_pos"])
+        np.testing.assert_allclose(primary[bundle.stem]["joint_pos"], source["dof_pos"], atol=1e-3)
+
+
+def test_shared_clip_dir_is_refused():
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        inputs = prepare_inputs(work_dir, "29dof", [120])
+        out_dir = work_dir / "out"
+        result = run_export(inputs, out_dir, "--target", str(inputs["policy"]), str(out_dir / "other.json"),
+                            str(out_dir / "motions"))
+        assert result.returncode != 0
+        assert "would both write clips" in result.stderr
+        assert not out_dir.exists()
+
+
+def test_add_clips_shared_clip_dir_is_refused():
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        inputs = prepare_inputs(work_dir, "29dof", [120])
+        out_dir = work_dir / "out"
+        # New indexes default to base_path ./motions, so two in one folder collide.
+        command = [sys.executable, str(SCRIPTS_DIR / "add_motion_clips.py"),
+                   "--target", str(inputs["policy"]), str(out_dir / "a.json"),
+                   "--target", str(inputs["policy"]), str(out_dir / "b.json"),
+                   *(str(path) for path in inputs["bundles"])]
+        result = subprocess.run(command, capture_output=True, text=True)
+        assert result.returncode != 0
+        assert "both keep their clips" in result.stderr
+        assert not out_dir.exists()
+
+
+if __name__ == "__main__":
+    test_targets_with_different_joint_orders()
+    test_shared_clip_dir_is_refused()
+    test_add_clips_shared_clip_dir_is_refused()
+    print("[PASS] multi-target export")
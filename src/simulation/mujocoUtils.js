@@ -1,26 +1,47 @@
 import * as THREE from 'three';
 import { Reflector } from './utils/Reflector.js';
 import { PolicyRunner } from './policyRunner.js';
+import { decodeBinaryMotionClip, MotionStream } from './trackingHelper.js';
 import { toFloatArray } from './utils/math.js';
 
 const MOTION_INDEX_FORMAT = 'tracking-motion-index-v1';
+const MOTION_PACK_FORMAT = 'tracking-motion-pack-v1';
+const MOTION_PACK_MAGIC = 'TMP1';
+// First request for a pack; covers the header of libraries with ~hundreds of clips.
+const MOTION_PACK_PROBE_BYTES = 64 * 1024;
 
 function stripJsonExtension(path) {
   const file = path.split('/').pop() ?? path;
-  return file.replace(/\.json$/i, '');
+  return file.replace(/\.(json|bin)$/i, '');
+}
+
+function motionEncoding(file, encoding) {
+  if (encoding) {
+    return encoding;
+  }
+  return /\.bin$/i.test(file) ? 'binary' : 'json';
 }
 
 function normalizeMotionEntry(entry) {
   if (typeof entry === 'string') {
-    return { name: stripJsonExtension(entry), file: entry };
+    return { name: stripJsonExtension(entry), file: entry, encoding: motionEncoding(entry) };
   }
   if (entry && typeof entry === 'object') {
+    if (Array.isArray(entry.chunks) && entry.chunks.length > 0 && entry.name) {
+      return {
+        name: entry.name,
+        chunks: entry.chunks,
+        frames: entry.frames,
+        canonical: !!entry.canonical,
+        encoding: motionEncoding(entry.chunks[0].file, entry.encoding)
+      };
+    }
     const file = entry.file ?? entry.path ?? null;
     if (!file) {
       return null;
     }
     const name = entry.name ?? stripJsonExtension(file);
-    return { name, file };
+    return { name, file, canonical: !!entry.canonical, encoding: motionEncoding(file, entry.encoding) };
   }
   return null;
 }
@@ -55,6 +76,13 @@ async function loadMotionIndex(indexPayload, motionsUrl) {
   const entries = index.motions.map((entry) => normalizeMotionEntry(entry));
 
   const requests = entries.map(async (entry) => {
+    if (entry?.chunks) {
+      // Chunked clips only wait for their first chunk; TrackingHelper streams the rest.
+      const stream = new MotionStream({ ...entry, baseUrl });
+      await stream.load(0);
+      motions[entry.name] = stream;
+      return;
+    }
     if (!entry || !entry.file || !entry.name) {
       throw new Error('Motion index entries must include a name and file path.');
     }
@@ -63,7 +91,12 @@ async function loadMotionIndex(indexPayload, motionsUrl) {
     if (!response.ok) {
       throw new Error(`Failed to load motion clip from ${clipUrl}: ${response.status}`);
     }
-    const clip = await response.json();
+    const clip = entry.encoding === 'binary'
+      ? decodeBinaryMotionClip(await response.arrayBuffer())
+      : await response.json();
+    if (entry.canonical) {
+      clip.canonical = true;
+    }
     motions[entry.name] = clip;
   });
 
@@ -71,6 +104,65 @@ async function loadMotionIndex(indexPayload, motionsUrl) {
   return motions;
 }
 
+async function fetchRange(url, start, length) {
+  const response = await fetch(url, { headers: { Range: `bytes=${start}-${start + length - 1}` } });
+  if (!response.ok) {
+    throw new Error(`Failed to load motion pack range from ${url}: ${response.status}`);
+  }
+  // 200 means the server ignored Range and sent the whole file.
+  return { buffer: await response.arrayBuffer(), whole: response.status !== 206 };
+}
+
+// Loads a single-file motion pack (see scripts/motion_format.py): the header
+// comes from one small Range request, then each clip from its own byte range.
+async function loadMotionPack(packUrl) {
+  const url = packUrl.toString();
+  const probe = await fetchRange(url, 0, MOTION_PACK_PROBE_BYTES);
+  const magic = String.fromCharCode(...new Uint8Array(probe.buffer, 0, 4));
+  if (magic !== MOTION_PACK_MAGIC) {
+    throw new Error(`Not a motion pack: ${url}`);
+  }
+  const headerLength = new DataView(probe.buffer).getUint32(4, true);
+  const headerBuffer = probe.buffer.byteLength >= 8 + headerLength
+    ? probe.buffer
+    : (await fetchRange(url, 0, 8 + headerLength)).buffer;
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(headerBuffer, 8, headerLength)));
+  if (header.format !== MOTION_PACK_FORMAT) {
+    throw new Error(`Unsupported motion pack format: ${header.format}`);
+  }
+
+  const motions = {};
+  await Promise.all(header.motions.map(async (entry) => {
+    const end = entry.offset + entry.length;
+    let buffer;
+    if (probe.whole || end <= probe.buffer.byteLength) {
+      buffer = probe.buffer.slice(entry.offset, end);
+    } else {
+      buffer = (await fetchRange(url, entry.offset, entry.length)).buffer;
+    }
+    const clip = decodeBinaryMotionClip(buffer);
+    if (entry.canonical) {
+      clip.canonical = true;
+    }
+    motions[entry.name] = clip;
+  }));
+  return motions;
+}
+
+async function loadTrackingMotions(motionsPath) {
+  const motionsUrl = new URL(motionsPath, window.location.href);
+  if (/\.pack$/i.test(motionsUrl.pathname)) {
+    return loadMotionPack(motionsUrl);
+  }
+  const response = await fetch(motionsUrl);
+  if (!response.ok) {
+    throw new Error(`Failed to load tracking motions from ${motionsUrl}: ${response.status}`);
+  }
+  const payload = await response.json();
+  const indexedMotions = await loadMotionIndex(payload, motionsUrl);
+  return indexedMotions ?? payload;
+}
+
 export async function reloadScene(mjcf_path) {
   this.scene.remove(this.scene.getObjectByName('MuJoCo Root'));
   const mujoco = this.mujoco;
@@ -152,14 +244,7 @@ export async function reloadPolicy(policy_path, options = {}) {
   if (config.tracking) {
     trackingConfig = { ...config.tracking };
     if (trackingConfig.motions_path && !trackingConfig.motions) {
-      const motionsUrl = new URL(trackingConfig.motions_path, window.location.href);
-      const response = await fetch(motionsUrl);
-      if (!response.ok) {
-        throw new Error(`Failed to load tracking motions from ${motionsUrl}: ${response.status}`);
-      }
-      const payload = await response.json();
-      const indexedMotions = await loadMotionIndex(payload, motionsUrl);
-      trackingConfig.motions = indexedMotions ?? payload;
+      trackingConfig.motions = await loadTrackingMotions(trackingConfig.motions_path);
     }
   }
 
@@ -208,7 +293,10 @@ export async function reloadPolicy(policy_path, options = {}) {
   this.control_type = config.control_type ?? 'joint_position';
   
   // Load cmd_scale from config (matching Python LocoMode.yaml cmd_scale)
-  const cmdScaleConfig = Array.isArray(config.cmd_scale) ? config.cmd_scale : [1.0, 1.0, 1.0];
+  // Fused policy graphs apply cmd_scale themselves.
+  const cmdScaleConfig = Array.isArray(config.cmd_scale) && config.onnx?.meta?.fused_processing !== true
+    ? config.cmd_scale
+    : [1.0, 1.0, 1.0];
   if (cmdScaleConfig.length !== 3) {
     console.warn('[reloadPolicy] cmd_scale must be array of length 3, using default [1.0, 1.0, 1.0]');
     this.cmdScale = new Float32Array([1.0, 1.0, 1.0]);
@@ -544,14 +632,7 @@ export async function reloadPolicyForRobot(robotIdx, policy_path, options = {})
   if (config.tracking) {
     trackingConfig = { ...config.tracking };
     if (trackingConfig.motions_path && !trackingConfig.motions) {
-      const motionsUrl = new URL(trackingConfig.motions_path, window.location.href);
-      const response = await fetch(motionsUrl);
-      if (!response.ok) {
-        throw new Error(`Failed to load tracking motions from ${motionsUrl}: ${response.status}`);
-      }
-      const payload = await response.json();
-      const indexedMotions = await loadMotionIndex(payload, motionsUrl);
-      trackingConfig.motions = indexedMotions ?? payload;
+      trackingConfig.motions = await loadTrackingMotions(trackingConfig.motions_path);
     }
   }
 
@@ -662,7 +743,7 @@ export async function loadSceneFromURL(mujoco, filename, parent) {
     parent.data = null;
   }
 
-  const model = mujoco.MjModel.loadFromXML('/working/' + filename);
+  const model = (await loadPrecompiledModel(mujoco, filename, parent)) ?? mujoco.MjModel.loadFromXML('/working/' + filename);
   const data = new mujoco.MjData(model);
   const simulation = createSimulationWrapper(mujoco, model, data);
 
@@ -1109,28 +1190,196 @@ function configureJointMappingsWithPrefix(demo, jointNames, prefix, robotIndex)
   console.log(`Configured joint mappings for robot ${robotIndex + 1} (prefix: "${prefix}"), freejoint qpos_adr: ${mapping.freejoint_qpos_adr}`);
 }
 
+const SCENE_ASSET_CACHE = 'scene-assets-v1';
+// Cache keys are derived from content hashes, never from asset paths.
+const SCENE_ASSET_CACHE_PREFIX = '/__scene-assets/';
+
+async function openSceneAssetCache() {
+  // Cache Storage only exists in secure contexts (https or localhost).
+  if (typeof caches === 'undefined') {
+    return null;
+  }
+  try {
+    return await caches.open(SCENE_ASSET_CACHE);
+  } catch (error) {
+    console.warn('Scene asset cache unavailable:', error);
+    return null;
+  }
+}
+
+async function sha256Hex(buffer) {
+  const digest = new Uint8Array(await crypto.subtle.digest('SHA-256', buffer));
+  return Array.from(digest, (byte) => byte.toString(16).padStart(2, '0')).join('');
+}
+
+async function fetchSceneAsset(cache, entry) {
+  const url = './examples/scenes/' + entry.path;
+  const key = cache && entry.sha256 ? new URL(SCENE_ASSET_CACHE_PREFIX + entry.sha256, location.origin).href : null;
+  if (key) {
+    const hit = await cache.match(key);
+    if (hit) {
+      return { buffer: await hit.arrayBuffer(), cached: true };
+    }
+  }
+  const response = await fetch(url);
+  const buffer = await response.arrayBuffer();
+  if (!response.ok) {
+    console.warn(`Failed to fetch scene asset ${url}: ${response.status}`);
+    return { buffer, cached: false };
+  }
+  // Only cache bytes that match files.json, so a stale or partial response is
+  // fetched again next time instead of being pinned under the new hash.
+  if (key && (await sha256Hex(buffer)) === entry.sha256) {
+    await cache.put(key, new Response(buffer, { headers: { 'Content-Type': 'application/octet-stream' } }));
+  } else if (key) {
+    console.warn(`Scene asset ${entry.path} does not match its files.json hash; not caching it.`);
+  }
+  return { buffer, cached: false };
+}
+
+async function pruneSceneAssetCache(cache, entries) {
+  const live = new Set(entries.map((entry) => entry.sha256).filter(Boolean));
+  const keys = await cache.keys();
+  await Promise.all(keys
+    .filter((request) => !live.has(new URL(request.url).pathname.slice(SCENE_ASSET_CACHE_PREFIX.length)))
+    .map((request) => cache.delete(request)));
+}
+
+function writeWorkingFile(mujoco, file, contents) {
+  let split = file.split('/');
+  let working = '/working/';
+  for (let f = 0; f < split.length - 1; f++) {
+    working += split[f];
+    if (!mujoco.FS.analyzePath(working).exists) {
+      mujoco.FS.mkdir(working);
+    }
+    working += '/';
+  }
+  mujoco.FS.writeFile('/working/' + file, contents);
+}
+
+// Precompiled models (.mjb) listed in files.json, and the hash of every other
+// listed file, to tell whether a model was compiled from the current assets.
+let sceneModels = [];
+let sceneFileHashes = new Map();
+
 export async function downloadExampleScenesFolder(mujoco) {
-  const response = await fetch('./examples/scenes/files.json');
-  const allFiles = await response.json();
-
-  const requests = allFiles.map((url) => fetch('./examples/scenes/' + url));
-  const responses = await Promise.all(requests);
-
-  for (let i = 0; i < responses.length; i++) {
-    let split = allFiles[i].split('/');
-    let working = '/working/';
-    for (let f = 0; f < split.length - 1; f++) {
-      working += split[f];
-      if (!mujoco.FS.analyzePath(working).exists) {
-        mujoco.FS.mkdir(working);
+  const response = await fetch('./examples/scenes/files.json', { cache: 'no-cache' });
+  // Entries are { path, size, sha256 } from generate_index.py; plain path
+  // strings (older listings) are always fetched.
+  const entries = (await response.json()).map((entry) => (typeof entry === 'string' ? { path: entry } : entry));
+  // Models are only fetched when a scene load can use one.
+  const allFiles = entries.filter((entry) => !entry.model);
+  sceneModels = entries.filter((entry) => entry.model);
+  sceneFileHashes = new Map(allFiles.map((entry) => [entry.path, entry.sha256]));
+
+  const cache = await openSceneAssetCache();
+  const assets = await Promise.all(allFiles.map((entry) => fetchSceneAsset(cache, entry)));
+  if (cache) {
+    pruneSceneAssetCache(cache, entries).catch((error) => console.warn('Scene asset cache prune failed:', error));
+    const hits = assets.filter((asset) => asset.cached).length;
+    const fetched = assets.filter((asset) => !asset.cached).reduce((sum, asset) => sum + asset.buffer.byteLength, 0);
+    console.log(`Scene assets: ${hits}/${assets.length} from cache, ${(fetched / 1048576).toFixed(1)} MB downloaded`);
+  }
+
+  const decoder = new TextDecoder();
+  for (let i = 0; i < allFiles.length; i++) {
+    const file = allFiles[i].path;
+    if (file.match(/\.(png|stl|skn|msh)$/i)) {
+      writeWorkingFile(mujoco, file, new Uint8Array(assets[i].buffer));
+    } else {
+      writeWorkingFile(mujoco, file, decoder.decode(assets[i].buffer));
+    }
+  }
+}
+
+function findPrecompiledModel(mujoco, filename, robots) {
+  const version = typeof mujoco.mj_versionString === 'function' ? mujoco.mj_versionString() : null;
+  return sceneModels.find(({ model }) =>
+    model.source === filename &&
+    model.robots === robots &&
+    (version === null || model.mujoco === version) &&
+    Object.entries(model.inputs ?? {}).every(([path, sha256]) => sceneFileHashes.get(path) === sha256)
+  ) ?? null;
+}
+
+function findBodyId(model, name) {
+  const textDecoder = new TextDecoder();
+  const namesArray = new Uint8Array(model.names);
+  for (let b = 0; b < model.nbody; b++) {
+    let end_idx = model.name_bodyadr[b];
+    while (end_idx < namesArray.length && namesArray[end_idx] !== 0) {
+      end_idx++;
+    }
+    if (textDecoder.decode(namesArray.subarray(model.name_bodyadr[b], end_idx)) === name) {
+      return b;
+    }
+  }
+  return -1;
+}
+
+/**
+ * Moves each robot's pelvis to its configured start position. Layouts are
+ * compiled with placeholder positions, which only end up in body_pos and the
+ * free joint's qpos0.
+ */
+function placeRobots(model, robotConfigs) {
+  const bodyPos = model.body_pos;
+  const qpos0 = model.qpos0;
+  robotConfigs.forEach((config, index) => {
+    const name = index === 0 ? 'pelvis' : `robot${index + 1}_pelvis`;
+    const b = findBodyId(model, name);
+    if (b < 0) {
+      throw new Error(`Body "${name}" not found`);
+    }
+    bodyPos.set([config.x, config.y, config.z], b * 3);
+    for (let j = 0; j < model.njnt; j++) {
+      if (model.jnt_bodyid[j] === b) {
+        qpos0.set([config.x, config.y, config.z], model.jnt_qposadr[j]);
+        break;
       }
-      working += '/';
     }
+  });
+}
 
-    if (allFiles[i].match(/\.(png|stl|skn)$/i)) {
-      mujoco.FS.writeFile('/working/' + allFiles[i], new Uint8Array(await responses[i].arrayBuffer()));
-    } else {
-      mujoco.FS.writeFile('/working/' + allFiles[i], await responses[i].text());
+/**
+ * Loads the precompiled model of the scene at /working/<filename> for the
+ * current robot layout, skipping XML parsing and mesh compilation. Returns
+ * null, so the XML is compiled instead, when files.json lists no model built
+ * from the current assets or the model cannot be used.
+ */
+async function loadPrecompiledModel(mujoco, filename, parent) {
+  const robotConfigs = parent.robotConfigs?.length ? parent.robotConfigs : null;
+  const entry = findPrecompiledModel(mujoco, filename, robotConfigs?.length ?? 1);
+  if (!entry) {
+    return null;
+  }
+  let model = null;
+  try {
+    const { buffer, cached } = await fetchSceneAsset(await openSceneAssetCache(), entry);
+    // mj_loadModel trusts its input, so never hand it bytes files.json does not vouch for.
+    if (buffer.byteLength !== entry.size || (globalThis.crypto?.subtle && (await sha256Hex(buffer)) !== entry.sha256)) {
+      throw new Error('download does not match files.json');
+    }
+    writeWorkingFile(mujoco, entry.path, new Uint8Array(buffer));
+    // The binding loads .mjb files with mj_loadModel and compiles anything else.
+    model = mujoco.MjModel.loadFromXML('/working/' + entry.path);
+    const { nbody, njnt, nu } = entry.model;
+    if (model.nbody !== nbody || model.njnt !== njnt || model.nu !== nu) {
+      throw new Error('model sizes do not match files.json');
+    }
+    if (robotConfigs) {
+      placeRobots(model, robotConfigs);
+    }
+    console.log(`Loaded precompiled model ${entry.path}${cached ? ' (cached)' : ''}`);
+    return model;
+  } catch (error) {
+    console.warn(`Precompiled model ${entry.path} unusable, compiling ${filename} instead:`, error);
+    model?.delete?.();
+    return null;
+  } finally {
+    if (mujoco.FS.analyzePath('/working/' + entry.path).exists) {
+      mujoco.FS.unlink('/working/' + entry.path);
     }
   }
 }
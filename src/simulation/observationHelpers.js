@@ -232,12 +232,12 @@ class TrackingCommandObsRaw {
     const refLen = tracking.refLen;
     const indices = clampFutureIndices(baseIdx, this.futureSteps, refLen);
 
-    const basePos = tracking.refRootPos[indices[0]];
-    const baseQuat = normalizeQuat(tracking.refRootQuat[indices[0]]);
+    const basePos = tracking.refRootPosAt(indices[0]);
+    const baseQuat = normalizeQuat(tracking.refRootQuatAt(indices[0]));
 
     const posDiff = [];
     for (let i = 1; i < indices.length; i++) {
-      const pos = tracking.refRootPos[indices[i]];
+      const pos = tracking.refRootPosAt(indices[i]);
       const diff = [pos[0] - basePos[0], pos[1] - basePos[1], pos[2] - basePos[2]];
       const diffB = quatApplyInv(baseQuat, diff);
       posDiff.push(diffB[0], diffB[1], diffB[2]);
@@ -248,7 +248,7 @@ class TrackingCommandObsRaw {
 
     const rot6d = [];
     for (let i = 0; i < indices.length; i++) {
-      const refQuat = normalizeQuat(tracking.refRootQuat[indices[i]]);
+      const refQuat = normalizeQuat(tracking.refRootQuatAt(indices[i]));
       const rel = quatMultiply(qCurInv, refQuat);
       const r6 = quatToRot6d(rel);
       rot6d.push(r6[0], r6[1], r6[2], r6[3], r6[4], r6[5]);
@@ -276,7 +276,7 @@ class TargetRootZObs {
     const indices = clampFutureIndices(tracking.refIdx, this.futureSteps, tracking.refLen);
     const out = new Float32Array(indices.length);
     for (let i = 0; i < indices.length; i++) {
-      out[i] = tracking.refRootPos[indices[i]][2] + 0.035;
+      out[i] = tracking.refRootPosAt(indices[i])[2] + 0.035;
     }
     return out;
   }
@@ -302,7 +302,7 @@ class TargetJointPosObs {
     const out = new Float32Array(indices.length * tracking.nJoints);
     let offset = 0;
     for (const idx of indices) {
-      out.set(tracking.refJointPos[idx], offset);
+      out.set(tracking.refJointPosAt(idx), offset);
       offset += tracking.nJoints;
     }
     return out;
@@ -329,7 +329,7 @@ class TargetProjectedGravityBObs {
     const g = [0.0, 0.0, -1.0];
     let offset = 0;
     for (const idx of indices) {
-      const quat = normalizeQuat(tracking.refRootQuat[idx]);
+      const quat = normalizeQuat(tracking.refRootQuatAt(idx));
       const gLocal = quatApplyInv(quat, g);
       out[offset++] = gLocal[0];
       out[offset++] = gLocal[1];
@@ -23,6 +23,9 @@ export class PolicyRunner {
     this.dofPosScale = typeof config.dof_pos_scale === 'number' ? config.dof_pos_scale : 1.0;
     this.dofVelScale = typeof config.dof_vel_scale === 'number' ? config.dof_vel_scale : 1.0;
     this.angVelScale = typeof config.ang_vel_scale === 'number' ? config.ang_vel_scale : 1.0;
+    // Graphs exported with convert_to_onnx.py --fuse-processing scale, offset and clip the
+    // observation and output the PD target themselves; they take the raw observation.
+    this.fusedProcessing = config.onnx?.meta?.fused_processing === true;
 
     this.module = new ONNXModule(config.onnx);
     this.inputDict = {};
@@ -96,7 +99,14 @@ export class PolicyRunner {
     // This matches the original FSMDeploy_G1 LocoMode initialization:
     //   for _ in range(50):
     //       self.policy(torch.from_numpy(self.obs))
-    await this._warmupLSTMState();
+    // Graphs without recurrent inputs carry no state between calls: convert_to_onnx.py
+    // bakes LocoMode's warmed LSTM state into them, so there is nothing to warm up.
+    if (this.module.isRecurrent) {
+      await this._warmupLSTMState();
+    } else {
+      console.log('[PolicyRunner] Stateless policy graph: using its pre-warmed LSTM state, skipping warmup');
+      this._warmupDone = true;
+    }
     
     // Auto-run diagnostics after initialization (while simulation is paused)
     this._runAutoDiagnostics();
@@ -331,7 +341,9 @@ export class PolicyRunner {
       // Python: self.qj_obs = (self.qj_obs - self.default_angles) * self.dof_pos_scale
       // Python: self.dqj_obs = self.dqj_obs * self.dof_vel_scale
       // Python: self.ang_vel = self.ang_vel * self.ang_vel_scale
-      if (obsConfigEntry.name === 'JointPosRel' && !kwargs.scale) {
+      if (this.fusedProcessing) {
+        // Scaling happens inside the graph.
+      } else if (obsConfigEntry.name === 'JointPosRel' && !kwargs.scale) {
         kwargs.scale = this.dofPosScale;
       } else if (obsConfigEntry.name === 'JointVel' && !kwargs.scale) {
         kwargs.scale = this.dofVelScale;
@@ -586,9 +598,12 @@ export class PolicyRunner {
 
       // CRITICAL: Clip observation vector to [-100, 100] as in original Python code
       // Original: obs_tensor = torch.from_numpy(obs_tensor).clip(-100, 100)
+      // (fused graphs clip the processed observation themselves)
       const obsBeforeClip = Array.from(obsForPolicy);
-      for (let i = 0; i < obsForPolicy.length; i++) {
-        obsForPolicy[i] = Math.max(-100, Math.min(100, obsForPolicy[i]));
+      if (!this.fusedProcessing) {
+        for (let i = 0; i < obsForPolicy.length; i++) {
+          obsForPolicy[i] = Math.max(-100, Math.min(100, obsForPolicy[i]));
+        }
       }
       
       // Debug: Log if any values were clipped (first time only)
@@ -659,6 +674,11 @@ export class PolicyRunner {
       // This matches the original LocoMode.py line 96
       for (let i = 0; i < this.numActions; i++) {
         let value = action[i];
+        // Fused graphs already output the clipped action
+        if (this.fusedProcessing) {
+          this.lastActions[i] = value;
+          continue;
+        }
         // Apply squash (e.g., tanh) if configured (for other policies)
         if (this.actionSquash === 'tanh') {
           value = Math.tanh(value);
@@ -934,6 +954,15 @@ export class PolicyRunner {
         }
       }
 
+      // Fused graphs compute the target in-graph from the yaml's action_scale/default_angles
+      if (this.fusedProcessing) {
+        const fusedTarget = result['target']?.data;
+        if (!fusedTarget || fusedTarget.length !== this.numActions) {
+          throw new Error('PolicyRunner received invalid target output from fused policy');
+        }
+        return Float32Array.from(fusedTarget);
+      }
+
       // Original LocoMode behavior: target = default_joint_pos + action_scale * action
       // This matches the original Python code: loco_action = self.action * self.action_scale + self.default_angles
       const target = new Float32Array(this.numActions);
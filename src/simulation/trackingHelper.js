@@ -17,24 +17,201 @@ function clampIndex(idx, length) {
   return idx;
 }
 
+const BINARY_CLIP_MAGIC = 'TMC1';
+const BINARY_CLIP_FORMAT = 'tracking-motion-clip-v1';
+
 function toFloat32Rows(rows) {
   if (!Array.isArray(rows)) {
     return null;
   }
-  return rows.map((row) => Float32Array.from(row));
+  // Rows from binary clips are already Float32Array views; keep them zero-copy.
+  return rows.map((row) => (row instanceof Float32Array ? row : Float32Array.from(row)));
+}
+
+function rowViews(values, frames, width) {
+  const rows = new Array(frames);
+  for (let i = 0; i < frames; i++) {
+    rows[i] = values.subarray(i * width, (i + 1) * width);
+  }
+  return rows;
+}
+
+function dequantizeBlock(buffer, block) {
+  const [frames, width] = block.shape;
+  const stored = new Int16Array(buffer, block.offset, frames * width);
+  const out = new Float32Array(frames * width);
+  const scale = block.scale;
+  const bias = block.bias;
+  // Integrated rows (root_pos) are steps of an unbounded code, summed without wrapping;
+  // doubles hold those sums exactly.
+  const acc = block.integrate ? new Float64Array(width) : new Int16Array(width);
+  for (let i = 0; i < frames; i++) {
+    const base = i * width;
+    for (let j = 0; j < width; j++) {
+      // Delta rows are wrapping int16 differences; Int16Array stores wrap the same way.
+      acc[j] = block.delta || block.integrate ? acc[j] + stored[base + j] : stored[base + j];
+      out[base + j] = acc[j] * scale[j] + bias[j];
+    }
+  }
+  return out;
+}
+
+function blockRows(buffer, block, defaultDtype) {
+  const [frames, width] = block.shape;
+  const dtype = block.dtype ?? defaultDtype ?? 'float32';
+  if (dtype === 'int16') {
+    return rowViews(dequantizeBlock(buffer, block), frames, width);
+  }
+  if (dtype !== 'float32') {
+    throw new Error(`Unsupported binary motion block dtype: ${dtype}`);
+  }
+  return rowViews(new Float32Array(buffer, block.offset, frames * width), frames, width);
+}
+
+/**
+ * Decode a binary motion clip (see scripts/motion_format.py) into row views.
+ * float32 blocks are viewed in place over the fetched ArrayBuffer; quantized
+ * int16 blocks are dequantized once into a single Float32Array per block.
+ */
+export function decodeBinaryMotionClip(buffer) {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(
+    view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3)
+  );
+  if (magic !== BINARY_CLIP_MAGIC) {
+    throw new Error('Binary motion clip has an invalid magic header');
+  }
+  const headerLen = view.getUint32(4, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLen)));
+  if (header.format !== BINARY_CLIP_FORMAT) {
+    throw new Error(`Unsupported binary motion clip format: ${header.format}`);
+  }
+  const blocks = header.blocks ?? {};
+  if (!blocks.joint_pos || !blocks.root_quat || !blocks.root_pos) {
+    throw new Error('Binary motion clip is missing joint_pos/root_quat/root_pos blocks');
+  }
+  return {
+    joint_pos: blockRows(buffer, blocks.joint_pos, header.dtype),
+    root_quat: blockRows(buffer, blocks.root_quat, header.dtype),
+    root_pos: blockRows(buffer, blocks.root_pos, header.dtype)
+  };
+}
+
+// Played streamed rows are released in batches of this many frames.
+const STREAM_DROP_BATCH = 250;
+// Aligned reference frames are computed on demand; observations revisit the
+// same few future indices every step, so a small cache covers them.
+const FRAME_CACHE_SIZE = 64;
+
+/**
+ * Progressive loader for a chunked motion clip (index entries with `chunks`).
+ * Chunk 0 stays resident so the clip can always be (re)started synchronously;
+ * later chunks are fetched ahead of each consumer's playback cursor and dropped
+ * once every consumer sharing the stream has played past them.
+ */
+export class MotionStream {
+  constructor({ name, chunks, baseUrl, encoding, frames, canonical }) {
+    this.name = name;
+    this.encoding = encoding ?? 'json';
+    this.canonical = !!canonical;
+    let start = 0;
+    this.chunks = chunks.map((chunk) => {
+      const entry = {
+        url: new URL(chunk.file, baseUrl).toString(),
+        start,
+        frames: chunk.frames,
+        data: null,
+        pending: null
+      };
+      start += chunk.frames;
+      return entry;
+    });
+    this.totalFrames = frames ?? start;
+    this.cursors = new Map();
+  }
+
+  load(index) {
+    const chunk = this.chunks[index];
+    if (chunk.data) {
+      return Promise.resolve(chunk.data);
+    }
+    if (!chunk.pending) {
+      chunk.pending = (async () => {
+        const response = await fetch(chunk.url);
+        if (!response.ok) {
+          throw new Error(`Failed to load motion chunk from ${chunk.url}: ${response.status}`);
+        }
+        const clip = this.encoding === 'binary'
+          ? decodeBinaryMotionClip(await response.arrayBuffer())
+          : await response.json();
+        const normalized = normalizeMotionClip(clip);
+        if (!normalized) {
+          throw new Error(`Invalid motion chunk ${chunk.url}`);
+        }
+        chunk.data = normalized;
+        return normalized;
+      })().finally(() => {
+        chunk.pending = null;
+      });
+    }
+    return chunk.pending;
+  }
+
+  chunkData(index) {
+    return this.chunks[index]?.data ?? null;
+  }
+
+  prefetch(frame, lookahead) {
+    const end = Math.min(this.totalFrames, frame + lookahead);
+    for (let i = 0; i < this.chunks.length; i++) {
+      const chunk = this.chunks[i];
+      if (chunk.start >= end) {
+        break;
+      }
+      if (chunk.start + chunk.frames > frame && !chunk.data && !chunk.pending) {
+        this.load(i).catch((error) => {
+          console.warn('MotionStream: failed to prefetch chunk', this.name, i, error);
+        });
+      }
+    }
+  }
+
+  updateCursor(owner, frame) {
+    this.cursors.set(owner, frame);
+    this._evict();
+  }
+
+  releaseOwner(owner) {
+    this.cursors.delete(owner);
+    this._evict();
+  }
+
+  _evict() {
+    const minCursor = this.cursors.size > 0 ? Math.min(...this.cursors.values()) : Infinity;
+    for (let i = 1; i < this.chunks.length; i++) {
+      const chunk = this.chunks[i];
+      if (chunk.data && chunk.start + chunk.frames <= minCursor) {
+        chunk.data = null;
+      }
+    }
+  }
 }
 
 function normalizeMotionClip(clip) {
   if (!clip || typeof clip !== 'object') {
     return null;
   }
+  if (clip instanceof MotionStream) {
+    const first = clip.chunkData(0);
+    return first ? { ...first, stream: clip, canonical: clip.canonical } : null;
+  }
   const jointPosRaw = toFloat32Rows(clip.joint_pos ?? clip.jointPos);
   const rootPos = toFloat32Rows(clip.root_pos ?? clip.rootPos);
   const rootQuat = toFloat32Rows(clip.root_quat ?? clip.rootQuat);
   if (!jointPosRaw || !rootPos || !rootQuat) {
     return null;
   }
-  return { jointPos: jointPosRaw, rootPos, rootQuat };
+  return { jointPos: jointPosRaw, rootPos, rootQuat, canonical: !!clip.canonical };
 }
 
 export class TrackingHelper {
@@ -46,6 +223,16 @@ export class TrackingHelper {
     this.nJoints = this.datasetJointNames.length || this.policyJointNames.length;
     this.transitionLen = 0;
     this.motionLen = 0;
+    this.streamLookahead = config.stream_lookahead_frames ?? 500;
+    this.streamOwner = Symbol('TrackingHelper');
+    this.stream = null;
+    this.streamNext = 0;
+    this.streamed = false;
+    this.srcDropped = 0;
+    this.alignment = null;
+    this.frameCache = new Map();
+    this._scratchPos = new THREE.Vector3();
+    this._scratchQuat = new THREE.Quaternion();
 
     this.mapPolicyToDataset = this._buildPolicyToDatasetMap();
 
@@ -69,11 +256,15 @@ export class TrackingHelper {
       this.defaultMotionName = 'default';
     }
 
-    this.refJointPos = [];
-    this.refRootQuat = [];
-    this.refRootPos = [];
+    // Reference timeline = transition rows followed by the current motion's
+    // source rows, aligned lazily per frame (see _refFrame).
+    this.transition = { jointPos: [], rootQuat: [], rootPos: [] };
+    this.srcJointPos = [];
+    this.srcRootQuat = [];
+    this.srcRootPos = [];
     this.refIdx = 0;
     this.refLen = 0;
+    this.refTotalLen = 0;
     this.currentName = this.defaultMotionName;
     this.currentDone = true;
   }
@@ -114,14 +305,19 @@ export class TrackingHelper {
   }
 
   reset(state) {
+    this._detachStream();
     this.currentDone = true;
     this.refIdx = 0;
     this.refLen = 0;
+    this.refTotalLen = 0;
     this.transitionLen = 0;
     this.motionLen = 0;
-    this.refJointPos = [];
-    this.refRootQuat = [];
-    this.refRootPos = [];
+    this.transition = { jointPos: [], rootQuat: [], rootPos: [] };
+    this.srcJointPos = [];
+    this.srcRootQuat = [];
+    this.srcRootPos = [];
+    this.alignment = null;
+    this.frameCache.clear();
     this.currentName = 'default';
     this.requestMotion('default', state);
   }
@@ -143,7 +339,8 @@ export class TrackingHelper {
   }
 
   playbackState() {
-    const clampedIdx = Math.max(0, Math.min(this.refIdx, Math.max(this.refLen - 1, 0)));
+    const refTotalLen = this.refTotalLen || this.refLen;
+    const clampedIdx = Math.max(0, Math.min(this.refIdx, Math.max(refTotalLen - 1, 0)));
     const transitionLen = this.transitionLen ?? 0;
     const motionLen = this.motionLen ?? 0;
     const inTransition = transitionLen > 0 && clampedIdx < transitionLen;
@@ -152,7 +349,8 @@ export class TrackingHelper {
       currentName: this.currentName,
       currentDone: this.currentDone,
       refIdx: clampedIdx,
-      refLen: this.refLen,
+      refLen: refTotalLen,
+      bufferedLen: this.refLen,
       transitionLen,
       motionLen,
       inTransition,
@@ -164,20 +362,67 @@ export class TrackingHelper {
     if (this.refLen === 0) {
       return;
     }
+    if (this.stream) {
+      this._pumpStream();
+    }
+    // A streamed clip holds its last buffered frame until the next chunk arrives.
     if (this.refIdx < this.refLen - 1) {
       this.refIdx += 1;
-      if (this.refIdx === this.refLen - 1) {
-        this.currentDone = true;
-      }
+    }
+    if (this.refIdx >= this.refTotalLen - 1) {
+      this.currentDone = true;
+    }
+    if (this.streamed) {
+      this._dropPlayedRows();
     }
   }
 
   getFrame(index) {
-    const clamped = clampIndex(index, this.refLen);
+    return this._refFrame(clampIndex(index, this.refLen));
+  }
+
+  refJointPosAt(index) {
+    return this._refFrame(index).jointPos;
+  }
+
+  refRootQuatAt(index) {
+    return this._refFrame(index).rootQuat;
+  }
+
+  refRootPosAt(index) {
+    return this._refFrame(index).rootPos;
+  }
+
+  _refFrame(index) {
+    if (index < this.transitionLen) {
+      return {
+        jointPos: this.transition.jointPos[index],
+        rootQuat: this.transition.rootQuat[index],
+        rootPos: this.transition.rootPos[index]
+      };
+    }
+    let frame = this.frameCache.get(index);
+    if (!frame) {
+      if (this.frameCache.size >= FRAME_CACHE_SIZE) {
+        this.frameCache.clear();
+      }
+      frame = this._alignFrame(index - this.transitionLen);
+      this.frameCache.set(index, frame);
+    }
+    return frame;
+  }
+
+  _alignFrame(motionIdx) {
+    const { p0, qDelta, offset } = this.alignment;
+    const row = this.srcRootPos[motionIdx];
+    const pos = this._scratchPos.set(row[0], row[1], row[2]).sub(p0).applyQuaternion(qDelta).add(offset);
+    const q = this.srcRootQuat[motionIdx];
+    const aligned = this._scratchQuat.set(q[1], q[2], q[3], q[0]).premultiply(qDelta);
     return {
-      jointPos: this.refJointPos[clamped],
-      rootQuat: this.refRootQuat[clamped],
-      rootPos: this.refRootPos[clamped]
+      // Joint angles are frame-independent; the source row is shared read-only.
+      jointPos: this.srcJointPos[motionIdx],
+      rootQuat: Float32Array.of(aligned.w, aligned.x, aligned.y, aligned.z),
+      rootPos: Float32Array.of(pos.x, pos.y, pos.z)
     };
   }
 
@@ -202,31 +447,18 @@ export class TrackingHelper {
     };
   }
 
-  _alignMotionToCurrent(motion, curr) {
+  _motionAlignment(motion, curr) {
     const p0 = new THREE.Vector3(...motion.rootPos[0]);
     const pc = new THREE.Vector3(...curr.rootPos);
 
-    const q0 = yawComponent(motion.rootQuat[0]);
+    // Canonical clips (exported with --canonicalize) start at zero yaw.
+    const q0 = motion.canonical ? [1.0, 0.0, 0.0, 0.0] : yawComponent(motion.rootQuat[0]);
     const qc = yawComponent(curr.rootQuat);
     const qDeltaWxyz = quatMultiply(qc, quatInverse(q0));
     const qDelta = new THREE.Quaternion(qDeltaWxyz[1], qDeltaWxyz[2], qDeltaWxyz[3], qDeltaWxyz[0]);
 
-    const jointPos = motion.jointPos.map((row) => Float32Array.from(row));
-
     const offset = new THREE.Vector3(pc.x, pc.y, p0.z);
-    const rootPos = motion.rootPos.map((row) => {
-      const pos = new THREE.Vector3(...row);
-      pos.sub(p0).applyQuaternion(qDelta).add(offset);
-      return Float32Array.from([pos.x, pos.y, pos.z]);
-    });
-
-    const rootQuat = motion.rootQuat.map((row) => {
-      const q = new THREE.Quaternion(row[1], row[2], row[3], row[0]);
-      const aligned = qDelta.clone().multiply(q);
-      return Float32Array.from([aligned.w, aligned.x, aligned.y, aligned.z]);
-    });
-
-    return { jointPos, rootQuat, rootPos };
+    return { p0, qDelta, offset };
   }
 
   _buildTransition(curr, firstFrame) {
@@ -239,9 +471,9 @@ export class TrackingHelper {
       };
     }
 
-    const jointPos = linspaceRows(curr.jointPos, firstFrame.jointPos[0], steps);
-    const rootPos = linspaceRows(curr.rootPos, firstFrame.rootPos[0], steps);
-    const rootQuat = slerpMany(curr.rootQuat, firstFrame.rootQuat[0], steps);
+    const jointPos = linspaceRows(curr.jointPos, firstFrame.jointPos, steps);
+    const rootPos = linspaceRows(curr.rootPos, firstFrame.rootPos, steps);
+    const rootQuat = slerpMany(curr.rootQuat, firstFrame.rootQuat, steps);
 
     return { jointPos, rootPos, rootQuat };
   }
@@ -252,25 +484,79 @@ export class TrackingHelper {
       curr.jointPos = this._mapPolicyJointPosToDataset(curr.jointPos);
     }
     const motion = this.motions[name];
-    const aligned = this._alignMotionToCurrent(motion, curr);
-    const firstFrame = {
-      jointPos: aligned.jointPos,
-      rootQuat: aligned.rootQuat,
-      rootPos: aligned.rootPos
-    };
-
-    const transition = this._buildTransition(curr, firstFrame);
 
-    this.refJointPos = [...transition.jointPos, ...aligned.jointPos];
-    this.refRootQuat = [...transition.rootQuat, ...aligned.rootQuat];
-    this.refRootPos = [...transition.rootPos, ...aligned.rootPos];
-
-    this.transitionLen = transition.jointPos.length;
-    this.motionLen = aligned.jointPos.length;
+    this._detachStream();
+    // Starting a motion is O(1) in its length: only the alignment transform is
+    // computed here, frames are aligned when read. Streamed clips hold just
+    // their first chunk; _pumpStream appends the rest as it arrives.
+    this.alignment = this._motionAlignment(motion, curr);
+    this.srcJointPos = motion.stream ? motion.jointPos.slice() : motion.jointPos;
+    this.srcRootQuat = motion.stream ? motion.rootQuat.slice() : motion.rootQuat;
+    this.srcRootPos = motion.stream ? motion.rootPos.slice() : motion.rootPos;
+    this.transition = this._buildTransition(curr, this._alignFrame(0));
+    this.frameCache.clear();
+
+    this.transitionLen = this.transition.jointPos.length;
+    this.motionLen = motion.stream ? motion.stream.totalFrames : this.srcJointPos.length;
     this.refIdx = 0;
-    this.refLen = this.refJointPos.length;
+    this.refLen = this.transitionLen + this.srcJointPos.length;
+    this.refTotalLen = this.transitionLen + this.motionLen;
+    this.srcDropped = 0;
+    this.streamed = !!motion.stream;
     this.currentName = name;
-    this.currentDone = this.refLen <= 1;
+    this.currentDone = this.refTotalLen <= 1;
+
+    if (motion.stream) {
+      this.stream = motion.stream;
+      this.streamNext = 1;
+      this._pumpStream();
+    }
+  }
+
+  _pumpStream() {
+    const stream = this.stream;
+    while (this.streamNext < stream.chunks.length) {
+      const data = stream.chunkData(this.streamNext);
+      if (!data) {
+        break;
+      }
+      // Row by row: spreading a long chunk into push() exceeds the engine's argument limit.
+      for (const row of data.jointPos) this.srcJointPos.push(row);
+      for (const row of data.rootQuat) this.srcRootQuat.push(row);
+      for (const row of data.rootPos) this.srcRootPos.push(row);
+      this.streamNext += 1;
+    }
+    this.refLen = this.transitionLen + this.srcJointPos.length;
+
+    if (this.streamNext >= stream.chunks.length) {
+      this._detachStream();
+      return;
+    }
+    const motionIdx = Math.max(0, this.refIdx - this.transitionLen);
+    stream.prefetch(motionIdx, this.streamLookahead);
+    stream.updateCursor(this.streamOwner, motionIdx);
+  }
+
+  _detachStream() {
+    if (this.stream) {
+      this.stream.releaseOwner(this.streamOwner);
+    }
+    this.stream = null;
+    this.streamNext = 0;
+  }
+
+  _dropPlayedRows() {
+    // Observations only look at refIdx and later frames.
+    const dropTo = this.refIdx - 1 - this.transitionLen;
+    if (dropTo - this.srcDropped < STREAM_DROP_BATCH) {
+      return;
+    }
+    for (let i = this.srcDropped; i < dropTo; i++) {
+      this.srcJointPos[i] = null;
+      this.srcRootQuat[i] = null;
+      this.srcRootPos[i] = null;
+    }
+    this.srcDropped = dropTo;
   }
 
   _buildPolicyToDatasetMap() {
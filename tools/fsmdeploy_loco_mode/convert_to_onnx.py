@@ -11,6 +11,15 @@ import argparse
 import os
 from pathlib import Path
 
+PRECISIONS = ("int8", "fp16")
+# Initializers smaller than this stay float32 in the fp16 variant.
+FP16_MIN_ELEMENTS = 1024
+# LocoMode.py steps the policy this many times on a zero observation at startup.
+WARMUP_STEPS = 50
+# LocoMode.py clips the observation and the action to +-100; not in the yaml.
+OBS_CLIP = 100.0
+ACTION_CLIP = 100.0
+
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser()
@@ -30,7 +39,7 @@ def parse_args() -> argparse.Namespace:
     p.add_argument(
         "--dynamic-batch",
         action="store_true",
-        help="Export with dynamic batch axis (NOT recommended for this recurrent model)",
+        help="Export with dynamic batch axis (with --with-state: one independent LSTM state per batch row)",
     )
     p.add_argument(
         "--with-state",
@@ -42,9 +51,485 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Run an ONNXRuntime check vs PyTorch on random inputs",
     )
+    p.add_argument(
+        "--validate-batch",
+        type=int,
+        default=8,
+        help="Batch size for the stateful rollout check (--with-state --validate)",
+    )
+    p.add_argument(
+        "--validate-steps",
+        type=int,
+        default=200,
+        help="Steps per rollout for the stateful rollout check",
+    )
+    p.add_argument(
+        "--atol",
+        type=float,
+        default=1e-4,
+        help="Largest absolute difference the stateful rollout check accepts",
+    )
+    p.add_argument(
+        "--precision",
+        nargs="+",
+        choices=PRECISIONS,
+        default=[],
+        help="Also write reduced-precision variants next to --onnx (<stem>.int8.onnx: dynamic INT8 "
+             "quantization, <stem>.fp16.onnx: float16 weights); each must pass the accuracy gate",
+    )
+    p.add_argument(
+        "--gate-obs",
+        type=Path,
+        default=None,
+        help="Recorded observations (.npy, shape (steps, 96)) for the accuracy gate; synthetic if omitted",
+    )
+    p.add_argument(
+        "--gate-steps",
+        type=int,
+        default=500,
+        help="Recurrent steps the accuracy gate rolls out",
+    )
+    p.add_argument(
+        "--max-action-err",
+        type=float,
+        default=0.1,
+        help="Largest raw action difference vs the TorchScript policy a variant may have",
+    )
+    p.add_argument(
+        "--max-state-drift",
+        type=float,
+        default=0.05,
+        help="Largest h/c difference vs the TorchScript policy a stateful variant may have",
+    )
+    p.add_argument(
+        "--warmup-steps",
+        type=int,
+        default=WARMUP_STEPS,
+        help="Zero-observation steps LocoMode warms the LSTM with; the warmed state is baked into a graph "
+             "without state inputs and written to <stem>.warm_state.json for --with-state",
+    )
+    p.add_argument(
+        "--fuse-processing",
+        action="store_true",
+        help="Bake LocoMode's observation scaling/offsets/clipping and action clipping/scaling into the "
+             "graph: it takes the raw observation and also outputs the PD targets",
+    )
+    p.add_argument(
+        "--config",
+        type=Path,
+        default=Path(__file__).with_name("LocoMode.yaml"),
+        help="LocoMode config the fused processing reads its scales and default angles from",
+    )
     return p.parse_args()
 
 
+def load_processing(path: Path) -> dict:
+    """LocoMode's pre/post-processing constants from ``path``, as flat float lists.
+
+    The raw observation is laid out as LocoMode.py builds it, before scaling:
+    ang_vel(3), projected gravity(3), cmd(3), q(n), dq(n), previous action(n),
+    with the joints in policy order. The policy sees
+    ``clip((raw - obs_offset) * obs_scale, -obs_clip, obs_clip)`` and the PD
+    target is ``clip(action, -action_clip, action_clip) * action_scale + default_angles``.
+    """
+    import yaml
+
+    with open(path, encoding="utf-8") as f:
+        cfg = yaml.safe_load(f)
+    n = int(cfg["num_actions"])
+    default_angles = [float(v) for v in cfg["default_angles"]]
+    cmd_scale = [float(v) for v in cfg["cmd_scale"]]
+    action_scale = cfg["action_scale"]
+    action_scale = [float(v) for v in action_scale] if isinstance(action_scale, list) else [float(action_scale)] * n
+    if len(default_angles) != n or len(action_scale) != n or len(cmd_scale) != 3:
+        raise SystemExit(f"{path}: default_angles/action_scale must have num_actions={n} entries, cmd_scale 3")
+    num_obs = 9 + 3 * n
+    if int(cfg.get("num_obs", num_obs)) != num_obs:
+        raise SystemExit(f"{path}: num_obs={cfg['num_obs']} does not match the LocoMode layout ({num_obs})")
+    return {
+        "obs_offset": [0.0] * 9 + default_angles + [0.0] * (2 * n),
+        "obs_scale": ([float(cfg["ang_vel_scale"])] * 3 + [1.0] * 3 + cmd_scale
+                      + [float(cfg["dof_pos_scale"])] * n + [float(cfg["dof_vel_scale"])] * n + [1.0] * n),
+        "obs_clip": OBS_CLIP,
+        "action_clip": ACTION_CLIP,
+        "action_scale": action_scale,
+        "default_angles": default_angles,
+    }
+
+
+def preprocess(processing: dict | None, raw):
+    """numpy mirror of the fused observation processing (identity without it)."""
+    import numpy as np
+
+    if processing is None:
+        return raw
+    obs = (raw - np.asarray(processing["obs_offset"], np.float32)) * np.asarray(processing["obs_scale"], np.float32)
+    return obs.clip(-processing["obs_clip"], processing["obs_clip"]).astype(np.float32)
+
+
+def postprocess(processing: dict | None, action):
+    """numpy mirror of the fused action clipping (identity without it)."""
+    if processing is None:
+        return action
+    return action.clip(-processing["action_clip"], processing["action_clip"])
+
+
+def torch_rollout(model, obs, recurrent: bool = True, processing: dict | None = None):
+    """Step the TorchScript policy over ``obs`` (steps, batch, 96), robot by robot.
+
+    Returns ``(actions, h, c)`` after every step, shaped (steps, batch, 29) and
+    (steps, batch, 256). With ``recurrent=False`` the LSTM state is reset before
+    each step, which is what a graph exported without --with-state computes.
+    With ``processing`` the observations are raw and go through the LocoMode
+    processing a fused graph applies; the actions are clipped.
+    """
+    import numpy as np
+    import torch
+
+    obs = preprocess(processing, obs)
+    steps, batch = obs.shape[:2]
+    h_init = model.hidden_state.clone()
+    c_init = model.cell_state.clone()
+    actions = np.zeros((steps, batch, 29), dtype=np.float32)
+    h = np.zeros((steps, batch, h_init.shape[-1]), dtype=np.float32)
+    c = np.zeros_like(h)
+    with torch.no_grad():
+        for b in range(batch):
+            model.hidden_state.copy_(h_init)
+            model.cell_state.copy_(c_init)
+            for t in range(steps):
+                if not recurrent:
+                    model.hidden_state.copy_(h_init)
+                    model.cell_state.copy_(c_init)
+                actions[t, b] = model(torch.from_numpy(obs[t, b:b + 1])).numpy()[0]
+                h[t, b] = model.hidden_state.numpy()[0, 0]
+                c[t, b] = model.cell_state.numpy()[0, 0]
+    model.hidden_state.copy_(h_init)
+    model.cell_state.copy_(c_init)
+    return postprocess(processing, actions), h, c
+
+
+def onnx_rollout(sess, obs, h0, c0):
+    """Run ``sess`` over ``obs`` (steps, batch, 96) with all rows in one call.
+
+    Stateful graphs carry (h, c) between steps starting from ``h0``/``c0``
+    (1, 1, 256); ``h``/``c`` are None for graphs without state inputs.
+    """
+    import numpy as np
+
+    steps, batch = obs.shape[:2]
+    actions = np.zeros((steps, batch, 29), dtype=np.float32)
+    if len(sess.get_inputs()) == 1:
+        for t in range(steps):
+            actions[t] = sess.run(["action"], {"obs": obs[t]})[0]
+        return actions, None, None
+    h_hist = np.zeros((steps, batch, h0.shape[-1]), dtype=np.float32)
+    c_hist = np.zeros_like(h_hist)
+    h = np.repeat(h0, batch, axis=1)
+    c = np.repeat(c0, batch, axis=1)
+    for t in range(steps):
+        actions[t], h, c = sess.run(["action", "h1", "c1"], {"obs": obs[t], "h": h, "c": c})
+        h_hist[t] = h[0]
+        c_hist[t] = c[0]
+    return actions, h_hist, c_hist
+
+
+def warm_state(model, steps: int):
+    """LSTM state after LocoMode's startup warmup: ``steps`` policy calls on a zero observation.
+
+    Starts from, and leaves, the model's current buffers.
+    """
+    import torch
+
+    h_init = model.hidden_state.clone()
+    c_init = model.cell_state.clone()
+    with torch.no_grad():
+        for _ in range(steps):
+            model(torch.zeros((1, 96), dtype=torch.float32))
+    state = (model.hidden_state.clone(), model.cell_state.clone())
+    model.hidden_state.copy_(h_init)
+    model.cell_state.copy_(c_init)
+    return state
+
+
+def bake_state(onnx_path: Path, state) -> None:
+    """Overwrite the LSTM state a graph without state inputs carries as initializers."""
+    import onnx
+    from onnx import numpy_helper
+
+    model_proto = onnx.load(str(onnx_path))
+    values = {"hidden_state": state[0].numpy(), "cell_state": state[1].numpy()}
+    baked = set()
+    for init in model_proto.graph.initializer:
+        # The fused wrapper prefixes the policy's buffers with "inner.".
+        key = init.name.rsplit(".", 1)[-1]
+        if key in values:
+            init.CopyFrom(numpy_helper.from_array(values[key], init.name))
+            baked.add(key)
+    if baked != set(values):
+        raise SystemExit(f"{onnx_path}: no hidden_state/cell_state initializers to bake the warmed state into")
+    onnx.save(model_proto, str(onnx_path))
+
+
+def write_warm_state(onnx_path: Path, start, state, steps: int, warmup_obs) -> Path:
+    """Write the warmed (h, c) next to a stateful graph, after checking it warms up to it from ``start``."""
+    import json
+
+    import numpy as np
+    import onnxruntime as ort
+
+    h0 = start[0].numpy()
+    c0 = start[1].numpy()
+    sess = ort.InferenceSession(str(onnx_path), providers=["CPUExecutionProvider"])
+    _, h, c = onnx_rollout(sess, np.repeat(warmup_obs[None, None, :], steps, axis=0), h0, c0)
+    drift = float(max(np.abs(h[-1] - state[0].numpy()[0]).max(), np.abs(c[-1] - state[1].numpy()[0]).max()))
+    if drift > 1e-4:
+        raise SystemExit(f"Warm state check FAILED: the ONNX warmup drifts {drift:.6g} from the TorchScript one")
+
+    out = onnx_path.with_name(f"{onnx_path.stem}.warm_state.json")
+    out.write_text(json.dumps({
+        "warmup_steps": steps,
+        "shape": list(state[0].shape),
+        "h": state[0].numpy().reshape(-1).tolist(),
+        "c": state[1].numpy().reshape(-1).tolist(),
+    }))
+    print(f"Wrote warm state: {out} ({steps} steps, onnx_vs_torch={drift:.6g})")
+    return out
+
+
+def target_error(sess, processing: dict, obs, h0, c0) -> float:
+    """Largest gap between a fused graph's ``target`` and the target LocoMode derives from its ``action``."""
+    import numpy as np
+
+    feeds = {"obs": obs}
+    if len(sess.get_inputs()) == 3:
+        feeds.update({"h": np.repeat(h0, obs.shape[0], axis=1), "c": np.repeat(c0, obs.shape[0], axis=1)})
+    action, target = sess.run(["action", "target"], feeds)
+    expected = (action * np.asarray(processing["action_scale"], np.float32)
+                + np.asarray(processing["default_angles"], np.float32))
+    return float(np.max(np.abs(target - expected)))
+
+
+def validate_stateful(sess, model, batch: int, steps: int, atol: float, processing: dict | None = None) -> None:
+    """Check that a batch of rollouts matches the same robots stepped one by one.
+
+    Each of ``batch`` robots gets its own random observation sequence. The
+    reference steps the original TorchScript policy (which keeps its LSTM
+    state internally) per robot; the ONNX model is rolled out once with the
+    whole batch, carrying (h, c) between steps, and, when its batch axis is
+    dynamic, once per robot with batch 1. Fused graphs get the observations
+    raw and the reference applies the processing itself.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    obs = rng.standard_normal((steps, batch, 96), dtype=np.float32).clip(-3, 3)
+    h0 = model.hidden_state.numpy().copy()
+    c0 = model.cell_state.numpy().copy()
+    reference = torch_rollout(model, obs, processing=processing)[0]
+
+    dynamic = not isinstance(sess.get_inputs()[0].shape[0], int)
+    single = np.concatenate([onnx_rollout(sess, obs[:, b:b + 1], h0, c0)[0] for b in range(batch)], axis=1)
+    checks = {"batch1_vs_torch": float(np.max(np.abs(single - reference)))}
+    if dynamic:
+        batched = onnx_rollout(sess, obs, h0, c0)[0]
+        checks["batched_vs_torch"] = float(np.max(np.abs(batched - reference)))
+        checks["batched_vs_batch1"] = float(np.max(np.abs(batched - single)))
+    if processing is not None:
+        checks["target_vs_action"] = target_error(sess, processing, obs[0, :1], h0, c0)
+    summary = " ".join(f"{name}={value:.6g}" for name, value in checks.items())
+    if max(checks.values()) > atol:
+        raise SystemExit(f"Validation FAILED over {steps} steps x {batch} robots (atol={atol:g}): {summary}")
+    print(f"Validation OK over {steps} steps x {batch} robots. max_abs: {summary}")
+
+
+def _prepare_for_quantization(model_proto):
+    """Make the exported graph's weights visible to ORT's dynamic quantizer.
+
+    The exporter emits the LSTM weights as Constant nodes and the actor layers
+    as Gemm, neither of which quantize_dynamic handles; turn the constants into
+    initializers and each Gemm with a constant weight into MatMul + Add.
+    """
+    import numpy as np
+    from onnx import helper, numpy_helper
+
+    graph = model_proto.graph
+    nodes = []
+    for node in graph.node:
+        if node.op_type == "Constant" and [a.name for a in node.attribute] == ["value"]:
+            graph.initializer.append(numpy_helper.from_array(numpy_helper.to_array(node.attribute[0].t), node.output[0]))
+        else:
+            nodes.append(node)
+
+    initializers = {init.name: init for init in graph.initializer}
+    rewritten = []
+    for node in nodes:
+        attrs = {a.name: helper.get_attribute_value(a) for a in node.attribute}
+        if (node.op_type != "Gemm" or node.input[1] not in initializers or len(node.input) != 3
+                or attrs.get("transA", 0) or attrs.get("alpha", 1.0) != 1.0 or attrs.get("beta", 1.0) != 1.0):
+            rewritten.append(node)
+            continue
+        weight = numpy_helper.to_array(initializers[node.input[1]])
+        if attrs.get("transB", 0):
+            weight = weight.T
+        weight_name = f"{node.input[1]}_matmul"
+        graph.initializer.append(numpy_helper.from_array(np.ascontiguousarray(weight), weight_name))
+        product = f"{node.output[0]}_matmul"
+        rewritten.append(helper.make_node("MatMul", [node.input[0], weight_name], [product], name=f"{node.name}_matmul"))
+        rewritten.append(helper.make_node("Add", [product, node.input[2]], [node.output[0]], name=f"{node.name}_add"))
+    del graph.node[:]
+    graph.node.extend(rewritten)
+
+    used = {name for node in graph.node for name in node.input}
+    live = [init for init in graph.initializer if init.name in used]
+    del graph.initializer[:]
+    graph.initializer.extend(live)
+    return model_proto
+
+
+def _fp16_weights(model_proto):
+    """Store large float32 initializers as float16, cast back to float32 on load.
+
+    Only the file shrinks: the wasm provider has no float16 kernels, so the
+    graph still computes in float32 (ORT folds the casts at session creation).
+    """
+    import numpy as np
+    from onnx import TensorProto, helper, numpy_helper
+
+    graph = model_proto.graph
+    casts = []
+    initializers = []
+    for init in graph.initializer:
+        array = numpy_helper.to_array(init)
+        if array.dtype != np.float32 or array.size < FP16_MIN_ELEMENTS:
+            initializers.append(init)
+            continue
+        initializers.append(numpy_helper.from_array(array.astype(np.float16), f"{init.name}_fp16"))
+        casts.append(helper.make_node("Cast", [f"{init.name}_fp16"], [init.name], name=f"{init.name}_cast",
+                                      to=TensorProto.FLOAT))
+    del graph.initializer[:]
+    graph.initializer.extend(initializers)
+    nodes = casts + list(graph.node)
+    del graph.node[:]
+    graph.node.extend(nodes)
+    return model_proto
+
+
+def write_variant(onnx_path: Path, precision: str) -> Path:
+    """Derive the ``precision`` variant from the float32 export at ``onnx_path``."""
+    import onnx
+
+    out = onnx_path.with_name(f"{onnx_path.stem}.{precision}.onnx")
+    model_proto = _prepare_for_quantization(onnx.load(str(onnx_path)))
+    if precision == "fp16":
+        onnx.save(_fp16_weights(model_proto), str(out))
+        return out
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    prepared = out.with_name(f"{out.stem}.prepared.onnx")
+    onnx.save(model_proto, str(prepared))
+    try:
+        quantize_dynamic(str(prepared), str(out), weight_type=QuantType.QInt8, per_channel=True)
+    finally:
+        prepared.unlink()
+    return out
+
+
+def gate_observations(path: Path | None, steps: int, fused: bool = False):
+    """(steps, 1, 96) observations: recorded ones from ``path`` or synthetic.
+
+    Recordings for a fused graph must be raw (unscaled, absolute joint positions).
+    """
+    import numpy as np
+
+    if path is None:
+        rng = np.random.default_rng(1)
+        return rng.standard_normal((steps, 1, 96), dtype=np.float32).clip(-3, 3)
+    obs = np.load(path).astype(np.float32)
+    if obs.ndim != 2 or obs.shape[1] != 96:
+        raise SystemExit(f"--gate-obs must have shape (steps, 96), got {obs.shape}")
+    if fused:
+        return obs[:steps, None, :]
+    # LocoMode.py clips observations before the policy.
+    return obs[:steps, None, :].clip(-OBS_CLIP, OBS_CLIP)
+
+
+def step_latency_us(sess, obs, h0, c0, repeats: int = 300) -> float:
+    """Median wall time of one batch-1 step on a single-threaded CPU session."""
+    import time
+
+    import numpy as np
+
+    feeds = {"obs": obs[0]}
+    if len(sess.get_inputs()) == 3:
+        feeds.update({"h": h0, "c": c0})
+    for _ in range(20):
+        sess.run(None, feeds)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        sess.run(None, feeds)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times) * 1e6)
+
+
+def accuracy_gate(path: Path, model, obs, max_action_err: float, max_state_drift: float,
+                  processing: dict | None = None) -> dict:
+    """Roll the TorchScript policy and the ONNX graph at ``path`` side by side.
+
+    The ONNX graph carries its own (h, c), so quantization error compounds over
+    the rollout exactly as it would on the robot.
+    """
+    import numpy as np
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = 1
+    sess = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+    stateful = len(sess.get_inputs()) == 3
+    h0 = model.hidden_state.numpy().copy()
+    c0 = model.cell_state.numpy().copy()
+
+    ref_actions, ref_h, ref_c = torch_rollout(model, obs, recurrent=stateful, processing=processing)
+    actions, h, c = onnx_rollout(sess, obs, h0, c0)
+    action_err = np.abs(actions - ref_actions)
+    result = {
+        "size_bytes": path.stat().st_size,
+        "step_us": step_latency_us(sess, obs, h0, c0),
+        "action_err_max": float(action_err.max()),
+        "action_err_mean": float(action_err.mean()),
+        "state_drift_max": float(max(np.abs(h - ref_h).max(), np.abs(c - ref_c).max())) if stateful else None,
+    }
+    result["passed"] = result["action_err_max"] <= max_action_err and (
+        result["state_drift_max"] is None or result["state_drift_max"] <= max_state_drift)
+    return result
+
+
+def report_variants(args: argparse.Namespace, model, processing: dict | None = None) -> None:
+    """Write the requested variants, gate them and print a table against float32."""
+    obs = gate_observations(args.gate_obs, args.gate_steps, fused=processing is not None)
+    source = "recorded" if args.gate_obs else "synthetic"
+    print(f"Accuracy gate: {obs.shape[0]} steps of {source} observations, "
+          f"max_action_err={args.max_action_err:g} max_state_drift={args.max_state_drift:g}")
+    print(f"{'variant':8s} {'bytes':>10s} {'step_us':>9s} {'act_max':>9s} {'act_mean':>9s} {'h/c_max':>9s}  gate")
+
+    failed = []
+    for precision in ["fp32", *args.precision]:
+        path = args.onnx if precision == "fp32" else write_variant(args.onnx, precision)
+        result = accuracy_gate(path, model, obs, args.max_action_err, args.max_state_drift, processing)
+        drift = "-" if result["state_drift_max"] is None else f"{result['state_drift_max']:.3g}"
+        print(f"{precision:8s} {result['size_bytes']:>10d} {result['step_us']:>9.1f} "
+              f"{result['action_err_max']:>9.3g} {result['action_err_mean']:>9.3g} {drift:>9s}  "
+              f"{'OK' if result['passed'] else 'FAILED'}")
+        if not result["passed"]:
+            failed.append(precision)
+            if precision != "fp32":
+                path.unlink()
+    if failed:
+        raise SystemExit(f"Accuracy gate failed for: {', '.join(failed)} (failed variants were not kept)")
+
+
 def main() -> None:
     args = parse_args()
 
@@ -58,7 +543,7 @@ def main() -> None:
 
         for p in reversed(site.getsitepackages()):
             torch_lib = Path(p) / "torch" / "lib"
-            if torch_lib.exists():
+            if torch_lib.exists() and hasattr(os, "add_dll_directory"):
                 os.add_dll_directory(str(torch_lib))
                 break
 
@@ -67,7 +552,7 @@ def main() -> None:
     except Exception as e:  # pragma: no cover
         raise SystemExit(
             "Missing dependencies. Create a Python 3.11 venv and install:\n"
-            "  pip install numpy onnx onnxruntime\n"
+            "  pip install numpy onnx onnxruntime pyyaml\n"
             "  pip install torch --index-url https://download.pytorch.org/whl/cpu\n"
             f"\nOriginal error: {e}"
         )
@@ -77,6 +562,10 @@ def main() -> None:
 
     model = torch.jit.load(str(args.pt), map_location="cpu")
     model.eval()
+    loaded_state = (model.hidden_state.clone(), model.cell_state.clone())
+    if args.warmup_steps < 0:
+        raise SystemExit("--warmup-steps must be >= 0")
+    warmed_state = warm_state(model, args.warmup_steps)
 
     # LocoMode.yaml says num_obs=96, num_actions=29
     dummy_obs = torch.zeros((1, 96), dtype=torch.float32)
@@ -87,36 +576,88 @@ def main() -> None:
         #   cell_state:   (1, 1, 256)
         #
         # Exposing (h, c) as explicit inputs/outputs lets a caller (like the web app)
-        # preserve recurrence between timesteps.
+        # preserve recurrence between timesteps. The wrapper runs the policy's
+        # normalizer -> rnn -> actor itself instead of its forward(), which copies
+        # the new state into those fixed-size buffers; that way each batch row of
+        # obs/h/c is an independent robot.
         class StatefulWrap(torch.nn.Module):
             def __init__(self, inner):
                 super().__init__()
-                self.inner = inner
+                self.normalizer = inner.normalizer
+                self.rnn = inner.rnn
+                self.actor = inner.actor
 
             def forward(self, obs, h, c):
-                self.inner.hidden_state.copy_(h)
-                self.inner.cell_state.copy_(c)
-                y = self.inner(obs)
-                return y, self.inner.hidden_state, self.inner.cell_state
+                x = self.normalizer(obs)
+                # forward__0 is the compiled LSTM.forward overload taking an (h, c) tuple.
+                y, (h1, c1) = self.rnn.forward__0(x.unsqueeze(0), (h, c))
+                return self.actor(y.squeeze(0)), h1, c1
 
-        export_model = StatefulWrap(model).eval()
+        # Scripted like the policy itself: the exporter cannot trace into the
+        # TorchScript submodules from eager code.
+        export_model = torch.jit.script(StatefulWrap(model).eval())
         dummy_h = model.hidden_state.clone()
         dummy_c = model.cell_state.clone()
         export_args = (dummy_obs, dummy_h, dummy_c)
         input_names = ["obs", "h", "c"]
         output_names = ["action", "h1", "c1"]
-        dynamic_axes = None
-        if args.dynamic_batch:
-            print("NOTE: --dynamic-batch is not supported for --with-state; exporting fixed batch=1.")
     else:
         export_model = model
         export_args = dummy_obs
         input_names = ["obs"]
         output_names = ["action"]
 
+    processing = load_processing(args.config) if args.fuse_processing else None
+    if processing is not None:
+        # LocoMode.py's numpy pre/post-processing as graph ops, so the runtime
+        # feeds the raw observation and applies the target output directly.
+        # The clipped action is still an output: the next observation needs it.
+        class Processing(torch.nn.Module):
+            def __init__(self, cfg):
+                super().__init__()
+                self.register_buffer("obs_offset", torch.tensor(cfg["obs_offset"]))
+                self.register_buffer("obs_scale", torch.tensor(cfg["obs_scale"]))
+                self.register_buffer("action_scale", torch.tensor(cfg["action_scale"]))
+                self.register_buffer("default_angles", torch.tensor(cfg["default_angles"]))
+                self.obs_clip = float(cfg["obs_clip"])
+                self.action_clip = float(cfg["action_clip"])
+
+            @torch.jit.export
+            def pre(self, obs):
+                return torch.clamp((obs - self.obs_offset) * self.obs_scale, -self.obs_clip, self.obs_clip)
+
+            @torch.jit.export
+            def post(self, action):
+                action = torch.clamp(action, -self.action_clip, self.action_clip)
+                return action, action * self.action_scale + self.default_angles
+
+        class FusedWrap(torch.nn.Module):
+            def __init__(self, inner, cfg):
+                super().__init__()
+                self.inner = inner
+                self.processing = Processing(cfg)
+
+            def forward(self, obs):
+                return self.processing.post(self.inner(self.processing.pre(obs)))
+
+        class FusedStatefulWrap(FusedWrap):
+            def forward(self, obs, h, c):
+                action, h1, c1 = self.inner(self.processing.pre(obs), h, c)
+                action, target = self.processing.post(action)
+                return action, target, h1, c1
+
+        wrap = FusedStatefulWrap if args.with_state else FusedWrap
+        export_model = torch.jit.script(wrap(export_model, processing).eval())
+        output_names.insert(1, "target")
+
     dynamic_axes = None
-    if args.dynamic_batch and not args.with_state:
+    if args.dynamic_batch:
         dynamic_axes = {"obs": {0: "batch"}, "action": {0: "batch"}}
+        if processing is not None:
+            dynamic_axes["target"] = {0: "batch"}
+        if args.with_state:
+            # LSTM state is (num_layers, batch, hidden).
+            dynamic_axes.update({name: {1: "batch"} for name in ("h", "c", "h1", "c1")})
 
     args.onnx.parent.mkdir(parents=True, exist_ok=True)
 
@@ -132,49 +673,64 @@ def main() -> None:
         dynamic_axes=dynamic_axes,
         dynamo=False,  # TorchScript export: use legacy exporter
     )
-
     print(f"Wrote ONNX: {args.onnx}")
 
+    # A graph without state inputs starts every call from the state it bakes
+    # in; make that LocoMode's warmed state rather than whatever tracing left.
+    if not args.with_state:
+        bake_state(args.onnx, warmed_state)
+    elif args.warmup_steps > 0:
+        # LocoMode warms up on a zero policy observation; a fused graph gets it raw.
+        warmup_obs = np.asarray(processing["obs_offset"], np.float32) if processing else np.zeros(96, np.float32)
+        write_warm_state(args.onnx, loaded_state, warmed_state, args.warmup_steps, warmup_obs)
+
+    if processing is not None:
+        import json
+
+        import onnx
+
+        # Record what was fused so a runtime can tell the graph expects raw observations.
+        model_proto = onnx.load(str(args.onnx))
+        onnx.helper.set_model_props(model_proto, {"fused_processing": json.dumps(processing)})
+        onnx.save(model_proto, str(args.onnx))
+
+    # forward() overwrites the LSTM state buffers, tracing included. A graph
+    # without state inputs carries the warmed state baked in above, so that
+    # is the state to compare it against; stateful graphs start from the
+    # loaded state. Restore it whenever the policy has been stepped.
+    reference_state = loaded_state if args.with_state else warmed_state
+
+    def restore_state() -> None:
+        model.hidden_state.copy_(reference_state[0])
+        model.cell_state.copy_(reference_state[1])
+
+    restore_state()
+
     if args.validate:
         import onnxruntime as ort
 
         sess = ort.InferenceSession(str(args.onnx), providers=["CPUExecutionProvider"])
-        in_names = [i.name for i in sess.get_inputs()]
-
-        rng = np.random.default_rng(0)
-        x_np = rng.standard_normal((1, 96), dtype=np.float32).clip(-3, 3)
-
-        with torch.no_grad():
-            if args.with_state:
-                h0 = torch.zeros_like(model.hidden_state)
-                c0 = torch.zeros_like(model.cell_state)
-                y_pt, h1_pt, c1_pt = export_model(
-                    torch.from_numpy(x_np),
-                    h0,
-                    c0,
-                )
-                y_pt = y_pt.detach().cpu().numpy()
-                h1_pt = h1_pt.detach().cpu().numpy()
-                c1_pt = c1_pt.detach().cpu().numpy()
-            else:
-                y_pt = export_model(torch.from_numpy(x_np)).detach().cpu().numpy()
-
         if args.with_state:
-            h0_np = np.zeros((1, 1, 256), dtype=np.float32)
-            c0_np = np.zeros((1, 1, 256), dtype=np.float32)
-            outs = sess.run(None, {in_names[0]: x_np, in_names[1]: h0_np, in_names[2]: c0_np})
-            y_ort, h1_ort, c1_ort = outs
-            max_abs_y = float(np.max(np.abs(y_pt - y_ort)))
-            max_abs_h = float(np.max(np.abs(h1_pt - h1_ort)))
-            max_abs_c = float(np.max(np.abs(c1_pt - c1_ort)))
-            print(f"Validation OK. max_abs_y={max_abs_y:.6g} max_abs_h={max_abs_h:.6g} max_abs_c={max_abs_c:.6g}")
-            return
+            validate_stateful(sess, model, args.validate_batch, args.validate_steps, args.atol, processing)
         else:
-            y_ort = sess.run(None, {in_names[0]: x_np})[0]
+            in_names = [i.name for i in sess.get_inputs()]
+            rng = np.random.default_rng(0)
+            x_np = rng.standard_normal((1, 96), dtype=np.float32).clip(-3, 3)
+            with torch.no_grad():
+                y_pt = model(torch.from_numpy(preprocess(processing, x_np))).detach().cpu().numpy()
+            y_pt = postprocess(processing, y_pt)
+            y_ort = sess.run(["action"], {in_names[0]: x_np})[0]
+
+            max_abs = float(np.max(np.abs(y_pt - y_ort)))
+            mean_abs = float(np.mean(np.abs(y_pt - y_ort)))
+            summary = f"max_abs={max_abs:.6g} mean_abs={mean_abs:.6g}"
+            if processing is not None:
+                summary += f" target_vs_action={target_error(sess, processing, x_np, None, None):.6g}"
+            print(f"Validation OK. {summary}")
+            restore_state()
 
-        max_abs = float(np.max(np.abs(y_pt - y_ort)))
-        mean_abs = float(np.mean(np.abs(y_pt - y_ort)))
-        print(f"Validation OK. max_abs={max_abs:.6g} mean_abs={mean_abs:.6g}")
+    if args.precision:
+        report_variants(args, model, processing)
 
 
 if __name__ == "__main__":
@@ -7,6 +7,49 @@ import Fonts from 'unplugin-fonts/vite'
 // Utilities
 import { defineConfig } from 'vite'
 import { fileURLToPath, URL } from 'node:url'
+import fs from 'node:fs'
+import path from 'node:path'
+
+const PRECOMPRESSED_TYPES = {
+  '.json': 'application/json',
+  '.xml': 'application/xml',
+  '.obj': 'text/plain',
+}
+
+// Serve the .br/.gz variants written by scripts/compress_artifacts.py for
+// public/ files, so dev and preview match a host with precompressed statics.
+// Range requests (motion packs) always get the raw bytes.
+function precompressedStatic () {
+  const publicDir = fileURLToPath(new URL('./public', import.meta.url))
+  const middleware = (base) => (req, res, next) => {
+    if (req.method !== 'GET' || req.headers.range) return next()
+    const pathname = decodeURIComponent(new URL(req.url, 'http://localhost').pathname)
+    if (!pathname.startsWith(base)) return next()
+    const file = path.join(publicDir, pathname.slice(base.length))
+    if (!file.startsWith(publicDir + path.sep)) return next()
+    const accepted = req.headers['accept-encoding'] ?? ''
+    const source = fs.statSync(file, { bigint: true, throwIfNoEntry: false })
+    if (!source) return next()
+    for (const [suffix, encoding] of [['.br', 'br'], ['.gz', 'gzip']]) {
+      if (!accepted.includes(encoding)) continue
+      // compress_artifacts.py stamps the source mtime on each variant; any other
+      // mtime means the source changed since, so the variant is stale.
+      const variant = fs.statSync(file + suffix, { bigint: true, throwIfNoEntry: false })
+      if (!variant || variant.mtimeNs !== source.mtimeNs) continue
+      res.setHeader('Content-Encoding', encoding)
+      res.setHeader('Content-Type', PRECOMPRESSED_TYPES[path.extname(file).toLowerCase()] ?? 'application/octet-stream')
+      res.setHeader('Vary', 'Accept-Encoding')
+      fs.createReadStream(file + suffix).pipe(res)
+      return
+    }
+    next()
+  }
+  return {
+    name: 'precompressed-static',
+    configureServer (server) { server.middlewares.use(middleware(server.config.base)) },
+    configurePreviewServer (server) { server.middlewares.use(middleware(server.config.base)) },
+  }
+}
 
 // https://vitejs.dev/config/
 export default defineConfig(() => {
@@ -19,6 +62,7 @@ export default defineConfig(() => {
   return {
     base,
     plugins: [
+    precompressedStatic(),
     Vue({
       template: { transformAssetUrls },
     }),